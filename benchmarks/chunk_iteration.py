@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Times rendering regions of increasing sizes, to show how the cost of each
+chunk's `chunkloop` grows with the number of chunks in the region.
+
+Run from the repository root::
+
+    python benchmarks/chunk_iteration.py
+"""
+from __future__ import print_function
+from functools import partial
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'test_settings')
+
+import django
+if hasattr(django, 'setup'):  # Django 1.7+
+    django.setup()
+
+from django.contrib import admin
+from django.template import Context
+from editregions.contrib.embeds.admin import IframeAdmin
+from editregions.contrib.embeds.models import Iframe
+from editregions.templatetags.editregion import (render_all_chunks,
+                                                 render_one_chunk,
+                                                 chunk_iteration_context)
+
+SIZES = (10, 100, 1000)
+REPEAT = 3
+
+
+def make_chunks(count):
+    return [Iframe(pk=x, region='test', position=x,
+                   url='https://news.bbc.co.uk/{0}'.format(x))
+            for x in range(0, count)]
+
+
+def render_region(chunks, renderer):
+    render_func = partial(render_one_chunk, renderer=renderer)
+    return list(render_all_chunks(context=Context(), found_chunks=chunks,
+                                  render_func=render_func))
+
+
+def iterate_region(chunks):
+    return [chunk_iteration_context(index=index, value=chunk, iterable=chunks)
+            for index, chunk in enumerate(chunks)]
+
+
+def main():
+    renderer = IframeAdmin(Iframe, admin.site)
+    print('{0:>6} {1:>14} {2:>14}'.format('chunks', 'chunkloop (s)',
+                                          'render (s)'))
+    for size in SIZES:
+        chunks = make_chunks(size)
+        number = max(1, 1000 // size)
+        iterating = min(timeit.repeat(partial(iterate_region, chunks),
+                                      number=number, repeat=REPEAT)) / number
+        rendering = min(timeit.repeat(partial(render_region, chunks, renderer),
+                                      number=1, repeat=REPEAT))
+        print('{0:>6} {1:>14.6f} {2:>14.6f}'.format(size, iterating,
+                                                    rendering))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Times getting a region configuration by rendering and decoding its JSON
+template, against loading the file written by `compile_editregions_config`
+and looking the template up in it.
+
+Run from the repository root::
+
+    python benchmarks/config_decoding.py
+"""
+from __future__ import print_function
+from functools import partial
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'test_settings')
+
+import django
+if hasattr(django, 'setup'):  # Django 1.7+
+    django.setup()
+
+from django.template.loader import get_template
+from editregions.models import EditRegionConfiguration
+from editregions.utils.compiled import (dump_compiled_configs,
+                                        load_compiled_configs)
+
+TEMPLATE = 'movable_editregion_template.json'
+NUMBER = 1000
+REPEAT = 3
+
+
+def decode_template(conf):
+    return conf.decode_template(get_template(TEMPLATE))
+
+
+def load_compiled(data):
+    return load_compiled_configs(data)[TEMPLATE]
+
+
+def main():
+    conf = EditRegionConfiguration()
+    data = dump_compiled_configs({TEMPLATE: decode_template(conf)})
+    print('{0:>24} {1:>14}'.format('', 'per call (s)'))
+    for label, func in (('render & decode JSON',
+                         partial(decode_template, conf)),
+                        ('load compiled file', partial(load_compiled, data))):
+        best = min(timeit.repeat(func, number=NUMBER, repeat=REPEAT))
+        print('{0:>24} {1:>14.8f}'.format(label, best / NUMBER))
+
+
+if __name__ == '__main__':
+    main()
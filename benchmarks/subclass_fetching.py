@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Times casting a region's chunks down to their subclasses with each of the
+`EDITREGIONS_SUBCLASS_STRATEGY` options: one wide join, joins split into
+groups of `EDITREGIONS_SPLIT_EVERY`, one query per type recorded in
+`chunk_type`, and one query per subclass table.
+
+Uses the test settings' in-memory SQLite database, so the numbers mostly
+show the cost of building the queries and the objects, rather than any
+database's join performance.
+
+Run from the repository root::
+
+    python benchmarks/subclass_fetching.py
+"""
+from __future__ import print_function
+from functools import partial
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'test_settings')
+
+import django
+if hasattr(django, 'setup'):  # Django 1.7+
+    django.setup()
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test.utils import override_settings
+from editregions.models import EditRegionConfiguration
+from editregions.utils.chunktypes import get_chunk_models
+from editregions.utils.data import get_content_type
+from editregions.contrib.embeds.models import Iframe
+from editregions.contrib.text.models import WYM
+
+SIZES = (10, 100, 1000)
+REPEAT = 3
+STRATEGIES = (
+    ('join', {'EDITREGIONS_SUBCLASS_STRATEGY': 'join',
+              'EDITREGIONS_SPLIT_EVERY': 1000}),
+    ('split', {'EDITREGIONS_SUBCLASS_STRATEGY': 'join',
+               'EDITREGIONS_SPLIT_EVERY': 2}),
+    ('typed', {'EDITREGIONS_SUBCLASS_STRATEGY': 'typed'}),
+    ('tables', {'EDITREGIONS_SUBCLASS_STRATEGY': 'tables'}),
+    ('union', {'EDITREGIONS_SUBCLASS_STRATEGY': 'union'}),
+)
+
+
+def create_chunks(count, content_id):
+    ct = get_content_type(User)
+    for position in range(0, count):
+        if position % 2:
+            chunk = Iframe(url='https://news.bbc.co.uk/')
+        else:
+            chunk = WYM(content='test')
+        chunk.region = 'test'
+        chunk.content_type = ct
+        chunk.content_id = content_id
+        chunk.position = position
+        chunk.save()
+    return {'content_type': ct, 'content_id': content_id, 'region': 'test'}
+
+
+def fetch(conf, lookups, models, overrides):
+    with override_settings(**overrides):
+        return list(conf._fetch_subclasses(lookups=lookups, models=models))
+
+
+def main():
+    if django.VERSION[:2] >= (1, 7):
+        call_command('migrate', interactive=False, verbosity=0)
+    else:
+        call_command('syncdb', interactive=False, verbosity=0)
+    conf = EditRegionConfiguration()
+    models = get_chunk_models()
+    print('{0} chunk models configured'.format(len(models)))
+    print('{0:>6}'.format('chunks') + ''.join(
+        ' {0:>12}'.format(name + ' (s)') for name, overrides in STRATEGIES))
+    for size in SIZES:
+        lookups = create_chunks(count=size, content_id=str(size))
+        timings = []
+        for name, overrides in STRATEGIES:
+            func = partial(fetch, conf, lookups, models, overrides)
+            timings.append(min(timeit.repeat(func, number=1, repeat=REPEAT)))
+        print('{0:>6}'.format(size) + ''.join(
+            ' {0:>12.6f}'.format(timing) for timing in timings))
+
+
+if __name__ == '__main__':
+    main()
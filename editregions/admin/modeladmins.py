@@ -42,6 +42,8 @@ from editregions.constants import (REQUEST_VAR_REGION, REQUEST_VAR_CT,
 from editregions.utils.data import (get_modeladmin, get_content_type,
                                     get_model_class, get_configuration,
                                     attach_configuration)
+from editregions.utils.registry import get_chunk_renderer
+from editregions.utils.templates import get_cached_template
 from editregions.admin.changelist import EditRegionChangeList
 from editregions.admin.forms import MovementForm
 from editregions.admin.utils import (AdminChunkWrapper, shared_media,
@@ -134,9 +136,9 @@ class EditRegionAdmin(ModelAdmin):
         :return: the subclass object's verbose name
         :rtype: string
         """
-        modeladmin = get_modeladmin(obj)
-        if hasattr(modeladmin, 'get_editregions_subclass_type'):
-            value = modeladmin.get_editregions_subclass_type(obj=obj)
+        renderer = get_chunk_renderer(obj)
+        if renderer.get_editregions_subclass_type is not None:
+            value = renderer.get_editregions_subclass_type(obj=obj)
         else:
             value = obj._meta.verbose_name
         value = strip_tags(force_text(value))
@@ -156,14 +158,14 @@ class EditRegionAdmin(ModelAdmin):
         :return: short representation of the data, HTML included.
         :rtype: string
         """
-        modeladmin = get_modeladmin(obj)
-        if hasattr(modeladmin, 'get_editregions_subclass_summary'):
-            value = modeladmin.get_editregions_subclass_summary(obj=obj)
-        elif hasattr(modeladmin, 'render_into_summary'):
+        renderer = get_chunk_renderer(obj)
+        if renderer.get_editregions_subclass_summary is not None:
+            value = renderer.get_editregions_subclass_summary(obj=obj)
+        elif renderer.render_into_summary is not None:
             context = chunk_iteration_context(index=0, value=obj,
                                                iterable=(obj,))
             context.update({'admin_summary': True})
-            value = modeladmin.render_into_summary(obj=obj, context=context)
+            value = renderer.render_into_summary(obj=obj, context=context)
         else:
             value = '[missing]'
         value = strip_tags(force_text(value))
@@ -180,9 +182,9 @@ class EditRegionAdmin(ModelAdmin):
         :return: the list of actions or tools available for this object
         :rtype: string
         """
-        modeladmin = get_modeladmin(obj)
-        if hasattr(modeladmin, 'get_editregions_subclass_tools'):
-            value = modeladmin.get_editregions_subclass_tools(obj=obj)
+        renderer = get_chunk_renderer(obj)
+        if renderer.get_editregions_subclass_tools is not None:
+            value = renderer.get_editregions_subclass_tools(obj=obj)
         else:
             value = ''
         return '<div class="chunk-object-tools">{value!s}</div>'.format(
@@ -453,6 +455,10 @@ class ChunkAdmin(AdminlinksMixin):
     save_as = False
     save_on_top = False
     exclude = ['content_type', 'content_id', 'region', 'position']
+    #: whether `render_into_region` spends most of its time waiting on
+    #: network or other I/O, so may be rendered in a thread when
+    #: `EDITREGIONS_RENDER_CONCURRENTLY` is enabled.
+    render_concurrently = False
 
     def get_model_perms(self, request, *args, **kwargs):
         """
@@ -756,6 +762,53 @@ class ChunkAdmin(AdminlinksMixin):
         logger.warning(msg)
         return None
 
+    def get_editregions_template(self, template_names):
+        """
+        Find the first of the given templates, re-using the one found for the
+        same names previously. Renderers should prefer this over
+        `render_to_string`, which would find and compile the template for every
+        chunk unless the cached template loader is in use.
+
+        :param template_names: a template name, or an ordered iterable of them.
+        :return: a compiled template.
+        """
+        return get_cached_template(template_names)
+
+    def render_editregions_template(self, template_names, context):
+        return self.get_editregions_template(template_names).render(context)
+
+    def render_into_region_timeout(self, obj, context, **kwargs):
+        """
+        Used in place of the output of `render_into_region` when rendering
+        concurrently, if it didn't finish before the deadline.
+
+        :param obj: The :class:`~editregions.models.EditRegionChunk` subclass
+                    which took too long to render.
+        :param context: The overall template context.
+        :return: Some output, or `None` to leave the chunk out entirely.
+        """
+        return '<!-- {app}.{model} {pk} took too long to render -->'.format(
+            app=obj._meta.app_label, model=obj.__class__.__name__.lower(),
+            pk=obj.pk)
+
+    def get_editregions_cache_parts(self, obj, context, **kwargs):
+        """
+        When `EDITREGIONS_CACHE_CHUNKS` is enabled, the output of
+        `render_into_region` is cached against the chunk's `pk` and `modified`
+        timestamp, plus whatever this returns.
+
+        The bundled templates use ``chunkloop.counter``, so by default that is
+        included. Return `None` to avoid caching the output at all, which
+        you'll want if it depends on the request, or other context values.
+
+        :param obj: The :class:`~editregions.models.EditRegionChunk` subclass
+                    currently expecting to be rendered.
+        :param context: The overall template context.
+        :return: an iterable of values, or `None`.
+        """
+        chunkloop = context.get('chunkloop', None)
+        return (getattr(chunkloop, 'counter', None),)
+
     def get_editregions_subclass_tools(self, obj):
         if hasattr(EditRegionChunk._meta, 'model_name'):
             model_name = EditRegionChunk._meta.model_name
@@ -6,6 +6,102 @@ REQUEST_VAR_ID = 'content_id'
 
 SPLIT_CHUNKS_EVERY = 14
 
+#: values for `EDITREGIONS_FETCH_MODE`; either every region of an object is
+#: fetched when the first one is needed, or just the one needed.
+FETCH_ALL = 'all'
+FETCH_REGION = 'region'
+
+#: values for `EDITREGIONS_SUBCLASS_STRATEGY`; how chunks are cast down to
+#: their subclasses when a region allows more than one type. Either by
+#: joining every allowed subclass's table, by reading each chunk's
+#: `chunk_type` and then querying only the types actually present, or by
+#: querying every allowed subclass's table by primary key.
+SUBCLASS_JOIN = 'join'
+SUBCLASS_TYPED = 'typed'
+SUBCLASS_TABLES = 'tables'
+#: ... or by selecting each allowed subclass's rows separately, combined
+#: into one query with `UNION ALL`.
+SUBCLASS_UNION = 'union'
+#: ... or let the planner choose between joining everything at once,
+#: splitting the joins into groups (`SUBCLASS_SPLIT`) and `SUBCLASS_TABLES`,
+#: based on how long each has taken.
+SUBCLASS_AUTO = 'auto'
+SUBCLASS_SPLIT = 'split'
+
+#: the most tables the planner will join at once for each database vendor,
+#: if the project hasn't set `EDITREGIONS_PLANNER_HINTS`; vendors not listed
+#: use `EDITREGIONS_SPLIT_EVERY`.
+PLANNER_JOIN_WIDTHS = {
+    'mysql': 8,
+}
+
+#: how many times the planner tries each way of fetching a number of tables
+#: before settling on the fastest, if the project hasn't set
+#: `EDITREGIONS_PLANNER_SAMPLES`. With 0, it never tries the alternatives.
+PLANNER_SAMPLES = 10
+
 #: the format of the cache key, to be filled so that storing and deleting
 #: rendered regions can take place.
-# RENDERED_CACHE_KEY = 'editregions_rendered_{content_type_id}_{content_id}_{region}'
+RENDERED_CACHE_KEY = 'editregions_rendered_{content_type_id}_{content_id}_{generation}_{region}'  # noqa
+
+#: the format of the cache key holding the generation for a parent object,
+#: which is incremented whenever one of its chunks changes, and is part of
+#: every key depending on the chunks a parent object has.
+GENERATION_CACHE_KEY = 'editregions_generation_{content_type_id}_{content_id}'
+
+#: the cache key for the version of the region configurations, changed by the
+#: `clear_editregions_caches` command, so that every process forgets what
+#: it has decoded or looked for when it next sees a different one.
+CONFIGURATION_VERSION_CACHE_KEY = 'editregions_configuration_version'
+
+#: the format of the cache key for the output of a single chunk; `extra` is
+#: a digest of anything else the chunk's renderer says the output depends on.
+CHUNK_CACHE_KEY = 'editregions_chunk_{pk}_{modified}_{extra}'
+
+#: the format of the cache key recording that a parent object has no chunks
+#: in a region.
+EMPTY_CACHE_KEY = 'editregions_empty_{content_type_id}_{content_id}_{generation}_{region}'  # noqa
+
+#: the format of the cache key recording which ancestor a region was
+#: inherited from; `ancestry` is a digest of the object, its ancestors and all
+#: of their generations.
+INHERITED_CACHE_KEY = 'editregions_inherited_{content_type_id}_{content_id}_{region}_{ancestry}'  # noqa
+
+#: how long (in seconds) rendered output may stay in the cache, if the
+#: project hasn't set `EDITREGIONS_CACHE_TIMEOUT`. Invalidation happens
+#: whenever chunks are saved, deleted or moved, so this can be generous.
+CACHE_TIMEOUT = 86400
+
+#: how many threads may render chunks marked as `render_concurrently`, if
+#: the project hasn't set `EDITREGIONS_RENDER_WORKERS`.
+RENDER_WORKERS = 4
+
+#: how many threads may run the split subclass queries, if the project
+#: hasn't set `EDITREGIONS_SPLIT_WORKERS`.
+QUERY_WORKERS = 4
+
+#: how long (in seconds) a chunk rendered in a thread may take, if the
+#: project hasn't set `EDITREGIONS_RENDER_CHUNK_TIMEOUT`.
+RENDER_CHUNK_TIMEOUT = 5
+
+#: how long (in seconds) all the threaded chunks in a region may take, if
+#: the project hasn't set `EDITREGIONS_RENDER_REGION_TIMEOUT`.
+RENDER_REGION_TIMEOUT = 10
+
+#: how long (in seconds) browsers and proxies may cache the output of
+#: `editregions.views.render_region`, if the project hasn't set
+#: `EDITREGIONS_DEFERRED_CACHE_TIMEOUT`.
+DEFERRED_CACHE_TIMEOUT = 300
+
+#: how many template names which don't exist are remembered, if the project
+#: hasn't set `EDITREGIONS_MISSING_TEMPLATES_SIZE`.
+MISSING_TEMPLATES_SIZE = 1000
+
+#: how many objects' configurations (and fetched chunks) are kept per request
+#: or `configuration_scope`, if the project hasn't set
+#: `EDITREGIONS_CONFIGURATION_STORE_SIZE`.
+CONFIGURATION_STORE_SIZE = 5000
+
+#: the format of the file written by the `compile_editregions_config`
+#: management command; files in any other format are ignored.
+COMPILED_CONFIG_VERSION = 1
@@ -6,7 +6,6 @@ except (ImportError, AttributeError) as e:  # Python 2, < Django 1.5
 from django.contrib import admin
 from django.contrib.admin.options import ModelAdmin
 from django.forms import Media
-from django.template.loader import render_to_string
 from django.utils.encoding import force_text
 from editregions.admin.modeladmins import ChunkAdmin
 from editregions.contrib.embeds.forms import (JavaScriptEditorForm,
@@ -33,8 +32,8 @@ class IframeAdmin(ChunkAdmin, ModelAdmin):
     ]
 
     def render_into_region(self, obj, context, **kwargs):
-        return render_to_string('editregions/embeds/iframe.html',
-                                context_instance=context)
+        return self.render_editregions_template(
+            'editregions/embeds/iframe.html', context)
 
     def render_into_summary(self, obj, context, **kwargs):
         summary = force_text(obj)
@@ -46,6 +45,8 @@ admin.site.register(Iframe, IframeAdmin)
 
 class FeedAdmin(ChunkAdmin, ModelAdmin):
     list_display = ['url', 'created', 'modified']
+    # fetching an uncached feed blocks on the remote server.
+    render_concurrently = True
     fieldsets = [
         (None, {
             'fields': ['url']
@@ -63,10 +64,17 @@ class FeedAdmin(ChunkAdmin, ModelAdmin):
         super(FeedAdmin, self).save_model(request, obj, *args, **kwargs)
         obj.get_from_cache()
 
+    def get_editregions_cache_parts(self, obj, context, **kwargs):
+        """
+        The parsed feed is already cached for `cache_for` seconds, so caching
+        the output too would keep it around beyond that.
+        """
+        return None
+
     def render_into_region(self, obj, context, **kwargs):
         context.update({'feed': obj.get_from_cache()})
-        return render_to_string('editregions/embeds/feed.html',
-                                context_instance=context)
+        return self.render_editregions_template(
+            'editregions/embeds/feed.html', context)
 
     def render_into_summary(self, obj, context, **kwargs):
         feed = obj.get_from_cache()
@@ -86,8 +94,8 @@ class JavaScriptAdmin(ChunkAdmin, ModelAdmin):
 
     def render_into_mediagroup(self, obj, context, **kwargs):
         return {'bottom': [
-            render_to_string('editregions/embeds/javascript.html',
-                             context_instance=context)
+            self.render_editregions_template(
+                'editregions/embeds/javascript.html', context)
         ]}
 
     def render_into_summary(self, obj, context, **kwargs):
@@ -112,8 +120,8 @@ class JavascriptAssetAdmin(ChunkAdmin, ModelAdmin):
 
     def render_into_mediagroup(self, obj, context, **kwargs):
         return {'bottom': [
-            render_to_string('editregions/embeds/javascript_src.html',
-                             context_instance=context)
+            self.render_editregions_template(
+                'editregions/embeds/javascript_src.html', context)
         ]}
 
     def render_into_summary(self, obj, context, **kwargs):
@@ -131,8 +139,8 @@ class StylesheetAssetAdmin(ChunkAdmin, ModelAdmin):
 
     def render_into_mediagroup(self, obj, context, **kwargs):
         return {'top': [
-            render_to_string('editregions/embeds/stylesheet_src.html',
-                             context_instance=context)
+            self.render_editregions_template(
+                'editregions/embeds/stylesheet_src.html', context)
         ]}
 
     def render_into_summary(self, obj, context, **kwargs):
@@ -2,7 +2,6 @@
 from django.contrib import admin
 from django.contrib.admin import ModelAdmin
 from django.template.defaultfilters import striptags
-from django.template.loader import render_to_string
 from editregions.admin.modeladmins import ChunkAdmin
 from .models import MetaElement
 from .forms import MetaElementForm
@@ -13,8 +12,8 @@ class MetaElementAdmin(ChunkAdmin, ModelAdmin):
     list_display = ['name', 'content', 'created', 'modified']
 
     def render_into_region(self, obj, context, **kwargs):
-        return render_to_string('editregions/html/metatag.html',
-                                context_instance=context)
+        return self.render_editregions_template(
+            'editregions/html/metatag.html', context)
 
     def render_into_summary(self, obj, context, **kwargs):
         return striptags(obj.content).strip()
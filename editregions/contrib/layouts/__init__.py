@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+
+default_app_config = 'editregions.contrib.layouts.apps.LayoutsAppConfig'
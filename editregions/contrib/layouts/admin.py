@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from django.contrib import admin
+from django.contrib.admin import ModelAdmin, TabularInline
+from .models import Layout, LayoutAssignment
+from .utils import get_layout
+
+
+class LayoutAssignmentInline(TabularInline):
+    model = LayoutAssignment
+    extra = 1
+
+
+class LayoutAdmin(ModelAdmin):
+    list_display = ['name', 'created', 'modified']
+    search_fields = ['name']
+    inlines = [LayoutAssignmentInline]
+admin.site.register(Layout, LayoutAdmin)
+
+
+class SupportsLayouts(object):
+    """
+    Mixin for the `ModelAdmin` of objects using editregions, which takes the
+    regions from the layout assigned to each object (or its type), and only
+    discovers region configuration templates for objects without one.
+    """
+    def get_editregions_layout(self, obj):
+        return get_layout(obj)
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+from django.apps import AppConfig
+
+
+class LayoutsAppConfig(AppConfig):
+    name = 'editregions.contrib.layouts'
+    verbose_name = 'Layouts'
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+import editregions.contrib.layouts.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Layout',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('name', models.CharField(max_length=255)),
+                ('regions', models.TextField(help_text='Regions in the same format as a region configuration template', validators=[editregions.contrib.layouts.models.validate_layout_regions])),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('modified', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'layout',
+                'verbose_name_plural': 'layouts',
+            },
+            bases=(models.Model,),
+        ),
+        migrations.CreateModel(
+            name='LayoutAssignment',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('content_id', models.CharField(default='', max_length=255, blank=True)),
+                ('content_type', models.ForeignKey(related_name='+', to='contenttypes.ContentType')),
+                ('layout', models.ForeignKey(related_name='assignments', to='layouts.Layout')),
+            ],
+            options={
+                'verbose_name': 'layout assignment',
+                'verbose_name_plural': 'layout assignments',
+            },
+            bases=(models.Model,),
+        ),
+        migrations.AlterUniqueTogether(
+            name='layoutassignment',
+            unique_together=set([('content_type', 'content_id')]),
+        ),
+    ]
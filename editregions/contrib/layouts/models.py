@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import logging
+from django.core.exceptions import ValidationError
+from django.db.models import (Model, CharField, TextField, DateTimeField,
+                              ForeignKey)
+from django.db.models.signals import post_save, post_delete
+from django.utils.encoding import python_2_unicode_compatible
+from django.utils.translation import ugettext_lazy as _
+from django.contrib.contenttypes.models import ContentType
+try:
+    from django.apps import apps
+    get_model = apps.get_model
+except ImportError:  # pragma: no cover ... Django < 1.7
+    from django.db.models.loading import get_model
+from editregions.utils.regions import validate_region_name
+
+try:
+    import ujson as json
+except ImportError:  # Haven't got an ultrajson package
+    import json
+
+logger = logging.getLogger(__name__)
+
+
+def validate_layout_regions(value):
+    """
+    Checks the regions are in the same format as a region configuration
+    template, and that every model they allow exists.
+
+    .. testcase:: ValidateLayoutRegionsTestCase
+    """
+    try:
+        regions = json.loads(value)
+    except ValueError:
+        raise ValidationError(_('Regions must be valid JSON'))
+    if not isinstance(regions, dict):
+        raise ValidationError(_('Regions must be a JSON object'))
+    for region, config in regions.items():
+        validate_region_name(region)
+        if not isinstance(config, dict):
+            raise ValidationError(
+                _('The configuration for "%(region)s" must be a JSON '
+                  'object') % {'region': region})
+        models = config.get('models', {})
+        if not isinstance(models, dict):
+            raise ValidationError(
+                _('The models for "%(region)s" must be a JSON object') % {
+                    'region': region})
+        for dotted in models:
+            try:
+                app, modelname = dotted.split('.')[0:2]
+                model = get_model(app, modelname)
+            except (ValueError, LookupError):
+                model = None
+            if model is None:
+                raise ValidationError(
+                    _('Unable to find the model "%(model)s"') % {
+                        'model': dotted})
+
+
+@python_2_unicode_compatible
+class Layout(Model):
+    """
+    The regions available to any object assigned to this layout, in the same
+    format as the `.json` region configuration templates.
+    """
+    name = CharField(max_length=255)
+    regions = TextField(validators=[validate_layout_regions],
+                        help_text=_('Regions in the same format as a region '
+                                    'configuration template'))
+    created = DateTimeField(auto_now_add=True)
+    modified = DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        verbose_name = _('layout')
+        verbose_name_plural = _('layouts')
+
+
+@python_2_unicode_compatible
+class LayoutAssignment(Model):
+    """
+    Uses a layout for one object, or, with no `content_id`, for every object
+    of a type which hasn't been given one of its own.
+    """
+    layout = ForeignKey(Layout, related_name='assignments')
+    content_type = ForeignKey(ContentType, related_name='+')
+    content_id = CharField(max_length=255, blank=True, default='')
+
+    def __str__(self):
+        return '{layout} for {ct}.{id}'.format(
+            layout=self.layout_id, ct=self.content_type_id,
+            id=self.content_id or '*')
+
+    class Meta:
+        # also the index used to find the layout for an object.
+        unique_together = (('content_type', 'content_id'),)
+        verbose_name = _('layout assignment')
+        verbose_name_plural = _('layout assignments')
+
+
+def forget_layouts(sender, instance, **kwargs):
+    """
+    Any change to a layout or an assignment may change the layout used by an
+    unknowable number of objects, so everything looked up is forgotten.
+    """
+    from .utils import bump_layouts_generation
+    return bump_layouts_generation()
+post_save.connect(forget_layouts, sender=Layout,
+                  dispatch_uid='editregions_layouts_after_layout_save')
+post_delete.connect(forget_layouts, sender=Layout,
+                    dispatch_uid='editregions_layouts_after_layout_delete')
+post_save.connect(forget_layouts, sender=LayoutAssignment,
+                  dispatch_uid='editregions_layouts_after_assignment_save')
+post_delete.connect(forget_layouts, sender=LayoutAssignment,
+                    dispatch_uid='editregions_layouts_after_assignment_delete')
@@ -0,0 +1,71 @@
+# encoding: utf-8
+import datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+
+        # Adding model 'Layout'
+        db.create_table('layouts_layout', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('name', self.gf('django.db.models.fields.CharField')(max_length=255)),
+            ('regions', self.gf('django.db.models.fields.TextField')()),
+            ('created', self.gf('django.db.models.fields.DateTimeField')(auto_now_add=True, blank=True)),
+            ('modified', self.gf('django.db.models.fields.DateTimeField')(auto_now=True, blank=True)),
+        ))
+        db.send_create_signal('layouts', ['Layout'])
+
+        # Adding model 'LayoutAssignment'
+        db.create_table('layouts_layoutassignment', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('layout', self.gf('django.db.models.fields.related.ForeignKey')(related_name='assignments', to=orm['layouts.Layout'])),
+            ('content_type', self.gf('django.db.models.fields.related.ForeignKey')(related_name='+', to=orm['contenttypes.ContentType'])),
+            ('content_id', self.gf('django.db.models.fields.CharField')(default='', max_length=255, blank=True)),
+        ))
+        db.send_create_signal('layouts', ['LayoutAssignment'])
+
+        # Adding unique constraint on 'LayoutAssignment', fields ['content_type', 'content_id']
+        db.create_unique('layouts_layoutassignment', ['content_type_id', 'content_id'])
+
+
+    def backwards(self, orm):
+
+        # Removing unique constraint on 'LayoutAssignment', fields ['content_type', 'content_id']
+        db.delete_unique('layouts_layoutassignment', ['content_type_id', 'content_id'])
+
+        # Deleting model 'LayoutAssignment'
+        db.delete_table('layouts_layoutassignment')
+
+        # Deleting model 'Layout'
+        db.delete_table('layouts_layout')
+
+
+    models = {
+        'contenttypes.contenttype': {
+            'Meta': {'ordering': "('name',)", 'unique_together': "(('app_label', 'model'),)", 'object_name': 'ContentType', 'db_table': "'django_content_type'"},
+            'app_label': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'model': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '100'})
+        },
+        'layouts.layout': {
+            'Meta': {'object_name': 'Layout'},
+            'created': ('django.db.models.fields.DateTimeField', [], {'auto_now_add': 'True', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'modified': ('django.db.models.fields.DateTimeField', [], {'auto_now': 'True', 'blank': 'True'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'regions': ('django.db.models.fields.TextField', [], {})
+        },
+        'layouts.layoutassignment': {
+            'Meta': {'unique_together': "(('content_type', 'content_id'),)", 'object_name': 'LayoutAssignment'},
+            'content_id': ('django.db.models.fields.CharField', [], {'default': "''", 'max_length': '255', 'blank': 'True'}),
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'+'", 'to': "orm['contenttypes.ContentType']"}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'layout': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'assignments'", 'to': "orm['layouts.Layout']"})
+        }
+    }
+
+    complete_apps = ['layouts']
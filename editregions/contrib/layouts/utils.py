@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+import logging
+try:
+    from django.utils.encoding import force_text
+except ImportError:  # pragma: no cover ... Django < 1.5
+    from django.utils.encoding import force_unicode as force_text
+try:
+    from collections import OrderedDict as SortedDict
+except ImportError:  # pragma: no cover ... Python < 2.7, Django < 1.7
+    from django.utils.datastructures import SortedDict
+from editregions.utils.cache import (get_editregions_cache, get_cache_timeout,
+                                     get_generation, bump_generation)
+from editregions.utils.data import get_content_type, freeze
+from .models import LayoutAssignment, json
+
+logger = logging.getLogger(__name__)
+
+#: the format of the cache key recording which layout (if any) an object
+#: uses; `generation` changes whenever any layout or assignment does.
+LAYOUT_CACHE_KEY = 'editregions_layout_{content_type_id}_{content_id}_{generation}'  # noqa
+
+#: what's cached for objects which have no layout, as `None` can't be told
+#: apart from a cache miss.
+NO_LAYOUT = ()
+
+#: layout pk -> (modified, decoded regions)
+_decoded_layouts = {}
+
+
+def get_layouts_generation():
+    return get_generation(content_type_id='layouts', content_id='all')
+
+
+def bump_layouts_generation():
+    """
+    .. testcase:: GetLayoutTestCase
+    """
+    return bump_generation(content_type_id='layouts', content_id='all')
+
+
+def find_layout(content_type, content_id):
+    """
+    Queries for the layout assigned to the object, falling back to the one
+    assigned to all objects of its type; the assignment for an object sorts
+    after the blank one, so is first when ordering by descending id.
+
+    .. testcase:: GetLayoutTestCase
+    """
+    found = (LayoutAssignment.objects
+             .filter(content_type=content_type,
+                     content_id__in=(content_id, ''))
+             .order_by('-content_id')
+             .values_list('layout_id', 'layout__modified', 'layout__regions'))
+    for layout_id, modified, regions in found[:1]:
+        return layout_id, modified, regions
+    return NO_LAYOUT
+
+
+def decode_layout(layout_id, modified, regions):
+    """
+    Decodes a layout's regions once per process (for each time it changes),
+    so that every object using it gets the same frozen configuration.
+
+    .. testcase:: GetLayoutTestCase
+    """
+    try:
+        decoded_modified, decoded = _decoded_layouts[layout_id]
+        if decoded_modified == modified:
+            return decoded
+    except KeyError:
+        pass
+    decoded = freeze(SortedDict(sorted(json.loads(regions).items())))
+    _decoded_layouts[layout_id] = (modified, decoded)
+    return decoded
+
+
+def get_layout(obj):
+    """
+    Returns a 2-tuple of a name for the layout used by `obj` (which changes
+    whenever the layout does) and its region configuration, or `None` if it
+    has no layout assigned.
+
+    Which layout an object uses is cached, so the database is only asked
+    after a layout or assignment is changed.
+
+    .. testcase:: GetLayoutTestCase
+    """
+    content_type = get_content_type(obj)
+    content_id = force_text(obj.pk)
+    key = LAYOUT_CACHE_KEY.format(content_type_id=content_type.pk,
+                                  content_id=content_id,
+                                  generation=get_layouts_generation())
+    cache = get_editregions_cache()
+    found = cache.get(key, None)
+    if found is None:
+        found = find_layout(content_type=content_type, content_id=content_id)
+        cache.set(key, found, get_cache_timeout())
+    if not found:
+        return None
+    layout_id, modified, regions = found
+    name = 'layout:{pk}:{modified}'.format(pk=layout_id, modified=modified)
+    return name, decode_layout(layout_id=layout_id, modified=modified,
+                               regions=regions)
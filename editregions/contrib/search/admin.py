@@ -2,7 +2,6 @@
 from __future__ import unicode_literals
 import logging
 from django.contrib import admin
-from django.template.loader import render_to_string
 from haystack.exceptions import NotHandled, SearchBackendError
 
 try:
@@ -21,6 +20,8 @@ logger = logging.getLogger(__name__)
 class MoreLikeThisAdmin(ChunkAdmin, admin.ModelAdmin):
     form = MoreLikeThisForm
     list_display = ['max_num', 'connection', 'created', 'modified']
+    # querying the search backend may block on the network.
+    render_concurrently = True
     fieldsets = [
         (None, {
             'fields': ['max_num'],
@@ -31,6 +32,12 @@ class MoreLikeThisAdmin(ChunkAdmin, admin.ModelAdmin):
         }),
     ]
 
+    def get_editregions_cache_parts(self, obj, context, **kwargs):
+        """
+        Results change whenever the search index does, so don't cache them.
+        """
+        return None
+
     def render_into_region(self, obj, context, **kwargs):
         sqs = SearchQuerySet().using(obj.connection)
         if obj.request_objects:
@@ -48,8 +55,8 @@ class MoreLikeThisAdmin(ChunkAdmin, admin.ModelAdmin):
             logger.exception("Recovering from search backend error by failing "
                              "silently.")
             context.update({'more_like_this': ()})
-        return render_to_string('editregions/search/mlt.html',
-                                context_instance=context)
+        return self.render_editregions_template(
+            'editregions/search/mlt.html', context)
 
     def render_into_summary(self, obj, context, **kwargs):
         if obj.max_num < 1:
@@ -67,6 +74,8 @@ admin.site.register(MoreLikeThis, MoreLikeThisAdmin)
 class SearchResultsAdmin(ChunkAdmin, admin.ModelAdmin):
     form = SearchResultsForm
     list_display = ['query', 'max_num', 'connection', 'created', 'modified']
+    # querying the search backend may block on the network.
+    render_concurrently = True
     fieldsets = [
         (None, {
             'fields': ['query', 'max_num', 'boost'],
@@ -77,6 +86,12 @@ class SearchResultsAdmin(ChunkAdmin, admin.ModelAdmin):
         }),
     ]
 
+    def get_editregions_cache_parts(self, obj, context, **kwargs):
+        """
+        Results change whenever the search index does, so don't cache them.
+        """
+        return None
+
     def render_into_region(self, obj, context, **kwargs):
         sqs = SearchQuerySet().using(obj.connection)
         # and now, in advanced usage, we allow for boosting words in the results
@@ -97,8 +112,8 @@ class SearchResultsAdmin(ChunkAdmin, admin.ModelAdmin):
             logger.exception("Recovering from search backend error by failing "
                              "silently.")
             context.update({'search_results': ()})
-        return render_to_string('editregions/search/query_results.html',
-                                context_instance=context)
+        return self.render_editregions_template(
+            'editregions/search/query_results.html', context)
 
     def render_into_summary(self, obj, context, **kwargs):
         return force_text(obj)
@@ -3,7 +3,6 @@ from django.contrib import admin
 from django.contrib.admin import ModelAdmin
 from django.forms import Media
 from django.template.defaultfilters import striptags
-from django.template.loader import render_to_string
 from editregions.admin.modeladmins import ChunkAdmin
 from editregions.contrib.text.forms import WYMEditorForm, MCEEditorForm
 from editregions.contrib.text.models import WYM, MCE
@@ -17,8 +16,8 @@ class WYMAdmin(ChunkAdmin, ModelAdmin):
     ]
 
     def render_into_region(self, obj, context, **kwargs):
-        return render_to_string('editregions/text/html.html',
-                                context_instance=context)
+        return self.render_editregions_template(
+            'editregions/text/html.html', context)
 
     def render_into_summary(self, obj, context, **kwargs):
         return striptags(obj.content).strip()
@@ -33,8 +32,8 @@ class MCEAdmin(ChunkAdmin, ModelAdmin):
     ]
 
     def render_into_region(self, obj, context, **kwargs):
-        return render_to_string('editregions/text/html.html',
-                                context_instance=context)
+        return self.render_editregions_template(
+            'editregions/text/html.html', context)
 
     def render_into_summary(self, obj, context, **kwargs):
         return striptags(obj.content).strip()
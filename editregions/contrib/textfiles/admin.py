@@ -5,7 +5,6 @@ from django.contrib.admin import ModelAdmin
 from django.core.exceptions import ValidationError, PermissionDenied
 from django.http import HttpResponse
 from django.template.defaultfilters import striptags
-from django.template.loader import render_to_string
 try:
     from django.utils.text import Truncator
 
@@ -27,8 +26,8 @@ class MarkdownAdmin(ChunkAdmin, ModelAdmin):
     change_form_template = 'admin/editregions/markdown/change_form.html'
 
     def render_into_region(self, obj, context, **kwargs):
-        return render_to_string('editregions/textfiles/markdown.html',
-                                context_instance=context)
+        return self.render_editregions_template(
+            'editregions/textfiles/markdown.html', context)
 
     def render_into_summary(self, obj, context, **kwargs):
         data = striptags(obj.rendered_content).strip()
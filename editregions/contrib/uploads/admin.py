@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 from django.contrib import admin
 from django.contrib.admin import ModelAdmin
-from django.template.loader import render_to_string
 from editregions.contrib.uploads.models import File
 try:
     from django.utils.encoding import force_text
@@ -25,7 +24,7 @@ class FileAdmin(ChunkAdmin, ModelAdmin):
                 'editregions/uploads/file_{0}.html'.format(obj.get_filetype())
             )
         templates.append('editregions/uploads/file.html')
-        return render_to_string(templates, context_instance=context)
+        return self.render_editregions_template(templates, context)
 
     def render_into_summary(self, obj, context, **kwargs):
         if obj.title and obj.data:
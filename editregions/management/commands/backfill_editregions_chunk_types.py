@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from optparse import make_option
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+from editregions.utils.chunktypes import backfill_chunk_types
+
+
+class Command(BaseCommand):
+    help = ('Records the concrete type of every chunk, for chunks created '
+            'before it was recorded, or without calling save().')
+    option_list = BaseCommand.option_list + (
+        make_option('--database', dest='database', default=DEFAULT_DB_ALIAS,
+                    help='The database to backfill, defaulting to '
+                         '"default"'),
+    )
+
+    def handle(self, *args, **options):
+        updated = backfill_chunk_types(using=options.get('database'))
+        self.stdout.write('Updated {count} rows\n'.format(count=updated))
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+from django.core.management.base import BaseCommand
+from editregions.signals import configuration_changed
+from editregions.utils.cache import bump_configuration_version
+
+
+class Command(BaseCommand):
+    help = ('Forgets the region configurations, and which templates do or '
+            'do not exist, remembered by this and every other process. '
+            'Other processes notice at the start of their next request, '
+            'if they share EDITREGIONS_CACHE_ALIAS with this one.')
+
+    def handle(self, *args, **options):
+        version = bump_configuration_version()
+        configuration_changed.send(sender=self.__class__)
+        self.stdout.write('Cleared editregions configuration caches, now '
+                          'at version {0}\n'.format(version))
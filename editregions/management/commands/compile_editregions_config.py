@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import os
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.template import TemplateSyntaxError
+from django.template.loader import get_template
+try:
+    from django.apps import apps
+    get_model = apps.get_model
+except ImportError:  # pragma: no cover ... Django < 1.7
+    from django.db.models.loading import get_model
+try:
+    from django.template.loaders.app_directories import app_template_dirs
+except ImportError:  # pragma: no cover ... Django 1.8+
+    app_template_dirs = ()
+from editregions.models import EditRegionConfiguration
+from editregions.utils.compiled import (dump_compiled_configs,
+                                        get_compiled_config_path)
+from editregions.utils.regions import validate_region_name
+
+
+def find_template_names(extension, directories):
+    """
+    Yields the name of every template with the given extension, in the order
+    the template loaders would look for them, each only once.
+    """
+    seen = set()
+    for directory in directories:
+        for root, dirs, files in os.walk(directory):
+            for filename in sorted(files):
+                if not filename.endswith(extension):
+                    continue
+                name = os.path.relpath(os.path.join(root, filename),
+                                       directory).replace(os.sep, '/')
+                if name not in seen:
+                    seen.add(name)
+                    yield name
+
+
+def looks_like_configuration(raw_config):
+    return all(isinstance(value, dict) for value in raw_config.values())
+
+
+def validate_configuration(name, raw_config):
+    for region, config in raw_config.items():
+        try:
+            validate_region_name(region)
+        except ValidationError as e:
+            raise CommandError('{name}: invalid region "{region}": '
+                               '{error}'.format(name=name, region=region,
+                                                error=e))
+        for dotted in config.get('models', {}):
+            try:
+                app, modelname = dotted.split('.')[0:2]
+                model = get_model(app, modelname)
+            except (ValueError, LookupError):
+                model = None
+            if model is None:
+                raise CommandError('{name}: unable to find the model "{model}" '
+                                   'for "{region}"'.format(name=name,
+                                                           model=dotted,
+                                                           region=region))
+
+
+class Command(BaseCommand):
+    args = '[output file]'
+    help = ('Decodes every region configuration template, checks the models '
+            'they use exist, and writes them into a single file which is '
+            'used instead of the templates when EDITREGIONS_COMPILED_CONFIG '
+            'points at it.')
+
+    def handle(self, *args, **options):
+        output = args[0] if args else get_compiled_config_path()
+        if not output:
+            raise CommandError('Give a file to write to, or set '
+                               'EDITREGIONS_COMPILED_CONFIG')
+        conf = EditRegionConfiguration()
+        directories = tuple(settings.TEMPLATE_DIRS) + tuple(app_template_dirs)
+        configs = {}
+        for name in find_template_names(extension='.{0}'.format(conf.decoder),
+                                        directories=directories):
+            try:
+                raw_config = conf.decode_template(get_template(name))
+            except (TemplateSyntaxError, ValueError, AttributeError) as e:
+                self.stderr.write('Skipping {name}: {error}\n'.format(
+                    name=name, error=e))
+                continue
+            if not looks_like_configuration(raw_config):
+                self.stderr.write('Skipping {name}: not a region '
+                                  'configuration\n'.format(name=name))
+                continue
+            validate_configuration(name=name, raw_config=raw_config)
+            configs[name] = raw_config
+        with open(output, 'wb') as f:
+            f.write(dump_compiled_configs(configs))
+        self.stdout.write('Compiled {count} region configurations into '
+                          '{output}\n'.format(count=len(configs),
+                                              output=output))
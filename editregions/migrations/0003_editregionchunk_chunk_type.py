@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+def backfill_chunk_types(apps, schema_editor):
+    # uses the real models, rather than the historical ones, because the
+    # subclasses of EditRegionChunk live in other apps, which this migration
+    # can't know about. Only the primary keys and chunk_type are touched.
+    from editregions.utils.chunktypes import backfill_chunk_types
+    backfill_chunk_types(using=schema_editor.connection.alias)
+
+
+def do_nothing(apps, schema_editor):
+    return None
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0001_initial'),
+        ('editregions', '0002_auto_20141120_1152'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='editregionchunk',
+            name='chunk_type',
+            field=models.ForeignKey(related_name='+', default=None, editable=False, to='contenttypes.ContentType', null=True),
+            preserve_default=True,
+        ),
+        migrations.RunPython(backfill_chunk_types, do_nothing),
+    ]
@@ -1,12 +1,12 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 from itertools import groupby, chain
-from operator import attrgetter
 import logging
 from django.core.urlresolvers import reverse, NoReverseMatch
 import os
 import re
+from time import time
 from django.conf import settings
 try:
     from django.contrib.contenttypes.fields import GenericForeignKey
@@ -16,8 +16,8 @@ from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ImproperlyConfigured
 from django.db.models import (ForeignKey, Model, CharField,
                               PositiveIntegerField, DateTimeField)
+from django.db.models.signals import post_save, post_delete
 from django.template import TemplateDoesNotExist
-from django.template.loader import select_template
 from django.template.context import Context
 from django.utils.encoding import python_2_unicode_compatible, force_text
 
@@ -40,10 +40,30 @@ except ImportError:  # pragma: no cover ... Django < 1.7
     from django.db.models.loading import get_model, get_app
 from model_utils.managers import InheritanceManager
 from editregions.querying import EditRegionChunkManager
+from editregions.signals import move_completed, configuration_changed
 from editregions.text import chunk_v, chunk_vplural
-from editregions.utils.data import get_modeladmin, get_content_type
+from editregions.utils.data import (get_modeladmin, get_content_type, freeze,
+                                    FrozenSortedDict)
+from editregions.utils.cache import bump_generation
 from editregions.utils.regions import validate_region_name
+from editregions.utils.chunktypes import (fetch_by_chunk_type,
+                                          fetch_by_table, fetch_by_union,
+                                          merge_chunks, get_chunk_type_filter,
+                                          get_allowed_chunks_filter)
+from editregions.utils.concurrency import (concurrent_queries_enabled,
+                                           can_query_concurrently,
+                                           run_queries_concurrently)
+from editregions.utils.planner import get_fetch_planner
+from editregions.utils.compiled import (get_compiled_configs,
+                                        clear_compiled_configs)
+from editregions.utils.templates import (select_existing_template,
+                                         clear_missing_templates,
+                                         clear_template_cache)
 from editregions.constants import SPLIT_CHUNKS_EVERY
+from editregions.constants import FETCH_ALL, FETCH_REGION
+from editregions.constants import (SUBCLASS_JOIN, SUBCLASS_TYPED,
+                                   SUBCLASS_TABLES, SUBCLASS_SPLIT,
+                                   SUBCLASS_AUTO, SUBCLASS_UNION)
 from editregions.constants import REQUEST_VAR_CT
 from editregions.constants import REQUEST_VAR_ID
 
@@ -78,6 +98,10 @@ class EditRegionChunk(Model):
 
     region = CharField(max_length=75, validators=[validate_region_name])
     position = PositiveIntegerField(default=None, db_index=True)
+    # the concrete subclass this is the base of, so that it may be fetched
+    # without joining every possible subclass; see `fetch_by_chunk_type`
+    chunk_type = ForeignKey(ContentType, related_name='+', null=True,
+                            default=None, editable=False)
 
     objects = EditRegionChunkManager()
     polymorphs = InheritanceManager()
@@ -91,6 +115,16 @@ class EditRegionChunk(Model):
         return 'pk={x.pk}, region={x.region}, position={x.position}'.format(
             x=self)
 
+    def save(self, *args, **kwargs):
+        if self.chunk_type_id is None:
+            chunk_type = get_content_type(self.__class__)
+            # an existing plain chunk may really be the base of a subclass,
+            # which only `backfill_chunk_types` can tell.
+            if (self._state.adding or
+                    chunk_type.model_class() is not EditRegionChunk):
+                self.chunk_type = chunk_type
+        return super(EditRegionChunk, self).save(*args, **kwargs)
+
     class Meta:
         abstract = False
         ordering = ['position', '-modified']
@@ -109,16 +143,82 @@ class EditRegionChunk(Model):
 fallback_region_name_re = re.compile(r'[_\W]+')
 
 
+class RenderPlan(namedtuple('RenderPlan', 'raw_config config')):
+    """
+    The decoded region configuration for a template, along with the regions,
+    names, models and limits resolved from it. The same plan is shared by
+    every object whose configuration uses that template, so it can't be
+    changed; assigning a new `config` or `raw_config` to a configuration
+    gives it a plan of its own instead.
+
+    .. testcase:: RenderPlanTestCase
+    """
+    __slots__ = ()
+
+
+#: the plan for configurations which haven't found a template (yet)
+EMPTY_RENDER_PLAN = RenderPlan(raw_config=freeze({}), config=freeze({}))
+
+#: (configuration class, template name, decoder) -> RenderPlan
+_render_plans = {}
+
+#: (template name, decoder) -> (modification time, decoded configuration)
+_decoded_configs = {}
+
+
+def clear_render_plans():
+    """
+    .. testcase:: RenderPlanTestCase
+    """
+    _render_plans.clear()
+
+
+def clear_decoded_configs():
+    """
+    Forget every configuration template decoded so far, so that changes to
+    them are picked up without restarting the process.
+
+    .. testcase:: DecodedConfigCacheTestCase
+    """
+    _decoded_configs.clear()
+
+
+def get_template_name(template_instance):
+    """
+    Returns the name a template was loaded by, or `None` for templates built
+    directly from a string, which can't safely be told apart.
+    """
+    name = getattr(template_instance, 'name', None)
+    # Django < 1.8 names string templates '<Unknown Template>'
+    if name == '<Unknown Template>':
+        return None
+    return name
+
+
+def get_template_mtime(template_instance):
+    """
+    Returns the modification time of the file a template was loaded from, or
+    `None` if it didn't come from a file (or `TEMPLATE_DEBUG` is off, and so
+    Django didn't record where it came from)
+    """
+    origin = getattr(template_instance, 'origin', None)
+    filename = getattr(origin, 'name', None)
+    if not filename:
+        return None
+    try:
+        return os.path.getmtime(filename)
+    except (OSError, TypeError):
+        return None
+
+
 @python_2_unicode_compatible
 class EditRegionConfiguration(object):
 
-    __slots__ = ('config', 'raw_config', 'has_configuration',
-                 '_previous_fetched_chunks', 'obj', 'ct', 'decoder',
-                 'decoder_func', 'valid_templates')
+    __slots__ = ('plan', 'has_configuration', '_previous_fetched_chunks',
+                 'obj', 'ct', 'decoder', 'decoder_func', 'valid_templates')
 
     def __init__(self, obj=None):
-        self.config = {}
-        self.raw_config = {}
+        self.plan = EMPTY_RENDER_PLAN
         self.valid_templates = ()
         self.has_configuration = False
         self._previous_fetched_chunks = None
@@ -165,6 +265,22 @@ class EditRegionConfiguration(object):
 
     __bool__ = __nonzero__
 
+    @property
+    def config(self):
+        return self.plan.config
+
+    @config.setter
+    def config(self, value):
+        self.plan = self.plan._replace(config=value)
+
+    @property
+    def raw_config(self):
+        return self.plan.raw_config
+
+    @raw_config.setter
+    def raw_config(self, value):
+        self.plan = self.plan._replace(raw_config=value)
+
     def tolist(self):
         return self.raw_config
 
@@ -188,40 +304,81 @@ class EditRegionConfiguration(object):
         return True
 
     def set_template(self, template_name):
+        compiled = self.get_compiled_template(template_name)
+        if compiled is not None:
+            name, raw_config = compiled
+            return self.set_layout(name=name, raw_config=raw_config)
         template = self.get_first_valid_template(template_name)
         self.has_configuration = template is not None
-        self.raw_config = self.decode_template_region_configuration(
+        raw_config = self.decode_template_region_configuration(
             template_instance=template)
-        self.config = self.get_template_region_configuration(
-            raw_data=self.raw_config)
+        self.plan = self.get_render_plan(template_instance=template,
+                                         raw_config=raw_config)
+
+    def get_render_plan(self, template_instance, raw_config, name=None):
+        """
+        Resolves the `raw_config` into a `RenderPlan` the first time a
+        template is seen, and hands back that same plan to every object
+        afterwards, for as long as the template decodes to the same data.
+        Subclasses may resolve it differently, so each class has its own.
+
+        .. testcase:: RenderPlanTestCase
+        """
+        if name is None:
+            name = get_template_name(template_instance=template_instance)
+        key = (self.__class__, name, self.decoder)
+        plan = _render_plans.get(key, None)
+        if plan is not None and (plan.raw_config is raw_config or
+                                 plan.raw_config == raw_config):
+            return plan
+        config = self.get_template_region_configuration(raw_data=raw_config)
+        plan = RenderPlan(raw_config=freeze(raw_config), config=freeze(config))
+        # templates built from strings have no name to key them by.
+        if name is not None:
+            _render_plans[key] = plan
+        return plan
 
     def configure(self, obj):
         self.obj = obj
         self.ct = get_content_type(obj)
         modeladmin = get_modeladmin(self.obj)
         if hasattr(modeladmin, 'get_editregions_template_choices'):
-            self.valid_templates = modeladmin.get_editregions_template_choices(
-                obj=self.obj)
+            self.valid_templates = tuple(
+                modeladmin.get_editregions_template_choices(obj=self.obj))
+        if hasattr(modeladmin, 'get_editregions_layout'):
+            layout = modeladmin.get_editregions_layout(obj=self.obj)
+            if layout is not None:
+                name, raw_config = layout
+                return self.set_layout(name=name, raw_config=raw_config)
         possible_templates = modeladmin.get_editregions_templates(
             obj=self.obj)
         self.set_template(possible_templates)
 
+    def set_layout(self, name, raw_config):
+        """
+        Uses a region configuration which didn't come from a template (such
+        as one stored in the database), where `name` identifies that exact
+        configuration, so that it may be shared with other objects.
+
+        .. testcase:: RenderPlanTestCase
+        """
+        self.has_configuration = True
+        # frozen configurations are presumed to be sorted already.
+        if not isinstance(raw_config, FrozenSortedDict):
+            raw_config = freeze(SortedDict(sorted(raw_config.items())))
+        self.plan = self.get_render_plan(template_instance=None,
+                                         raw_config=raw_config, name=name)
+
     def get_first_valid_template(self, possible_templates):
         """
         Given a bunch of templates (tuple, list), find the first one in the
         settings dictionary. Assumes the incoming template list is ordered in
         discovery-preference order.
         """
-        if isinstance(possible_templates, string_types):
-            template_names = (possible_templates,)
-        else:
-            template_names = possible_templates
-
-        serializer_template_names = ['{filename}.{serializer}'.format(
-            filename=os.path.splitext(x)[0], serializer=self.decoder)
-            for x in template_names if x.strip()]
+        serializer_template_names = self.get_serializer_template_names(
+            possible_templates)
         try:
-            return select_template(serializer_template_names)
+            return select_existing_template(serializer_template_names)
         except TemplateDoesNotExist:
             if settings.DEBUG:
                 raise
@@ -230,11 +387,74 @@ class EditRegionConfiguration(object):
             ))
             return None
 
+    def get_serializer_template_names(self, possible_templates):
+        if isinstance(possible_templates, string_types):
+            template_names = (possible_templates,)
+        else:
+            template_names = possible_templates
+        return ['{filename}.{serializer}'.format(
+            filename=os.path.splitext(x)[0], serializer=self.decoder)
+            for x in template_names if x.strip()]
+
+    def get_compiled_template(self, possible_templates):
+        """
+        Finds the first of the templates which exists, and if it was
+        compiled into the file written by `compile_editregions_config`,
+        returns a 2-tuple of its name and region configuration. Otherwise
+        (or if there's no such file) returns `None`, so that the same
+        template is used as would be without the file.
+
+        .. testcase:: CompiledConfigTestCase
+        """
+        configs = get_compiled_configs()
+        if not configs:
+            return None
+        for name in self.get_serializer_template_names(possible_templates):
+            if name in configs:
+                return name, configs[name]
+            try:
+                select_existing_template(name)
+            except TemplateDoesNotExist:
+                continue
+            # exists, but was added (or changed to be found first) since
+            # the file was compiled.
+            return None
+        return None
+
     def decode_template_region_configuration(self, template_instance):
         # if in production (DEBUG=False) and no template was found,
         # play nicely and don't error the whole request.
         if template_instance is None:
             return {}
+        name = get_template_name(template_instance=template_instance)
+        if name is None:
+            return self.decode_template(template_instance=template_instance)
+        # in development, templates are re-read if they've changed on disk;
+        # in production they're decoded once per process.
+        mtime = None
+        if settings.DEBUG:
+            mtime = get_template_mtime(template_instance=template_instance)
+            if mtime is None:
+                return self.decode_template(
+                    template_instance=template_instance)
+        key = (name, self.decoder)
+        try:
+            decoded_mtime, decoded = _decoded_configs[key]
+            if decoded_mtime == mtime:
+                return decoded
+        except KeyError:
+            pass
+        decoded = self.decode_template(template_instance=template_instance)
+        _decoded_configs[key] = (mtime, decoded)
+        return decoded
+
+    def decode_template(self, template_instance):
+        """
+        Renders and decodes a configuration template, without asking the
+        process-wide cache.
+
+        .. testcase:: DecodedConfigCacheTestCase
+        """
         # avoid generating an empty Context instance by not calling .render()
         rendered_template = template_instance.render(
             context=Context({})).strip()
@@ -243,7 +463,7 @@ class EditRegionConfiguration(object):
             return {}
         # Allow decoding to bubble up an error.
         parsed_template = self.decoder_func(rendered_template)
-        return SortedDict(sorted(parsed_template.items()))
+        return freeze(SortedDict(sorted(parsed_template.items())))
 
     def get_template_region_configuration(self, raw_data):
         desired_config = SortedDict()
@@ -313,28 +533,43 @@ class EditRegionConfiguration(object):
             # chunk limit was None
             return None
 
+    def has_fetched_all_regions(self):
+        previous = self._previous_fetched_chunks
+        if previous is None:
+            return False
+        return all(region in previous for region in self.config)
+
     @property
     def _fetch_chunks(self):
-        if self._previous_fetched_chunks is not None:
+        if self.has_fetched_all_regions():
             # previously this was using a cached_property decorator, but that
             # prevents me trying to be clever and use __slots__
             logger.info("Requesting previously fetched chunks")
             return self._previous_fetched_chunks
 
         logger.info("Requesting chunks")
-        models = set()
-        self._previous_fetched_chunks = defaultdict(list)
-        parsed_config = tuple(self.config.items())
+        previous = self._previous_fetched_chunks or {}
+        missing = tuple(region for region in self.config
+                        if region not in previous)
+        return self._fetch_regions(regions=missing)
+
+    def _fetch_regions(self, regions):
+        """
+        Fetch the chunks for the given regions, joining only the models
+        enabled for those regions, and add them to any already fetched.
+        """
+        regions = tuple(region for region in regions if region in self.config)
+        if self._previous_fetched_chunks is None:
+            self._previous_fetched_chunks = defaultdict(list)
 
         # fail as early as possible if there's nothing to do.
-        if len(parsed_config) < 1:
+        if len(regions) < 1:
             return self._previous_fetched_chunks
 
-        # calculate the maximum number of a) dict keys, b) models required in
-        # the queryset.
-        for region, subconfig in parsed_config:
-            self._previous_fetched_chunks[region]  # this actually does assign the keys.
-            klasses = subconfig.get('models', {}).keys()
+        # calculate the maximum number of models required in the queryset.
+        models = set()
+        for region in regions:
+            klasses = self.config[region].get('models', {}).keys()
             models |= set(klasses)
         models = tuple(models)
 
@@ -343,76 +578,146 @@ class EditRegionConfiguration(object):
                 raise ImproperlyConfigured("Tried to fetch chunks without "
                                            "having a valid `obj` for this "
                                            "EditRegionConfiguration instance")
-            return self._previous_fetched_chunks
+            return self.set_fetched_chunks(regions=regions, chunks=())
 
         kws = {
             'content_type': get_content_type(self.obj),
             'content_id': self.obj.pk,
         }
-        # avoids doing an IN (?, ?) query if only one region exists
-        # avoids doing *any* query if no regions exist.
-        region_count = len(self._previous_fetched_chunks)
-        if region_count < 1:
-            return self._previous_fetched_chunks
-        elif region_count == 1:
-            # cast to list because PY3 is lame.
-            kws.update(region=list(self._previous_fetched_chunks.keys())[0])
+        # avoids doing an IN (?, ?) query if only one region is needed
+        if len(regions) == 1:
+            kws.update(region=regions[0])
         else:
-            kws.update(region__in=self._previous_fetched_chunks.keys())
+            kws.update(region__in=regions)
+
+        # only chunks of the types enabled for their region are asked for,
+        # so those disabled since they were added are never loaded.
+        filters = (get_allowed_chunks_filter(models_by_region=dict(
+            (region, self.config[region].get('models', {}))
+            for region in regions)),)
 
         # populate the resultset, in the most efficient way possible for the
         # given models.
         model_count = len(models)
         if model_count == 1:
-            chunks = models[0].objects.filter(**kws)
+            chunks = models[0].objects.filter(*filters, **kws)
         elif model_count > 1:
             # this will do as few queries as possible. Ideally, just 1.
-            chunks = self._fetch_subclasses(lookups=kws, models=models)
+            chunks = self._fetch_subclasses(lookups=kws, models=models,
+                                            filters=filters)
         else:
             chunks = EditRegionChunk.objects.none()
 
-        index = 0
-        for index, chunk in enumerate(chunks, start=1):
-            if chunk.__class__ != EditRegionChunk:
-                self._previous_fetched_chunks[chunk.region].append(chunk)
-        logger.info("Requesting chunks resulted in {0} items".format(index))
-        return self._previous_fetched_chunks
+        fetched = self.set_fetched_chunks(regions=regions, chunks=chunks)
+        logger.info("Requesting chunks for {0} regions resulted in {1} "
+                    "items".format(len(regions),
+                                   sum(len(fetched[x]) for x in regions)))
+        return fetched
 
-    def _fetch_subclasses(self, lookups, models):
+    def _fetch_subclasses(self, lookups, models, filters=()):
         """
         If we have a lot of tables to join, to keep query time down, we
         instead do multiple smaller queries, to avoid some of the
         penalties described in https://github.com/elbaschid/mti-lightbulb
+
+        Alternatively, with `EDITREGIONS_SUBCLASS_STRATEGY` set to `typed`,
+        only the subclasses actually used are queried (see
+        `fetch_by_chunk_type`), or with it set to `tables`, every subclass
+        is queried by primary key, without joining (see `fetch_by_table`),
+        or with it set to `union`, every subclass is selected separately in
+        one query (see `fetch_by_union`).
+        With it set to `auto`, the `FetchPlanner` picks whichever has been
+        quickest.
+
+        Any `filters` (`Q` objects, see `get_allowed_chunks_filter`) are
+        applied along with the `lookups`.
         """
+        strategy = getattr(settings, 'EDITREGIONS_SUBCLASS_STRATEGY',
+                           SUBCLASS_JOIN)
+        if strategy == SUBCLASS_AUTO:
+            return self._fetch_planned_subclasses(lookups=lookups,
+                                                  models=models,
+                                                  filters=filters)
+        split_after = getattr(settings, 'EDITREGIONS_SPLIT_EVERY',
+                              SPLIT_CHUNKS_EVERY)
+        return self._fetch_subclasses_using(strategy=strategy,
+                                            lookups=lookups, models=models,
+                                            filters=filters,
+                                            split_after=split_after)
+
+    def _fetch_planned_subclasses(self, lookups, models, filters=()):
+        """
+        Asks the planner how to fetch these models, and tells it how long
+        that took. The chunks are fetched immediately, so that the time
+        taken includes the queries.
+        """
+        planner = get_fetch_planner()
+        plan = planner.plan(models=models, using=EditRegionChunk.polymorphs.db)
+        if plan.strategy == SUBCLASS_SPLIT:
+            strategy, split_after = SUBCLASS_JOIN, plan.max_width
+        else:
+            # never splitting when joining everything was chosen.
+            strategy, split_after = plan.strategy, None
+        started = time()
+        chunks = list(self._fetch_subclasses_using(
+            strategy=strategy, lookups=lookups, models=models,
+            filters=filters, split_after=split_after))
+        planner.record(plan=plan, seconds=time() - started)
+        return chunks
+
+    def _fetch_subclasses_using(self, strategy, lookups, models, split_after,
+                                filters=()):
+        if strategy == SUBCLASS_TYPED:
+            return fetch_by_chunk_type(lookups=lookups, models=models,
+                                       filters=filters)
+        if strategy == SUBCLASS_TABLES:
+            return fetch_by_table(lookups=lookups, models=models,
+                                  filters=filters)
+        if strategy == SUBCLASS_UNION:
+            return fetch_by_union(lookups=lookups, models=models,
+                                  filters=filters)
         manager = EditRegionChunk.polymorphs
         # let model-utils calculate the dependencies.
         calculated_relations = manager.select_subclasses(*models).subclasses
-        split_after = getattr(settings, 'EDITREGIONS_SPLIT_EVERY',
-                              SPLIT_CHUNKS_EVERY)
 
         # figure out how many tables are going to end up joined
         tables_bases = (x.split(LOOKUP_SEP) for x in calculated_relations)
         tables = frozenset(chain(*tables_bases))
 
-        if len(tables) > split_after:
+        if split_after is not None and len(tables) > split_after:
             data = self._dissect_subclasses(relations=calculated_relations,
                                             split_after=split_after)
             # by this point, `data` should be a list of tuples, where
-            # each tuple represents a subset of subclasses to ask for.
-            chained_qs = chain(*(
-                manager.filter(**lookups).select_subclasses(*subclass_set)
-                for subclass_set in data if subclass_set))
-            # because we're now not asking for all the correct subclasses,
-            # we'll get back more results than we want, so we need to throw
-            # out those which haven't been cast down.
-            filtered_out_ercs = (x for x in chained_qs
-                                 if x.__class__ != EditRegionChunk)
-            sorted_qslike = sorted(filtered_out_ercs,
-                                   key=attrgetter('position'))
-            return sorted_qslike
+            # each tuple represents a subset of subclasses to ask for, and
+            # each query is only for the chunks of that subset's types.
+            relation_models = dict(
+                (max(manager.select_subclasses(model).subclasses, key=len),
+                 model) for model in models)
+            querysets = []
+            for subclass_set in data:
+                if not subclass_set:
+                    continue
+                subset_models = [relation_models[relation]
+                                 for relation in subclass_set
+                                 if relation in relation_models]
+                queryset = manager.filter(*filters, **lookups)
+                if subset_models:
+                    queryset = queryset.filter(
+                        get_chunk_type_filter(models=subset_models))
+                querysets.append(queryset.select_subclasses(*subclass_set))
+            if (concurrent_queries_enabled() and
+                    can_query_concurrently(using=manager.db)):
+                streams = run_queries_concurrently(querysets=querysets)
+            else:
+                streams = querysets
+            # chunks without a `chunk_type` are asked for by every query,
+            # but only cast down by one, so the others are thrown out while
+            # merging the (already ordered) results together.
+            return merge_chunks(streams=streams)
 
         # few enough tables needed joining that we can just do one.
-        return manager.filter(**lookups).select_subclasses(*models).iterator()
+        return (manager.filter(*filters, **lookups)
+                .select_subclasses(*models).iterator())
 
     def _dissect_subclasses(self, relations, split_after):
         """
@@ -450,8 +755,80 @@ class EditRegionConfiguration(object):
             outgroups[-1] += last
         return tuple(outgroups)
 
+    def set_fetched_chunks(self, regions, chunks):
+        """
+        Store chunks fetched elsewhere (see `prefetch_editregions`) as if this
+        instance had asked for them, so that rendering any of the given
+        `regions` doesn't need a query. Chunks whose type isn't enabled for
+        their region are thrown away; when fetched here, they're left out of
+        the query instead, so this only applies to those without a recorded
+        `chunk_type`, or fetched elsewhere.
+        """
+        fetched = defaultdict(list)
+        if self._previous_fetched_chunks is not None:
+            fetched.update(self._previous_fetched_chunks)
+        for region in regions:
+            fetched[region] = []
+        for chunk in chunks:
+            if chunk.region not in regions:
+                continue
+            allowed = self.config.get(chunk.region, {}).get('models', {})
+            if chunk.__class__ in allowed:
+                fetched[chunk.region].append(chunk)
+        self._previous_fetched_chunks = fetched
+        return fetched
+
     def fetch_chunks(self):
         return self._fetch_chunks
 
     def fetch_chunks_for(self, region):
+        previous = self._previous_fetched_chunks
+        if previous is not None and region in previous:
+            return previous[region]
+        fetch_mode = getattr(settings, 'EDITREGIONS_FETCH_MODE', FETCH_ALL)
+        if fetch_mode == FETCH_REGION:
+            return self._fetch_regions(regions=(region,)).get(region, ())
         return self._fetch_chunks.get(region, ())
+
+
+def bump_chunk_generation(sender, instance, **kwargs):
+    """
+    Connected to `post_save` and `post_delete` for every model, because
+    there's no way to subscribe to only the subclasses of `EditRegionChunk`.
+    Everything cached for the parent object is keyed by its generation, so
+    bumping it invalidates every region at once.
+    """
+    if not isinstance(instance, EditRegionChunk):
+        return None
+    return bump_generation(content_type_id=instance.content_type_id,
+                           content_id=instance.content_id)
+post_save.connect(bump_chunk_generation,
+                  dispatch_uid='editregions_bump_generation_after_save')
+post_delete.connect(bump_chunk_generation,
+                    dispatch_uid='editregions_bump_generation_after_delete')
+
+
+def bump_moved_chunk_generation(sender, instance, **kwargs):
+    """
+    Moving a chunk reflows everything around it via `update()`, which doesn't
+    send `post_save`, so the parent object needs bumping here too.
+    """
+    return bump_generation(content_type_id=instance.content_type_id,
+                           content_id=instance.content_id)
+move_completed.connect(bump_moved_chunk_generation,
+                       dispatch_uid='editregions_bump_generation_after_move')
+
+
+def clear_configuration_caches(sender, **kwargs):
+    """
+    Everything remembered about configuration templates lives for as long as
+    the process, so when they change (eg: on deploy, without restarting) it
+    all needs forgetting at once.
+    """
+    clear_decoded_configs()
+    clear_render_plans()
+    clear_missing_templates()
+    clear_template_cache()
+    clear_compiled_configs()
+configuration_changed.connect(clear_configuration_caches,
+                              dispatch_uid='editregions_clear_configuration')
@@ -55,7 +55,8 @@ class EditRegionChunkManager(Manager):
                                             insert_position=to_position)
             same_region_move_completed.send(sender=self.model, instance=obj,
                                             reflowed=moved)
-        move_completed.send(sender=self.model, instance=obj)
+        move_completed.send(sender=self.model, instance=obj,
+                            from_region=from_region, to_region=to_region)
         return moved
 
     def _calculate_positions(self, obj, region, insert_position=None):
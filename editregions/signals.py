@@ -10,4 +10,9 @@ different_region_move_completed = Signal(providing_args=('instance',
 same_region_move_completed = Signal(providing_args=('instance', 'reflowed'))
 
 # fired after either of the above events.
-move_completed = Signal(providing_args=('instance', 'reflowed'))
+move_completed = Signal(providing_args=('instance', 'reflowed', 'from_region',
+                                        'to_region'))
+
+# fired when the region configuration templates, or which of them exist, may
+# have changed; everything derived from them in this process is forgotten.
+configuration_changed = Signal(providing_args=())
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+
+        # Adding field 'EditRegionChunk.chunk_type'
+        db.add_column('editregions_editregionchunk', 'chunk_type',
+                      self.gf('django.db.models.fields.related.ForeignKey')(default=None, related_name='+', null=True, to=orm['contenttypes.ContentType']),
+                      keep_default=False)
+
+        if not db.dry_run:
+            # the subclasses of EditRegionChunk live in other apps, which
+            # the frozen orm doesn't know about, so use the real models.
+            from editregions.utils.chunktypes import backfill_chunk_types
+            backfill_chunk_types(using=db.db_alias)
+
+
+    def backwards(self, orm):
+
+        # Deleting field 'EditRegionChunk.chunk_type'
+        db.delete_column('editregions_editregionchunk', 'chunk_type_id')
+
+
+    models = {
+        'contenttypes.contenttype': {
+            'Meta': {'ordering': "('name',)", 'unique_together': "(('app_label', 'model'),)", 'object_name': 'ContentType', 'db_table': "'django_content_type'"},
+            'app_label': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'model': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '100'})
+        },
+        'editregions.editregionchunk': {
+            'Meta': {'ordering': "['position', '-modified']", 'object_name': 'EditRegionChunk', 'index_together': "[['content_type', 'content_id', 'region']]"},
+            'chunk_type': ('django.db.models.fields.related.ForeignKey', [], {'default': 'None', 'related_name': "'+'", 'null': 'True', 'to': "orm['contenttypes.ContentType']"}),
+            'content_id': ('django.db.models.fields.CharField', [], {'max_length': '255', 'db_index': 'True'}),
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'+'", 'to': "orm['contenttypes.ContentType']"}),
+            'created': ('django.db.models.fields.DateTimeField', [], {'auto_now_add': 'True', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'modified': ('django.db.models.fields.DateTimeField', [], {'auto_now': 'True', 'blank': 'True'}),
+            'position': ('django.db.models.fields.PositiveIntegerField', [], {'default': 'None', 'db_index': 'True'}),
+            'region': ('django.db.models.fields.CharField', [], {'max_length': '75'})
+        }
+    }
+
+    complete_apps = ['editregions']
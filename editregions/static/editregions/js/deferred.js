@@ -0,0 +1,35 @@
+/*
+ * Fills in regions rendered with {% editregion "name" obj deferred %}, by
+ * requesting each placeholder's URL and swapping in the returned HTML.
+ * Regions which come back empty keep whatever the placeholder contained.
+ */
+;(function(doc, undefined) {
+    var fill = function(placeholder) {
+        var xhr = new XMLHttpRequest();
+        xhr.open('GET', placeholder.getAttribute('data-editregion-url'), true);
+        xhr.setRequestHeader('Accept', 'application/json');
+        xhr.setRequestHeader('X-Requested-With', 'XMLHttpRequest');
+        xhr.onreadystatechange = function() {
+            if (xhr.readyState !== 4 || xhr.status !== 200) {
+                return;
+            }
+            var data = JSON.parse(xhr.responseText);
+            if (data.html) {
+                placeholder.innerHTML = data.html;
+            }
+            placeholder.className += ' editregion-loaded';
+        };
+        xhr.send();
+    };
+    var fillAll = function() {
+        var placeholders = doc.querySelectorAll('[data-editregion-url]');
+        for (var i = 0; i < placeholders.length; i++) {
+            fill(placeholders[i]);
+        }
+    };
+    if (doc.readyState === 'loading') {
+        doc.addEventListener('DOMContentLoaded', fillAll);
+    } else {
+        fillAll();
+    }
+})(document);
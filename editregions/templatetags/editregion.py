@@ -1,15 +1,23 @@
 # -*- coding: utf-8 -*-
 from collections import namedtuple
+from copy import copy
 from itertools import chain
 import logging
+from multiprocessing import TimeoutError as ThreadTimeoutError
+import time
 from classytags.helpers import AsTag
 from django import template
 from django.conf import settings
 from django.contrib.admin.sites import NotRegistered
 from django.contrib.contenttypes.models import ContentType
 from classytags.core import Options, Tag
-from classytags.arguments import Argument, StringArgument, Flag
+from classytags.arguments import (Argument, StringArgument, Flag,
+                                  MultiValueArgument)
+from django.core.urlresolvers import reverse, NoReverseMatch
+from django.template.context import BaseContext, Context
+from django.template.loader import render_to_string
 from django.utils.html import strip_tags
+from django.utils.translation import get_language
 from django.core.exceptions import ImproperlyConfigured
 import operator
 from editregions.models import EditRegionChunk, EditRegionConfiguration
@@ -17,17 +25,124 @@ from editregions.text import ttag_no_obj, ttag_not_model
 from editregions.utils.regions import validate_region_name
 from editregions.utils.data import (get_content_type, get_modeladmin,
                                     attach_configuration, get_configuration,
-                                    healed_context, RegionMedia)
+                                    healed_context, RegionMedia,
+                                    allows_deferred_rendering)
+from editregions.utils.registry import ChunkRenderer, get_chunk_renderer
+from editregions.utils.prefetch import prefetch_editregions
+from editregions.utils.concurrency import (concurrent_rendering_enabled,
+                                           get_render_pool, get_chunk_timeout,
+                                           get_region_timeout, run_in_thread)
+from editregions.utils.cache import (rendered_caching_enabled,
+                                     get_generation,
+                                     get_rendered_region, set_rendered_region,
+                                     chunk_caching_enabled,
+                                     get_chunk_cache_key, get_rendered_chunk,
+                                     set_rendered_chunk,
+                                     empty_caching_enabled, is_region_empty,
+                                     set_region_empty, get_inherited_cache_key,
+                                     get_inherited_distance,
+                                     set_inherited_distance)
 
 
 register = template.Library()
 logger = logging.getLogger(__name__)
 
 
-IterationData = namedtuple('IterationData', [
-    'counter0', 'counter', 'revcounter', 'revcounter0', 'first', 'last',
-    'total', 'region', 'remaining', 'used', 'object',  'previous_chunk',
-    'previous', 'previous0', 'next_chunk', 'next', 'next0'])
+class IterationData(object):
+    """
+    The `chunkloop` for each chunk being rendered, modelled on the
+    `forloop` Django provides.
+
+    Everything is calculated only when asked for, as most templates only use
+    one or two of the values, and `used` and `remaining` copy part of the
+    `iterable` each time they are asked for.
+    """
+    __slots__ = ('counter0', 'total', 'object', 'region', 'iterable')
+
+    _fields = ('counter0', 'counter', 'revcounter', 'revcounter0', 'first',
+               'last', 'total', 'region', 'remaining', 'used', 'object',
+               'previous_chunk', 'previous', 'previous0', 'next_chunk',
+               'next', 'next0')
+
+    def __init__(self, index, value, iterable):
+        self.counter0 = index
+        self.total = len(iterable)
+        self.object = value
+        self.region = getattr(value, 'region', None)
+        self.iterable = iterable
+
+    def __repr__(self):
+        return '<{mod}.{cls} counter={x.counter}, total={x.total}, ' \
+               'region={x.region}, object={x.object!r}>'.format(
+                   mod=self.__module__, cls=self.__class__.__name__, x=self)
+
+    def _asdict(self):
+        return dict((field, getattr(self, field)) for field in self._fields)
+
+    @property
+    def counter(self):
+        return self.counter0 + 1
+
+    @property
+    def revcounter(self):
+        return self.total - self.counter0
+
+    @property
+    def revcounter0(self):
+        return self.total - self.counter0 - 1
+
+    @property
+    def first(self):
+        return self.counter0 == 0
+
+    @property
+    def last(self):
+        return self.counter0 == (self.total - 1)
+
+    @property
+    def remaining(self):
+        return self.iterable[self.counter0 + 1:]
+
+    @property
+    def used(self):
+        return self.iterable[:self.counter0]
+
+    @property
+    def previous_chunk(self):
+        # negative indexes would get things from the other end of `iterable`
+        if self.counter0 < 1:
+            return None
+        return self.iterable[self.counter0 - 1]
+
+    @property
+    def previous(self):
+        if self.counter0 < 1:
+            return None
+        return self.counter0
+
+    @property
+    def previous0(self):
+        if self.counter0 < 1:
+            return None
+        return self.counter0 - 1
+
+    @property
+    def next_chunk(self):
+        if self.last:
+            return None
+        return self.iterable[self.counter0 + 1]
+
+    @property
+    def next(self):
+        if self.last:
+            return None
+        return self.counter0 + 1
+
+    @property
+    def next0(self):
+        if self.last:
+            return None
+        return self.counter0
 
 
 def render_one_chunk(context, chunk, extra, renderer=None):
@@ -36,15 +151,29 @@ def render_one_chunk(context, chunk, extra, renderer=None):
     # no render_into_region, TypeError for calling render_into_region because of
     # it being unbound method (got RequestContext instance instead))
     if renderer is None:
-        logger.debug('No renderer given as an argument, fetching the '
-                     'ModelAdmin instance for the first time')
-        renderer = get_modeladmin(chunk)
-    if not hasattr(renderer, 'render_into_region'):
+        renderer = get_chunk_renderer(chunk)
+    else:
+        renderer = ChunkRenderer.from_modeladmin(renderer)
+    if renderer.render_into_region is None:
         msg = ('{0.__class__!r} does not have a `render_into_region` '
-               'method'.format(renderer))
+               'method'.format(renderer.modeladmin))
         raise ImproperlyConfigured(msg)
-    return renderer.render_into_region(context=context, obj=chunk,
-                                       extra=extra)
+    cache_key = None
+    if (chunk_caching_enabled()
+            and renderer.get_editregions_cache_parts is not None):
+        parts = renderer.get_editregions_cache_parts(obj=chunk,
+                                                     context=context,
+                                                     extra=extra)
+        cache_key = get_chunk_cache_key(chunk=chunk, parts=parts)
+    if cache_key is not None:
+        output = get_rendered_chunk(cache_key)
+        if output is not None:
+            return output
+    output = renderer.render_into_region(context=context, obj=chunk,
+                                         extra=extra)
+    if cache_key is not None and output is not None:
+        set_rendered_chunk(cache_key, output)
+    return output
 
 
 def render_one_mediagroup(context, chunk, extra, renderer=None):
@@ -53,12 +182,13 @@ def render_one_mediagroup(context, chunk, extra, renderer=None):
     # no render_into_region, TypeError for calling render_into_region because of
     # it being unbound method (got RequestContext instance instead))
     if renderer is None:
-        logger.debug('No renderer given as an argument, fetching the '
-                     'ModelAdmin instance for the first time')
-        renderer = get_modeladmin(chunk)
-    if hasattr(renderer, 'render_into_mediagroup'):
-        return renderer.render_into_mediagroup(context=context, obj=chunk,
-                                               extra=extra)
+        renderer = get_chunk_renderer(chunk)
+        render_into_mediagroup = renderer.render_into_mediagroup
+    else:
+        render_into_mediagroup = getattr(renderer, 'render_into_mediagroup',
+                                         None)
+    if render_into_mediagroup is not None:
+        return render_into_mediagroup(context=context, obj=chunk, extra=extra)
     return None
 
 
@@ -68,73 +198,35 @@ def chunk_iteration_context(index, value, iterable):
     context items.
 
     Returns a dictionary whose key gets put into context, and whose values
-    are a namedtuple available to render_into_<region|summary> methods,
+    are an `IterationData` available to render_into_<region|summary> methods,
     as well as template instances.
     """
-    index_plus = index + 1
-    index_minus = index - 1
-    count = len(iterable)
-    iterdata = {
-        'counter0': index,
-        'counter': index_plus,
-        'revcounter': count - index,
-        'revcounter0': (count - index) - 1,
-        'first': index == 0,
-        'last': index == (count - 1),
-        'total': count,
-        'region': getattr(value, 'region', None),
-        'remaining': iterable[index_plus:],
-        'used': iterable[:index],
-        'object': value,
-        'previous_chunk': None,
-        'previous': None,
-        'previous0': None,
-        'next_chunk': None,
-        'next': None,
-        'next0': None,
-    }
-
-    try:
-        assert index_minus >= 0
-        iterdata.update(
-            previous_chunk=iterable[index_minus],
-            previous=index,
-            previous0=index_minus,
-        )
-    except AssertionError:
-        # If `index_minus` is less than 0, we want to change values, because
-        # minus numbers will still retrieve things from the `iterable`, only
-        # from the other end.
-        # Should be the first iteration, so no previous can exist.
-        pass
-
-    try:
-        iterdata.update(
-            next_chunk=iterable[index_plus],
-            next=index_plus,
-            next0=index
-        )
-    except IndexError:
-        # Unable to get anything from `plugins` at position `index`.
-        # Should be the last iteration, so there can be no next.
-        pass
-
-    return {'chunkloop': IterationData(**iterdata)}
-
-
-RenderedChunk = namedtuple('RenderedChunk', ['index', 'chunk', 'output'])
+    return {'chunkloop': IterationData(index=index, value=value,
+                                       iterable=iterable)}
+
+
+RenderedChunk = namedtuple('RenderedChunk',
+                           ['index', 'chunk', 'output', 'timed_out'])
+# only `render_all_chunks_concurrently` gives up on chunks.
+RenderedChunk.__new__.__defaults__ = (False,)
+
+
+def render_chunk(context, index, chunk, found_chunks,
+                 iter_func=chunk_iteration_context,
+                 render_func=render_one_chunk):
+    with healed_context(context) as new_ctx:
+        iteration = iter_func(index=index, value=chunk, iterable=found_chunks)
+        new_ctx.update(iteration)
+        return render_func(context=new_ctx, chunk=chunk, extra=iteration)
 
 
 def render_all_chunks(context, found_chunks, iter_func=chunk_iteration_context,
                       render_func=render_one_chunk):
     logger.info('Rendering {0} chunks'.format(len(found_chunks)))
     for index, chunk in enumerate(found_chunks):
-        # new_context = convert_context_to_dict(context)
-        with healed_context(context) as new_ctx:
-            iteration = iter_func(index=index, value=chunk,
-                                  iterable=found_chunks)
-            new_ctx.update(iteration)
-            output = render_func(context=new_ctx, chunk=chunk, extra=iteration)
+        output = render_chunk(context=context, index=index, chunk=chunk,
+                              found_chunks=found_chunks, iter_func=iter_func,
+                              render_func=render_func)
         # a chunk may return None if the ModelAdmin responsible for
         # rendering it doesn't implement the correct methods (instead
         # raising a warning to stderr), so we screen it all here.
@@ -142,6 +234,87 @@ def render_all_chunks(context, found_chunks, iter_func=chunk_iteration_context,
             yield RenderedChunk(index=index, chunk=chunk, output=output)
 
 
+def render_all_chunks_concurrently(context, found_chunks,
+                                   iter_func=chunk_iteration_context,
+                                   render_func=render_one_chunk):
+    """
+    Like `render_all_chunks`, except that chunks whose ModelAdmin sets
+    `render_concurrently` are handed to a thread pool before anything else is
+    rendered, with a copy of the context each.
+
+    Each of those has `EDITREGIONS_RENDER_CHUNK_TIMEOUT` seconds from being
+    handed over, and all of them have `EDITREGIONS_RENDER_REGION_TIMEOUT`
+    seconds in total, after which the ModelAdmin's
+    `render_into_region_timeout` output is used instead, marked as
+    `timed_out` so it isn't cached. Either way, the output is yielded in the
+    same order as `found_chunks`.
+    """
+    if not isinstance(context, BaseContext):
+        context = Context(context)
+    pool = get_render_pool()
+    language = get_language()
+    chunk_timeout = get_chunk_timeout()
+    region_deadline = time.time() + get_region_timeout()
+    pending = {}
+    for index, chunk in enumerate(found_chunks):
+        if not get_chunk_renderer(chunk).render_concurrently:
+            continue
+        iteration = iter_func(index=index, value=chunk, iterable=found_chunks)
+        new_ctx = copy(context)
+        new_ctx.update(iteration)
+        result = pool.apply_async(run_in_thread, kwds={
+            'func': render_func, 'language': language, 'context': new_ctx,
+            'chunk': chunk, 'extra': iteration})
+        deadline = min(time.time() + chunk_timeout, region_deadline)
+        pending[index] = (new_ctx, iteration, deadline, result)
+    logger.info('Rendering {0} chunks, {1} of them in threads'.format(
+        len(found_chunks), len(pending)))
+
+    for index, chunk in enumerate(found_chunks):
+        timed_out = False
+        if index not in pending:
+            output = render_chunk(context=context, index=index, chunk=chunk,
+                                  found_chunks=found_chunks,
+                                  iter_func=iter_func, render_func=render_func)
+        else:
+            new_ctx, iteration, deadline, result = pending[index]
+            try:
+                output = result.get(max(0, deadline - time.time()))
+            except ThreadTimeoutError:
+                logger.warning('{0!r} took too long to render'.format(chunk))
+                timed_out = True
+                renderer = get_chunk_renderer(chunk)
+                output = None
+                if renderer.render_into_region_timeout is not None:
+                    output = renderer.render_into_region_timeout(
+                        context=new_ctx, obj=chunk, extra=iteration)
+        if output is not None:
+            yield RenderedChunk(index=index, chunk=chunk, output=output,
+                                timed_out=timed_out)
+
+
+class KeywordsArgument(MultiValueArgument):
+    """
+    Any number of the given keywords, in any order, rather than a `Flag` for
+    each, which would only be recognised in the order they were declared.
+    Anything else is a syntax error.
+    """
+    def __init__(self, name, keywords):
+        super(KeywordsArgument, self).__init__(name, required=False,
+                                               resolve=False)
+        self.keywords = frozenset(keywords)
+
+    def parse(self, parser, token, tagname, kwargs):
+        keyword = token.lower()
+        if keyword not in self.keywords:
+            raise template.TemplateSyntaxError(
+                '"{tag}" does not understand "{token}", expected any of '
+                '{keywords}'.format(tag=tagname, token=token,
+                                    keywords=', '.join(sorted(self.keywords))))
+        return super(KeywordsArgument, self).parse(parser, keyword, tagname,
+                                                   kwargs)
+
+
 class EditRegionTag(Tag):
     """
     Output the contents of a region in a region group::
@@ -161,11 +334,16 @@ class EditRegionTag(Tag):
     """
     model = EditRegionChunk
     name = 'editregion'
+    #: whether the joined output may be stored in the cache, when
+    #: `EDITREGIONS_CACHE_RENDERED` is enabled.
+    cache_rendered = True
+    #: whether the `deferred` flag is honoured, rendering a placeholder to be
+    #: filled in from `editregions.views.render_region` instead.
+    deferrable = True
     options = Options(
         StringArgument('name', required=True, resolve=True),
         Argument('content_object', required=True, default=None, resolve=True),
-        Flag('inherit', true_values=['inherit'], case_sensitive=False,
-             default=False),
+        KeywordsArgument('keywords', keywords=('inherit', 'deferred')),
         blocks=[
             ('endeditregion', 'nodelist'),
         ]
@@ -185,18 +363,109 @@ class EditRegionTag(Tag):
             return False
         return True
 
-    def render_tag(self, context, name, content_object, inherit, nodelist=None):
+    def render_tag(self, context, name, content_object, keywords=(),
+                   nodelist=None):
         is_valid = self.do_validate(region_name=name,
                                     content_object=content_object)
         if not is_valid:
             return ''
+        inherit = 'inherit' in keywords
+        # the endpoint renders only the object's own chunks, without looking
+        # through its ancestors, so inherited regions are always inline.
+        if 'deferred' in keywords and self.deferrable and not inherit:
+            output = self.render_deferred(context=context, name=name,
+                                          content_object=content_object,
+                                          nodelist=nodelist)
+            if output is not None:
+                return output
+        content_type = None
+        # inherited output depends on the ancestors too, which aren't part of
+        # the cache key, so only this object's own regions are cached.
+        if self.cache_rendered and not inherit and rendered_caching_enabled():
+            content_type = self.get_content_type(content_object)
+        if content_type is not None:
+            # looked up once, so if a chunk is saved while rendering, what
+            # was rendered beforehand goes under the generation it's from.
+            generation = get_generation(content_type_id=content_type.pk,
+                                        content_id=content_object.pk)
+            output = get_rendered_region(content_type_id=content_type.pk,
+                                         content_id=content_object.pk,
+                                         region=name, generation=generation)
+            if output is None:
+                results = self.get_value(context=context, name=name,
+                                         content_object=content_object,
+                                         inherit=inherit, nodelist=nodelist)
+                output = self.join_output(results)
+                # a placeholder for a slow chunk mustn't outlive this render.
+                if not any(x.timed_out for x in results):
+                    set_rendered_region(content_type_id=content_type.pk,
+                                        content_id=content_object.pk,
+                                        region=name, output=output,
+                                        generation=generation)
+        else:
+            output = self.render_output(context=context, name=name,
+                                        content_object=content_object,
+                                        inherit=inherit, nodelist=nodelist)
+        # an empty region falls back to the contents of the block, if any.
+        if not output:
+            if nodelist:
+                return nodelist.render(context)
+            return ''
+        return output
+
+    def render_deferred(self, context, name, content_object, nodelist):
+        """
+        Output a placeholder, including the URL from which the rendered region
+        may be requested, and the contents of the block to show meanwhile.
+
+        Inherited regions aren't deferred, as the endpoint only renders the
+        object's own chunks.
+
+        :return: the placeholder HTML, or `None` if the endpoint isn't
+                 installed in the project's URLs, or would refuse to render
+                 the object, so the region should be rendered as normal.
+        """
+        content_type = self.get_content_type(content_object)
+        if content_type is None or content_object.pk is None:
+            return None
+        try:
+            modeladmin = get_modeladmin(content_object)
+        except (KeyError, ImproperlyConfigured):
+            modeladmin = None
+        if not allows_deferred_rendering(modeladmin):
+            logger.warning('Unable to defer rendering of "{0}" because the '
+                           'ModelAdmin for {1!r} does not implement '
+                           '`get_editregions_deferred_queryset`'.format(
+                               name, content_object.__class__))
+            return None
+        try:
+            url = reverse('editregions_render_region', kwargs={
+                'content_type': content_type.pk,
+                'content_id': content_object.pk,
+                'region': name,
+            })
+        except NoReverseMatch:
+            logger.warning('Unable to defer rendering of "{0}" because the '
+                           'editregions URLs are not installed'.format(name))
+            return None
+        fallback = ''
+        if nodelist:
+            fallback = nodelist.render(context)
+        with healed_context(context) as new_ctx:
+            new_ctx.update({'editregion': {'url': url, 'region': name,
+                                           'fallback': fallback}})
+            return render_to_string('editregions/deferred_region.html',
+                                    context_instance=new_ctx)
+
+    def render_output(self, context, name, content_object, inherit, nodelist):
         results = self.get_value(context=context, name=name,
                                  content_object=content_object, inherit=inherit,
                                  nodelist=nodelist)
+        return self.join_output(results)
+
+    def join_output(self, results):
         # covers None and (), []
         if not results:
-            if nodelist:
-                return nodelist.render(context)
             return ''
         return u'\n'.join(x.output for x in results)
 
@@ -236,6 +505,10 @@ class EditRegionTag(Tag):
             return None
 
     def do_render(self, context, results):
+        if concurrent_rendering_enabled():
+            return render_all_chunks_concurrently(
+                context=context, found_chunks=results,
+                render_func=render_one_chunk)
         return render_all_chunks(context=context, found_chunks=results,
                                  render_func=render_one_chunk)
 
@@ -259,11 +532,28 @@ class EditRegionTag(Tag):
         if content_type is None:
             return ()
 
-        # cache on the object so that showing the first editregion does the
-        # configuration request, and additional ones re-use the config found.
-        attach_configuration(content_object, EditRegionConfiguration)
-        erc = get_configuration(content_object)
-        results = self.fetch(erc, region=name)
+        cache_empty = (name and content_object.pk is not None
+                       and empty_caching_enabled())
+        generation = None
+        if cache_empty:
+            # looked up once, as for the rendered output in `render_tag`.
+            generation = get_generation(content_type_id=content_type.pk,
+                                        content_id=content_object.pk)
+        if cache_empty and is_region_empty(content_type_id=content_type.pk,
+                                           content_id=content_object.pk,
+                                           region=name, generation=generation):
+            results = ()
+        else:
+            # cache on the object so that showing the first editregion does
+            # the configuration request, and additional ones re-use the
+            # config found.
+            attach_configuration(content_object, EditRegionConfiguration)
+            erc = get_configuration(content_object)
+            results = self.fetch(erc, region=name)
+            if cache_empty and len(results) < 1:
+                set_region_empty(content_type_id=content_type.pk,
+                                 content_id=content_object.pk, region=name,
+                                 generation=generation)
         chunks = tuple(self.do_render(context, results))
         if inherit and len(chunks) < 1:
             chunks = self.get_ancestors_instead(context, name, content_object)
@@ -294,24 +584,96 @@ class EditRegionTag(Tag):
             logger.error(error, exc_info=1)
             return ()
 
+        parents = list(parents)
+        cache_key = None
+        if empty_caching_enabled() and content_object.pk is not None:
+            ancestors = [(get_content_type(parent).pk, parent.pk)
+                         for parent in reversed(parents)]
+            cache_key = get_inherited_cache_key(
+                content_type_id=get_content_type(content_object).pk,
+                content_id=content_object.pk, region=region_name,
+                ancestors=ancestors)
+            distance = get_inherited_distance(cache_key)
+            if distance == 0:
+                logging.debug("Inheriting from an ancestor previously "
+                              "yielded nothing")
+                return ()
+            if distance is not None and distance <= len(parents):
+                chunks = self.get_ancestor_chunks(context, region_name,
+                                                  parents[-distance])
+                if len(chunks) > 0:
+                    return chunks
+                # it rendered nothing this time, so look at all of them.
+
+        chunks, distance = self.find_nearest_ancestor(context, region_name,
+                                                      parents)
+        timed_out = any(x.timed_out for x in chunks)
+        if cache_key is not None and not timed_out:
+            set_inherited_distance(cache_key, distance)
+        return chunks
+
+    def get_ancestor_chunks(self, context, region_name, parent):
+        attach_configuration(parent, EditRegionConfiguration)
+        parent_erc = get_configuration(parent)
+        parent_results = self.fetch(parent_erc, region=region_name)
+        return tuple(self.do_render(context, parent_results))
+
+    def find_nearest_ancestor(self, context, region_name, parents):
+        """
+        :return: a 2-tuple of the rendered chunks, and how many ancestors
+                 away they were found, which is `0` if none had any.
+        """
+        # fetch the region for every ancestor up front, which is one query
+        # per type of ancestor, rather than one per ancestor visited.
+        parents = prefetch_editregions(parents, regions=(region_name,))
+
         # if there are parents, see if we can get values from them.
         for distance, parent in enumerate(reversed(parents), start=1):
-            attach_configuration(parent, EditRegionConfiguration)
-            parent_erc = get_configuration(parent)
-            parent_results = self.fetch(parent_erc, region=region_name)
-            chunks = tuple(self.do_render(context, parent_results))
+            chunks = self.get_ancestor_chunks(context, region_name, parent)
             chunk_count = len(chunks)
             if chunk_count > 0:
                 logging.info("Found {1} chunks after {0} iterations over "
                              "objects in `get_ancestors`".format(
                                  distance, chunk_count))
                 # stop processing further, we found some results!
-                return chunks
+                return chunks, distance
         logging.debug("Inheriting from an ancestor yielded nothing")
-        return ()
+        return (), 0
 register.tag(EditRegionTag.name, EditRegionTag)
 
 
+class EditRegionPrefetchTag(Tag):
+    """
+    Fetch the chunks for some regions of an object, or a list of objects, in
+    one go ahead of rendering them, joining only the models those regions
+    allow::
+
+        {% load editregion %}
+        {% editregions_prefetch object 'main' 'sidebar' %}
+        {% editregions_prefetch object_list 'teaser' %}
+
+    Without any region names, every configured region is fetched.
+    """
+    name = 'editregions_prefetch'
+    options = Options(
+        Argument('content_object', required=True, default=None, resolve=True),
+        MultiValueArgument('regions', required=False, resolve=True),
+    )
+
+    def render_tag(self, context, content_object, regions):
+        if content_object is None:
+            logger.error('Nothing given to `{0}`'.format(self.name))
+            if settings.DEBUG:
+                raise ImproperlyConfigured(ttag_no_obj % {
+                    'tagname': self.name, 'region': ', '.join(regions or ())})
+            return ''
+        if hasattr(content_object, '_meta'):
+            content_object = (content_object,)
+        prefetch_editregions(content_object, regions=regions or None)
+        return ''
+register.tag(EditRegionPrefetchTag.name, EditRegionPrefetchTag)
+
+
 class GetEditRegionAsTag(EditRegionTag, AsTag):
     model = EditRegionChunk
     name = 'get_editregion'
@@ -343,6 +705,9 @@ register.tag(GetEditRegionAsTag.name, GetEditRegionAsTag)
 
 
 class EditRegionMediaTag(EditRegionTag):
+    cache_rendered = False
+    deferrable = False
+
     def do_render(self, context, results):
         the_media = RegionMedia()
         for datadict in render_all_chunks(context=context,
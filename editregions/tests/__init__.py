@@ -9,6 +9,11 @@ from .querying import *
 from .views import *
 
 
+from .management.commands.backfill_editregions_chunk_types import *
+from .management.commands.clear_editregions_caches import *
+from .management.commands.compile_editregions_config import *
+
+
 from .admin.changelist import *
 from .admin.forms import *
 from .admin.inlines import *
@@ -16,8 +21,16 @@ from .admin.modeladmins import *
 from .admin.utils import *
 
 
+from .utils.cache import *
+from .utils.chunktypes import *
+from .utils.compiled import *
+from .utils.concurrency import *
 from .utils.data import *
+from .utils.planner import *
+from .utils.prefetch import *
 from .utils.regions import *
+from .utils.registry import *
+from .utils.templates import *
 from .utils.versioning import *
 
 
@@ -31,6 +44,10 @@ from .contrib.embeds.models import *
 from .contrib.embeds.utils import *
 
 
+from .contrib.layouts.models import *
+from .contrib.layouts.utils import *
+
+
 from .contrib.search.admin import *
 from .contrib.search.forms import *
 from .contrib.search.models import *
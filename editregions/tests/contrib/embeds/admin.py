@@ -63,6 +63,11 @@ class FeedAdminTestCase(DjangoTestCase):
         self.assertIn('<span>Sample Feed</span>',
                       theadmin.render_into_region(obj=obj, context=context))
 
+    def test_output_not_cacheable(self):
+        theadmin = get_modeladmin(self.model)
+        self.assertIsNone(theadmin.get_editregions_cache_parts(
+            obj=self.model(), context=Context()))
+
     def test_save_model(self):
         theadmin = get_modeladmin(self.model)
         obj = self.model(position=1)
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+from django.core.exceptions import ValidationError
+try:
+    from unittest.case import TestCase
+except ImportError:
+    from django.utils.unittest.case import TestCase
+from editregions.contrib.layouts.models import validate_layout_regions
+
+
+class ValidateLayoutRegionsTestCase(TestCase):
+    def test_valid(self):
+        validate_layout_regions('{"test": {"name": "Test", "models": '
+                                '{"embeds.Iframe": null}}}')
+        validate_layout_regions('{}')
+
+    def test_not_json(self):
+        with self.assertRaises(ValidationError):
+            validate_layout_regions('test')
+
+    def test_not_an_object(self):
+        with self.assertRaises(ValidationError):
+            validate_layout_regions('[]')
+        with self.assertRaises(ValidationError):
+            validate_layout_regions('{"test": []}')
+
+    def test_bad_region_name(self):
+        with self.assertRaises(ValidationError):
+            validate_layout_regions('{"te st": {}}')
+
+    def test_bad_models(self):
+        with self.assertRaises(ValidationError):
+            validate_layout_regions('{"test": {"models": {"embeds.Nope": 1}}}')
+        with self.assertRaises(ValidationError):
+            validate_layout_regions('{"test": {"models": {"embeds": 1}}}')
+
+    def test_models_not_an_object(self):
+        with self.assertRaises(ValidationError):
+            validate_layout_regions('{"test": {"models": 5}}')
+        with self.assertRaises(ValidationError):
+            validate_layout_regions('{"test": {"models": ["embeds.Iframe"]}}')
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+from django.contrib import admin
+from django.contrib.admin.sites import NotRegistered
+from django.contrib.auth.admin import UserAdmin
+from django.contrib.auth.models import User
+from django.test import TestCase as DjangoTestCase
+from editregions.contrib.embeds.models import Iframe
+from editregions.contrib.layouts.admin import SupportsLayouts
+from editregions.contrib.layouts.models import Layout, LayoutAssignment
+from editregions.contrib.layouts.utils import get_layout
+from editregions.models import EditRegionConfiguration
+from editregions.utils.cache import get_editregions_cache
+from editregions.utils.data import get_content_type
+
+
+class LayoutUserAdmin(SupportsLayouts, UserAdmin):
+    def get_editregions_templates(self, obj):
+        return ['sample_editregion_template.html']
+
+
+class GetLayoutTestCase(DjangoTestCase):
+    def setUp(self):
+        get_editregions_cache().clear()
+        try:
+            admin.site.unregister(User)
+        except NotRegistered:
+            pass
+        admin.site.register(User, LayoutUserAdmin)
+        self.ct = get_content_type(User)
+        self.users = []
+        for x in range(0, 2):
+            user = User(username='test{0}'.format(x))
+            user.set_password('test')
+            user.full_clean()
+            user.save()
+            self.users.append(user)
+        self.layout = Layout.objects.create(
+            name='all users',
+            regions='{"test": {"name": "Test", '
+                    '"models": {"embeds.Iframe": 2}}}')
+
+    def tearDown(self):
+        admin.site.unregister(User)
+
+    def assign(self, layout, content_id=''):
+        return LayoutAssignment.objects.create(
+            layout=layout, content_type=self.ct, content_id=content_id)
+
+    def test_no_layout(self):
+        self.assertIsNone(get_layout(self.users[0]))
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_layout(self.users[0]))
+
+    def test_for_content_type(self):
+        self.assign(self.layout)
+        name, config = get_layout(self.users[0])
+        self.assertEqual(config['test']['models'], {'embeds.Iframe': 2})
+        self.assertEqual((name, config), get_layout(self.users[1]))
+
+    def test_for_object_preferred(self):
+        self.assign(self.layout)
+        other = Layout.objects.create(name='one user', regions='{"x": {}}')
+        self.assign(other, content_id=str(self.users[1].pk))
+        self.assertIn('test', get_layout(self.users[0])[1])
+        self.assertIn('x', get_layout(self.users[1])[1])
+
+    def test_cached(self):
+        self.assign(self.layout)
+        first = get_layout(self.users[0])
+        with self.assertNumQueries(0):
+            second = get_layout(self.users[0])
+        self.assertIs(first[1], second[1])
+
+    def test_forgotten_when_changed(self):
+        self.assign(self.layout)
+        first = get_layout(self.users[0])
+        self.layout.regions = '{"changed": {}}'
+        self.layout.save()
+        second = get_layout(self.users[0])
+        self.assertNotEqual(first[0], second[0])
+        self.assertIn('changed', second[1])
+
+    def test_configuration_uses_layout(self):
+        self.assign(self.layout)
+        first = EditRegionConfiguration(obj=self.users[0])
+        second = EditRegionConfiguration(obj=self.users[1])
+        self.assertTrue(first.has_configuration)
+        self.assertEqual(first.config['test'], {'name': 'Test',
+                                                'models': {Iframe: 2}})
+        self.assertIs(first.config, second.config)
+
+    def test_configuration_without_layout_uses_template(self):
+        conf = EditRegionConfiguration(obj=self.users[0])
+        self.assertTrue(conf.has_configuration)
+        self.assertEqual(conf.config, {})
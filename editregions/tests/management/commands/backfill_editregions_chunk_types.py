@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase as DjangoTestCase
+try:
+    from django.utils.six import StringIO
+except ImportError:  # pragma: no cover ... Python 2, Django < 1.5
+    from StringIO import StringIO
+from editregions.contrib.embeds.models import Iframe
+from editregions.models import EditRegionChunk
+from editregions.utils.data import get_content_type
+
+
+class BackfillEditRegionsChunkTypesTestCase(DjangoTestCase):
+    def test_backfilled(self):
+        iframe = Iframe(region='test', content_id='1', position=0,
+                        content_type=get_content_type(User),
+                        url='https://news.bbc.co.uk/')
+        iframe.save()
+        EditRegionChunk.objects.update(chunk_type=None)
+        out = StringIO()
+        call_command('backfill_editregions_chunk_types', stdout=out)
+        self.assertIn('Updated', out.getvalue())
+        self.assertEqual(EditRegionChunk.objects.get().chunk_type,
+                         get_content_type(Iframe))
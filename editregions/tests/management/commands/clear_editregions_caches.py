@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+from django.core.management import call_command
+from django.template import TemplateDoesNotExist
+from django.test import TestCase as DjangoTestCase
+from django.test.utils import override_settings
+try:
+    from django.utils.six import StringIO
+except ImportError:  # pragma: no cover ... Python 2, Django < 1.5
+    from StringIO import StringIO
+from editregions.models import EditRegionConfiguration
+from editregions.utils.cache import get_configuration_version
+from editregions.utils.templates import (select_existing_template,
+                                         is_template_missing)
+
+
+class ClearEditRegionsCachesTestCase(DjangoTestCase):
+    @override_settings(DEBUG=False)
+    def test_cleared(self):
+        with self.assertRaises(TemplateDoesNotExist):
+            select_existing_template('editregions/nope.html')
+        conf = EditRegionConfiguration()
+        conf.set_template('fillable_editregion_template.html')
+        out = StringIO()
+        call_command('clear_editregions_caches', stdout=out)
+        self.assertIn('Cleared', out.getvalue())
+        self.assertFalse(is_template_missing('editregions/nope.html'))
+        again = EditRegionConfiguration()
+        again.set_template('fillable_editregion_template.html')
+        self.assertIsNot(conf.config, again.config)
+        self.assertEqual(conf.config, again.config)
+
+    def test_version_changed(self):
+        version = get_configuration_version()
+        call_command('clear_editregions_caches', stdout=StringIO())
+        self.assertNotEqual(version, get_configuration_version())
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase as DjangoTestCase
+try:
+    from django.utils.six import StringIO
+except ImportError:  # pragma: no cover ... Python 2, Django < 1.5
+    from StringIO import StringIO
+from editregions.utils.compiled import load_compiled_configs
+
+
+class CompileEditRegionsConfigTestCase(DjangoTestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.marshal')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_compiled(self):
+        out = StringIO()
+        call_command('compile_editregions_config', self.path, stdout=out,
+                     stderr=StringIO())
+        self.assertIn('Compiled', out.getvalue())
+        with open(self.path, 'rb') as f:
+            configs = load_compiled_configs(f.read())
+        self.assertEqual(configs['fillable_editregion_template.json'], {
+            'test': {'name': 'whee!', 'models': {'embeds.Iframe': None}},
+        })
+        self.assertEqual(configs['sample_editregion_template.json'], {})
+
+    def test_broken_templates_skipped(self):
+        directory = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(directory, 'broken.json'), 'w') as f:
+                f.write('{% if %}')
+            with open(os.path.join(directory, 'unrelated.json'), 'w') as f:
+                f.write('[1, 2, 3]')
+            with open(os.path.join(directory, 'invalid.json'), 'w') as f:
+                f.write('{"test": ')
+            err = StringIO()
+            dirs = (directory,) + tuple(settings.TEMPLATE_DIRS)
+            with self.settings(TEMPLATE_DIRS=dirs):
+                call_command('compile_editregions_config', self.path,
+                             stdout=StringIO(), stderr=err)
+        finally:
+            shutil.rmtree(directory)
+        for name in ('broken.json', 'unrelated.json', 'invalid.json'):
+            self.assertIn('Skipping {0}'.format(name), err.getvalue())
+        with open(self.path, 'rb') as f:
+            configs = load_compiled_configs(f.read())
+        self.assertIn('fillable_editregion_template.json', configs)
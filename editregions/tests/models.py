@@ -1,5 +1,9 @@
 # -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
 from uuid import uuid4
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.admin.sites import NotRegistered
 from django.contrib.auth.admin import UserAdmin
@@ -17,7 +21,8 @@ from django.test import TestCase as DjangoTestCase
 from model_utils.managers import (PassThroughManager, InheritanceManager,
                                   InheritanceQuerySet)
 from editregions.contrib.embeds.models import Iframe
-from editregions.models import EditRegionChunk, EditRegionConfiguration
+from editregions.models import (EditRegionChunk, EditRegionConfiguration,
+                                clear_render_plans, clear_decoded_configs)
 from editregions.utils.data import get_content_type
 from django.contrib.auth.models import User, Group, Permission
 
@@ -378,6 +383,26 @@ class EditRegionConfigurationTestCase(DjangoTestCase):
         results = blank_conf.fetch_chunks()
         self.assertEqual(dict(results), {u'y': [], u'x': [], u'z': []})
 
+    def test_fetch_chunks_for_region_mode(self):
+        user, created = User.objects.get_or_create(username='test')
+        blank_conf = EditRegionConfiguration(obj=user)
+        template = Template('''{
+            "x": {},
+            "y": {},
+            "z": {}
+        }''')
+        blank_conf.raw_config = blank_conf.decode_template_region_configuration(
+            template_instance=template)
+        blank_conf.config = blank_conf.get_template_region_configuration(
+            raw_data=blank_conf.raw_config)
+        with self.settings(EDITREGIONS_FETCH_MODE='region'):
+            results = blank_conf.fetch_chunks_for(region='x')
+        self.assertEqual([], results)
+        self.assertFalse(blank_conf.has_fetched_all_regions())
+        results = blank_conf.fetch_chunks()
+        self.assertEqual(dict(results), {u'y': [], u'x': [], u'z': []})
+        self.assertTrue(blank_conf.has_fetched_all_regions())
+
     def test_json_serializer(self):
         user, created = User.objects.get_or_create(username='test')
         blank_conf = EditRegionConfiguration(obj=user)
@@ -581,3 +606,145 @@ class EditRegionConfigurationOperatorsTestCase(TestCase):
 
         blank_conf2 = EditRegionConfiguration()
         self.assertFalse(blank_conf2)
+
+
+class RenderPlanTestCase(TestCase):
+    def setUp(self):
+        clear_render_plans()
+
+    def tearDown(self):
+        clear_render_plans()
+
+    def test_shared_between_configurations(self):
+        first = EditRegionConfiguration()
+        first.set_template('fillable_editregion_template.html')
+        second = EditRegionConfiguration()
+        second.set_template('fillable_editregion_template.html')
+        self.assertIs(first.config, second.config)
+        self.assertIs(first.raw_config, second.raw_config)
+        self.assertEqual(first.config['test']['models'], {Iframe: None})
+
+    def test_frozen(self):
+        conf = EditRegionConfiguration()
+        conf.set_template('fillable_editregion_template.html')
+        with self.assertRaises(TypeError):
+            conf.config['test']['models'][User] = 1
+        with self.assertRaises(TypeError):
+            conf.raw_config['test'] = {}
+
+    def test_replacing_config_not_shared(self):
+        first = EditRegionConfiguration()
+        first.set_template('fillable_editregion_template.html')
+        second = EditRegionConfiguration()
+        second.set_template('fillable_editregion_template.html')
+        second.config = {}
+        self.assertEqual(second.config, {})
+        self.assertEqual(first.config['test']['name'], 'whee!')
+        self.assertIs(first.raw_config, second.raw_config)
+
+    def test_rebuilt_if_template_changes(self):
+        conf = EditRegionConfiguration()
+        template = conf.get_first_valid_template(
+            'fillable_editregion_template.html')
+        raw_config = conf.decode_template_region_configuration(
+            template_instance=template)
+        plan = conf.get_render_plan(template_instance=template,
+                                    raw_config=raw_config)
+        changed = conf.get_render_plan(template_instance=template,
+                                       raw_config={'x': {}})
+        self.assertIsNot(plan, changed)
+        self.assertEqual(changed.config['x'], {'name': 'x', 'models': {}})
+
+    def test_not_shared_between_classes(self):
+        class NamelessConfiguration(EditRegionConfiguration):
+            def get_template_region_configuration(self, raw_data):
+                parent = super(NamelessConfiguration, self)
+                config = parent.get_template_region_configuration(
+                    raw_data=raw_data)
+                for region in config.values():
+                    region['name'] = ''
+                return config
+        first = EditRegionConfiguration()
+        first.set_template('fillable_editregion_template.html')
+        second = NamelessConfiguration()
+        second.set_template('fillable_editregion_template.html')
+        self.assertIsNot(first.config, second.config)
+        self.assertEqual(first.config['test']['name'], 'whee!')
+        self.assertEqual(second.config['test']['name'], '')
+
+    def test_unnamed_template_not_kept(self):
+        conf = EditRegionConfiguration()
+        first = conf.get_render_plan(template_instance=None, raw_config={})
+        second = conf.get_render_plan(template_instance=None, raw_config={})
+        self.assertIsNot(first, second)
+
+
+class FakeOrigin(object):
+    def __init__(self, name):
+        self.name = name
+
+
+class DecodedConfigCacheTestCase(TestCase):
+    def setUp(self):
+        clear_decoded_configs()
+        self.conf = EditRegionConfiguration()
+        self.template = self.conf.get_first_valid_template(
+            'fillable_editregion_template.html')
+
+    def tearDown(self):
+        clear_decoded_configs()
+
+    def decode(self):
+        return self.conf.decode_template_region_configuration(
+            template_instance=self.template)
+
+    @override_settings(DEBUG=False)
+    def test_decoded_once(self):
+        first = self.decode()
+        self.assertIs(first, self.decode())
+        self.assertEqual(first, self.conf.decode_template(
+            template_instance=self.template))
+
+    @override_settings(DEBUG=False)
+    def test_cleared(self):
+        first = self.decode()
+        clear_decoded_configs()
+        second = self.decode()
+        self.assertIsNot(first, second)
+        self.assertEqual(first, second)
+
+    @override_settings(DEBUG=True)
+    def test_debug_without_origin(self):
+        self.template.origin = None
+        self.assertIsNot(self.decode(), self.decode())
+
+    def test_debug_checks_modification_time(self):
+        directory = tempfile.mkdtemp()
+        name = '{0}.json'.format(uuid4().hex)
+        path = os.path.join(directory, name)
+        with open(path, 'w') as f:
+            f.write('{"test": {}}')
+        dirs = (directory,) + tuple(settings.TEMPLATE_DIRS)
+        try:
+            with override_settings(DEBUG=True, TEMPLATE_DEBUG=True,
+                                   TEMPLATE_DIRS=dirs):
+                self.template = self.conf.get_first_valid_template(name)
+                # Django < 1.7 doesn't keep where templates were loaded from.
+                if not hasattr(self.template, 'origin'):
+                    self.template.origin = FakeOrigin(name=path)
+                self.assertEqual(path, self.template.origin.name)
+                first = self.decode()
+                self.assertIs(first, self.decode())
+                mtime = os.path.getmtime(path)
+                os.utime(path, (mtime + 10, mtime + 10))
+                self.assertIsNot(first, self.decode())
+        finally:
+            shutil.rmtree(directory)
+
+    def test_string_templates_not_kept(self):
+        template = Template('{"test": {}}')
+        first = self.conf.decode_template_region_configuration(
+            template_instance=template)
+        second = self.conf.decode_template_region_configuration(
+            template_instance=template)
+        self.assertIsNot(first, second)
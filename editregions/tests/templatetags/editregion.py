@@ -1,19 +1,24 @@
 # -*- coding: utf-8 -*-
 from collections import namedtuple
+import time
 from django.contrib import admin
 from django.contrib.admin.sites import NotRegistered
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import User
 from django.core.exceptions import ImproperlyConfigured
-from django.template import Template, RequestContext, Context
+from django.core.urlresolvers import reverse
+from django.template import (Template, RequestContext, Context,
+                             TemplateSyntaxError)
 from django.test import TestCase as DjangoTestCase, RequestFactory
 from django.test.utils import override_settings
 from editregions.contrib.embeds.admin import IframeAdmin
 from editregions.contrib.embeds.models import Iframe
 from editregions.models import EditRegionChunk
 from editregions.utils.data import get_content_type
+from editregions.utils.cache import get_editregions_cache
 from editregions.utils.versioning import is_django_15plus
-from editregions.templatetags.editregion import (chunk_iteration_context,
+from editregions.templatetags.editregion import (EditRegionTag,
+                                                 chunk_iteration_context,
                                                  render_one_chunk,
                                                  render_all_chunks)
 
@@ -23,6 +28,36 @@ class TestUserAdmin(UserAdmin):
         return ['fillable_editregion_template.html']
 
 
+class DeferredUserAdmin(TestUserAdmin):
+    def get_editregions_deferred_queryset(self, request):
+        return User.objects.all()
+
+
+class SlowIframeAdmin(IframeAdmin):
+    render_concurrently = True
+    slow = True
+
+    def render_into_region(self, obj, context, **kwargs):
+        if self.slow:
+            time.sleep(0.5)
+        return super(SlowIframeAdmin, self).render_into_region(
+            obj=obj, context=context, **kwargs)
+
+
+class SavingIframeAdmin(IframeAdmin):
+    """
+    Saves another chunk to the same object while rendering the first, as
+    an editor in another request might.
+    """
+    def render_into_region(self, obj, context, **kwargs):
+        if not Iframe.objects.filter(url='https://news.bbc.co.uk/new').exists():
+            Iframe.objects.create(region=obj.region, content_id=obj.content_id,
+                                  content_type=obj.content_type, position=99,
+                                  url='https://news.bbc.co.uk/new')
+        return super(SavingIframeAdmin, self).render_into_region(
+            obj=obj, context=context, **kwargs)
+
+
 class EditRegionTemplateTagTestCase(DjangoTestCase):
     def setUp(self):
         self.ct = get_content_type(User)
@@ -154,6 +189,19 @@ class EditRegionTemplateTagTestCase(DjangoTestCase):
                              len(iterable) - (offset+1))
             self.assertEqual(ctx['chunkloop'].remaining, iterable[offset+1:])
 
+    def test_chunk_iteration_context_asdict(self):
+        FakeChunk = namedtuple('FakedChunk', ['region', 'position'])
+        iterable = [FakeChunk(region='test', position=x) for x in range(0, 3)]
+        ctx = chunk_iteration_context(index=1, value=iterable[1],
+                                      iterable=iterable)
+        data = ctx['chunkloop']._asdict()
+        self.assertEqual(sorted(data.keys()),
+                         sorted(ctx['chunkloop']._fields))
+        self.assertEqual(data['previous_chunk'], iterable[0])
+        self.assertEqual(data['next_chunk'], iterable[2])
+        self.assertEqual(data['used'], iterable[:1])
+        self.assertEqual(data['remaining'], iterable[2:])
+
     def test_usage(self):
         tmpl = Template("""
         output:
@@ -331,3 +379,250 @@ class EditRegionTemplateTagTestCase(DjangoTestCase):
             self.assertIn('name="chunk-iframe-{0}" data-pk="{0}" '
                           'data-position="{0}" data-region="{1}"'.format(
                               x, 'test'), rendered)
+
+    def test_inheritance_fetches_ancestors_at_once(self):
+        users = []
+        for x in range(0, 4):
+            user = User(username='test{0}'.format(x))
+            user.set_password('test')
+            user.full_clean()
+            user.save()
+            users.append(user)
+        root, child = users[0], users[-1]
+        iframe = Iframe(region='test', content_id=root.pk,
+                        content_type=get_content_type(User),
+                        url='https://news.bbc.co.uk/', position=1)
+        iframe.full_clean()
+        iframe.save()
+        # root first, nearest last, as mptt & treebeard do.
+        child.get_ancestors = lambda: users[:-1]
+
+        try:
+            admin.site.unregister(User)
+        except NotRegistered:
+            pass
+        admin.site.register(User, TestUserAdmin)
+
+        tmpl = Template("""
+        {% load editregion %}
+        {% editregion "test" obj inherit %}fallback{% endeditregion %}
+        """)
+        # one for the child's chunks, one for all the ancestors'.
+        with self.assertNumQueries(2):
+            rendered = tmpl.render(Context({'obj': child})).strip()
+        self.assertIn('src="https://news.bbc.co.uk/"', rendered)
+
+
+class EditRegionTagCachingTestCase(DjangoTestCase):
+    def setUp(self):
+        get_editregions_cache().clear()
+        user = User(username='test', is_staff=True, is_active=True,
+                    is_superuser=True)
+        user.set_password('test')
+        user.full_clean()
+        user.save()
+        for x in range(1, 4):
+            iframe = Iframe(region='test', content_id=user.pk,
+                            content_type=get_content_type(User),
+                            url='https://news.bbc.co.uk/{0!s}'.format(x),
+                            position=x)
+            iframe.full_clean()
+            iframe.save()
+        try:
+            admin.site.unregister(User)
+        except NotRegistered:
+            pass
+        admin.site.register(User, TestUserAdmin)
+        self.user = user
+        self.template = Template("""
+        {% load editregion %}
+        {% editregion "test" obj %}fallback{% endeditregion %}
+        """)
+
+    def render(self):
+        # a new instance each time, so no configuration is attached to it.
+        obj = User.objects.get(pk=self.user.pk)
+        return self.template.render(Context({'obj': obj})).strip()
+
+    @override_settings(EDITREGIONS_CACHE_RENDERED=True)
+    def test_output_is_reused(self):
+        first = self.render()
+        self.assertIn('src="https://news.bbc.co.uk/1"', first)
+        with self.assertNumQueries(1):
+            # just the parent lookup in `render`
+            second = self.render()
+        self.assertEqual(first, second)
+
+    @override_settings(EDITREGIONS_CACHE_RENDERED=True)
+    def test_output_is_invalidated(self):
+        first = self.render()
+        Iframe.objects.filter(pk=1).delete()
+        second = self.render()
+        self.assertNotEqual(first, second)
+        self.assertNotIn('src="https://news.bbc.co.uk/1"', second)
+
+    @override_settings(EDITREGIONS_CACHE_RENDERED=True)
+    def test_saved_while_rendering(self):
+        previous = admin.site._registry.get(Iframe, None)
+        admin.site._registry[Iframe] = SavingIframeAdmin(Iframe, admin.site)
+        try:
+            first = self.render()
+            second = self.render()
+        finally:
+            admin.site._registry[Iframe] = previous
+        self.assertNotIn('src="https://news.bbc.co.uk/new"', first)
+        self.assertIn('src="https://news.bbc.co.uk/new"', second)
+
+    @override_settings(EDITREGIONS_CACHE_RENDERED=True,
+                       EDITREGIONS_RENDER_CONCURRENTLY=True,
+                       EDITREGIONS_RENDER_CHUNK_TIMEOUT=0.1)
+    def test_timed_out_output_not_cached(self):
+        previous = admin.site._registry.get(Iframe, None)
+        admin.site._registry[Iframe] = SlowIframeAdmin(Iframe, admin.site)
+        try:
+            first = self.render()
+            self.assertIn('took too long to render', first)
+            admin.site._registry[Iframe].slow = False
+            second = self.render()
+        finally:
+            admin.site._registry[Iframe] = previous
+        self.assertNotIn('took too long to render', second)
+        self.assertIn('src="https://news.bbc.co.uk/1"', second)
+
+    @override_settings(EDITREGIONS_CACHE_RENDERED=False)
+    def test_output_not_cached_when_disabled(self):
+        self.render()
+        with self.assertNumQueries(2):
+            self.render()
+
+    @override_settings(EDITREGIONS_CACHE_EMPTY=True)
+    def test_empty_region_remembered(self):
+        Iframe.objects.all().delete()
+        self.assertEqual('fallback', self.render())
+        with self.assertNumQueries(1):
+            # just the parent lookup in `render`
+            self.assertEqual('fallback', self.render())
+
+    @override_settings(EDITREGIONS_CACHE_EMPTY=True)
+    def test_chunk_added_while_fetching(self):
+        Iframe.objects.all().delete()
+        fetch = EditRegionTag.fetch
+        user = self.user
+
+        def fetch_then_add(tag, config, region):
+            results = fetch(tag, config, region)
+            Iframe.objects.create(region='test', content_id=user.pk,
+                                  content_type=get_content_type(User),
+                                  url='https://news.bbc.co.uk/', position=1)
+            return results
+        EditRegionTag.fetch = fetch_then_add
+        try:
+            self.assertEqual('fallback', self.render())
+        finally:
+            EditRegionTag.fetch = fetch
+        self.assertIn('src="https://news.bbc.co.uk/"', self.render())
+
+    @override_settings(EDITREGIONS_CACHE_EMPTY=True)
+    def test_empty_region_forgotten_when_chunk_added(self):
+        Iframe.objects.all().delete()
+        self.assertEqual('fallback', self.render())
+        iframe = Iframe(region='test', content_id=self.user.pk,
+                        content_type=get_content_type(User),
+                        url='https://news.bbc.co.uk/', position=1)
+        iframe.full_clean()
+        iframe.save()
+        self.assertIn('src="https://news.bbc.co.uk/"', self.render())
+
+
+class EditRegionTagDeferredTestCase(DjangoTestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='test')
+        iframe = Iframe(region='test', content_id=self.user.pk,
+                        content_type=get_content_type(User), position=1,
+                        url='https://news.bbc.co.uk/')
+        iframe.full_clean()
+        iframe.save()
+        try:
+            admin.site.unregister(User)
+        except NotRegistered:
+            pass
+        admin.site.register(User, DeferredUserAdmin)
+
+    def render(self, template):
+        tmpl = Template("{% load editregion %}" + template)
+        return tmpl.render(Context({'obj': self.user})).strip()
+
+    def test_placeholder(self):
+        rendered = self.render('{% editregion "test" obj deferred %}'
+                               'loading{% endeditregion %}')
+        url = reverse('editregions_render_region', kwargs={
+            'content_type': get_content_type(User).pk,
+            'content_id': self.user.pk, 'region': 'test'})
+        self.assertIn('data-editregion-url="{0}"'.format(url), rendered)
+        self.assertIn('data-editregion-region="test"', rendered)
+        self.assertIn('>loading</div>', rendered)
+        self.assertNotIn('<iframe', rendered)
+
+    def test_not_deferred_without_deferred_queryset(self):
+        # the view would refuse to render it, so it's rendered here instead.
+        admin.site.unregister(User)
+        admin.site.register(User, TestUserAdmin)
+        rendered = self.render('{% editregion "test" obj deferred %}'
+                               'loading{% endeditregion %}')
+        self.assertNotIn('data-editregion-url', rendered)
+        self.assertIn('<iframe', rendered)
+
+    def test_inherit_is_not_deferred(self):
+        rendered = self.render('{% editregion "test" obj inherit deferred %}'
+                               '{% endeditregion %}')
+        self.assertNotIn('data-editregion-url', rendered)
+        self.assertIn('<iframe', rendered)
+
+    def test_keywords_in_any_order(self):
+        rendered = self.render('{% editregion "test" obj deferred inherit %}'
+                               '{% endeditregion %}')
+        self.assertNotIn('data-editregion-url', rendered)
+        self.assertIn('<iframe', rendered)
+
+    def test_unknown_keyword(self):
+        with self.assertRaises(TemplateSyntaxError):
+            self.render('{% editregion "test" obj later %}{% endeditregion %}')
+
+
+class EditRegionPrefetchTagTestCase(DjangoTestCase):
+    def setUp(self):
+        self.users = []
+        for x in range(0, 2):
+            user = User.objects.create(username='test{0}'.format(x))
+            iframe = Iframe(region='test', content_id=user.pk,
+                            content_type=get_content_type(User), position=1,
+                            url='https://news.bbc.co.uk/{0}'.format(x))
+            iframe.full_clean()
+            iframe.save()
+            self.users.append(user)
+        try:
+            admin.site.unregister(User)
+        except NotRegistered:
+            pass
+        admin.site.register(User, TestUserAdmin)
+
+    def test_prefetching_object(self):
+        tmpl = Template("""
+        {% load editregion %}
+        {% editregions_prefetch obj 'test' %}
+        {% editregion "test" obj %}{% endeditregion %}
+        """)
+        with self.assertNumQueries(1):
+            rendered = tmpl.render(Context({'obj': self.users[0]}))
+        self.assertIn('src="https://news.bbc.co.uk/0"', rendered)
+
+    def test_prefetching_list(self):
+        tmpl = Template("""
+        {% load editregion %}
+        {% editregions_prefetch objs %}
+        {% for obj in objs %}{% editregion "test" obj %}{% endeditregion %}{% endfor %}
+        """)
+        with self.assertNumQueries(1):
+            rendered = tmpl.render(Context({'objs': self.users}))
+        self.assertIn('src="https://news.bbc.co.uk/0"', rendered)
+        self.assertIn('src="https://news.bbc.co.uk/1"', rendered)
@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+from django.template import TemplateDoesNotExist
+from django.contrib.auth.models import User
+from django.template import Context
+from django.test import TestCase as DjangoTestCase
+from django.test.utils import override_settings
+from editregions.contrib.embeds.models import Iframe
+from editregions.models import EditRegionChunk
+from editregions.utils.data import get_content_type
+from editregions.templatetags.editregion import (chunk_iteration_context,
+                                                 render_one_chunk)
+from editregions.utils.cache import (get_editregions_cache,
+                                     get_rendered_cache_key,
+                                     get_rendered_region, set_rendered_region,
+                                     get_generation, bump_generation,
+                                     get_generations, empty_caching_enabled,
+                                     get_empty_cache_key, is_region_empty,
+                                     set_region_empty, get_inherited_cache_key,
+                                     get_inherited_distance,
+                                     set_inherited_distance,
+                                     rendered_caching_enabled,
+                                     chunk_caching_enabled,
+                                     get_chunk_cache_key,
+                                     get_configuration_version,
+                                     bump_configuration_version,
+                                     check_configuration_version)
+from editregions.utils.templates import (select_existing_template,
+                                         is_template_missing)
+
+
+class RenderedCacheTestCase(DjangoTestCase):
+    def setUp(self):
+        get_editregions_cache().clear()
+        self.user, created = User.objects.get_or_create(username='test')
+        self.ct = get_content_type(User)
+
+    def test_key(self):
+        key = get_rendered_cache_key(content_type_id=1, content_id=2,
+                                     region='test', generation=3)
+        self.assertEqual(key, 'editregions_rendered_1_2_3_test')
+
+    def test_key_includes_generation(self):
+        key = get_rendered_cache_key(content_type_id=1, content_id=2,
+                                     region='test')
+        generation = get_generation(content_type_id=1, content_id=2)
+        self.assertEqual(key, 'editregions_rendered_1_2_{0}_test'.format(
+            generation))
+
+    def test_disabled_by_default(self):
+        self.assertFalse(rendered_caching_enabled())
+
+    @override_settings(EDITREGIONS_CACHE_RENDERED=True)
+    def test_enabled(self):
+        self.assertTrue(rendered_caching_enabled())
+
+    def test_set_and_get(self):
+        self.assertIsNone(get_rendered_region(content_type_id=self.ct.pk,
+                                              content_id=self.user.pk,
+                                              region='test'))
+        set_rendered_region(content_type_id=self.ct.pk,
+                            content_id=self.user.pk, region='test',
+                            output='<b>hi</b>')
+        self.assertEqual('<b>hi</b>', get_rendered_region(
+            content_type_id=self.ct.pk, content_id=self.user.pk,
+            region='test'))
+
+    def test_set_and_get_for_generation(self):
+        generation = get_generation(content_type_id=self.ct.pk,
+                                    content_id=self.user.pk)
+        bump_generation(content_type_id=self.ct.pk, content_id=self.user.pk)
+        set_rendered_region(content_type_id=self.ct.pk,
+                            content_id=self.user.pk, region='test',
+                            output='<b>hi</b>', generation=generation)
+        self.assertIsNone(get_rendered_region(content_type_id=self.ct.pk,
+                                              content_id=self.user.pk,
+                                              region='test'))
+        self.assertEqual('<b>hi</b>', get_rendered_region(
+            content_type_id=self.ct.pk, content_id=self.user.pk,
+            region='test', generation=generation))
+
+    def test_bumping_clears_every_region(self):
+        for region in ('test', 'test2'):
+            set_rendered_region(content_type_id=self.ct.pk,
+                                content_id=self.user.pk, region=region,
+                                output='x')
+        bump_generation(content_type_id=self.ct.pk, content_id=self.user.pk)
+        for region in ('test', 'test2'):
+            self.assertIsNone(get_rendered_region(content_type_id=self.ct.pk,
+                                                  content_id=self.user.pk,
+                                                  region=region))
+
+    def test_cleared_by_saving_a_chunk(self):
+        set_rendered_region(content_type_id=self.ct.pk,
+                            content_id=self.user.pk, region='test',
+                            output='x')
+        iframe = Iframe(region='test', content_id=self.user.pk,
+                        content_type=self.ct, position=0,
+                        url='https://news.bbc.co.uk/')
+        iframe.full_clean()
+        iframe.save()
+        self.assertIsNone(get_rendered_region(content_type_id=self.ct.pk,
+                                              content_id=self.user.pk,
+                                              region='test'))
+
+    def test_cleared_by_deleting_a_chunk(self):
+        iframe = Iframe(region='test', content_id=self.user.pk,
+                        content_type=self.ct, position=0,
+                        url='https://news.bbc.co.uk/')
+        iframe.full_clean()
+        iframe.save()
+        set_rendered_region(content_type_id=self.ct.pk,
+                            content_id=self.user.pk, region='test',
+                            output='x')
+        iframe.delete()
+        self.assertIsNone(get_rendered_region(content_type_id=self.ct.pk,
+                                              content_id=self.user.pk,
+                                              region='test'))
+
+    def test_cleared_by_moving_a_chunk(self):
+        for x in range(0, 3):
+            obj = EditRegionChunk(region='test', position=x,
+                                  content_id=self.user.pk, content_type=self.ct)
+            obj.full_clean()
+            obj.save()
+        for region in ('test', 'test2'):
+            set_rendered_region(content_type_id=self.ct.pk,
+                                content_id=self.user.pk, region=region,
+                                output='x')
+        to_move = EditRegionChunk.objects.get(pk=1)
+        EditRegionChunk.objects.move(obj=to_move, from_position=0,
+                                     to_position=0, from_region='test',
+                                     to_region='test2')
+        for region in ('test', 'test2'):
+            self.assertIsNone(get_rendered_region(content_type_id=self.ct.pk,
+                                                  content_id=self.user.pk,
+                                                  region=region))
+
+
+class GenerationTestCase(DjangoTestCase):
+    def setUp(self):
+        get_editregions_cache().clear()
+
+    def test_get_is_stable(self):
+        first = get_generation(content_type_id=1, content_id=2)
+        self.assertEqual(first, get_generation(content_type_id=1, content_id=2))
+
+    def test_bump(self):
+        first = get_generation(content_type_id=1, content_id=2)
+        second = bump_generation(content_type_id=1, content_id=2)
+        self.assertEqual(first + 1, second)
+        self.assertEqual(second, get_generation(content_type_id=1,
+                                                content_id=2))
+
+    def test_bump_without_existing(self):
+        generation = bump_generation(content_type_id=1, content_id=2)
+        self.assertEqual(generation, get_generation(content_type_id=1,
+                                                    content_id=2))
+
+    def test_separate_per_object(self):
+        first = get_generation(content_type_id=1, content_id=2)
+        bump_generation(content_type_id=1, content_id=3)
+        self.assertEqual(first, get_generation(content_type_id=1,
+                                               content_id=2))
+
+    def test_get_many(self):
+        bump_generation(content_type_id=1, content_id=3)
+        generations = get_generations([(1, 2), (1, 3)])
+        self.assertEqual(generations, [
+            get_generation(content_type_id=1, content_id=2),
+            get_generation(content_type_id=1, content_id=3),
+        ])
+
+
+class ConfigurationVersionTestCase(DjangoTestCase):
+    def setUp(self):
+        get_editregions_cache().clear()
+
+    def test_get_is_stable(self):
+        self.assertEqual(get_configuration_version(),
+                         get_configuration_version())
+
+    def test_bump(self):
+        first = get_configuration_version()
+        self.assertEqual(first + 1, bump_configuration_version())
+
+    @override_settings(DEBUG=False)
+    def test_changed_elsewhere(self):
+        check_configuration_version()
+        with self.assertRaises(TemplateDoesNotExist):
+            select_existing_template('editregions/nope.html')
+        self.assertFalse(check_configuration_version())
+        self.assertTrue(is_template_missing('editregions/nope.html'))
+        # as if another process ran `clear_editregions_caches`
+        bump_configuration_version()
+        self.assertTrue(check_configuration_version())
+        self.assertFalse(is_template_missing('editregions/nope.html'))
+        self.assertFalse(check_configuration_version())
+
+    def test_checked_on_request(self):
+        check_configuration_version()
+        bump_configuration_version()
+        self.client.get('/')
+        self.assertFalse(check_configuration_version())
+
+
+class EmptyCacheTestCase(DjangoTestCase):
+    def setUp(self):
+        get_editregions_cache().clear()
+
+    def test_disabled_by_default(self):
+        self.assertFalse(empty_caching_enabled())
+
+    @override_settings(EDITREGIONS_CACHE_EMPTY=True)
+    def test_enabled(self):
+        self.assertTrue(empty_caching_enabled())
+
+    def test_key(self):
+        generation = get_generation(content_type_id=1, content_id=2)
+        key = get_empty_cache_key(content_type_id=1, content_id=2,
+                                  region='test')
+        self.assertEqual(key, 'editregions_empty_1_2_{0}_test'.format(
+            generation))
+
+    def test_set_and_get(self):
+        self.assertFalse(is_region_empty(content_type_id=1, content_id=2,
+                                         region='test'))
+        set_region_empty(content_type_id=1, content_id=2, region='test')
+        self.assertTrue(is_region_empty(content_type_id=1, content_id=2,
+                                        region='test'))
+        self.assertFalse(is_region_empty(content_type_id=1, content_id=2,
+                                         region='test2'))
+
+    def test_set_and_get_for_generation(self):
+        generation = get_generation(content_type_id=1, content_id=2)
+        bump_generation(content_type_id=1, content_id=2)
+        set_region_empty(content_type_id=1, content_id=2, region='test',
+                         generation=generation)
+        self.assertFalse(is_region_empty(content_type_id=1, content_id=2,
+                                         region='test'))
+        self.assertTrue(is_region_empty(content_type_id=1, content_id=2,
+                                        region='test', generation=generation))
+
+    def test_bumping_clears(self):
+        set_region_empty(content_type_id=1, content_id=2, region='test')
+        bump_generation(content_type_id=1, content_id=2)
+        self.assertFalse(is_region_empty(content_type_id=1, content_id=2,
+                                         region='test'))
+
+    def test_inherited(self):
+        key = get_inherited_cache_key(content_type_id=1, content_id=2,
+                                      region='test', ancestors=[(1, 3)])
+        self.assertIsNone(get_inherited_distance(key))
+        set_inherited_distance(key, 0)
+        self.assertEqual(0, get_inherited_distance(key))
+
+    def test_inherited_key_changes(self):
+        def key():
+            return get_inherited_cache_key(content_type_id=1, content_id=2,
+                                           region='test',
+                                           ancestors=[(1, 3), (1, 4)])
+        first = key()
+        self.assertEqual(first, key())
+        bump_generation(content_type_id=1, content_id=4)
+        second = key()
+        self.assertNotEqual(first, second)
+        bump_generation(content_type_id=1, content_id=2)
+        self.assertNotEqual(second, key())
+        self.assertNotEqual(key(), get_inherited_cache_key(
+            content_type_id=1, content_id=2, region='test',
+            ancestors=[(1, 3)]))
+
+
+class CountingRenderer(object):
+    def __init__(self, parts=()):
+        self.calls = 0
+        self.parts = parts
+
+    def get_editregions_cache_parts(self, obj, context, **kwargs):
+        return self.parts
+
+    def render_into_region(self, obj, context, **kwargs):
+        self.calls += 1
+        return 'rendered {0}'.format(self.calls)
+
+
+class ChunkCacheTestCase(DjangoTestCase):
+    def setUp(self):
+        get_editregions_cache().clear()
+        self.chunk = Iframe(pk=1, region='test', position=0,
+                            modified=datetime(2014, 1, 1, 12, 0, 0))
+
+    def render(self, renderer):
+        iterdata = chunk_iteration_context(index=0, value=self.chunk,
+                                           iterable=[self.chunk])
+        context = Context(iterdata)
+        return render_one_chunk(context=context, chunk=self.chunk,
+                                extra=iterdata, renderer=renderer)
+
+    def test_disabled_by_default(self):
+        self.assertFalse(chunk_caching_enabled())
+
+    def test_key(self):
+        key = get_chunk_cache_key(chunk=self.chunk, parts=(1,))
+        self.assertTrue(key.startswith('editregions_chunk_1_'
+                                       '20140101120000000000_'))
+        self.assertNotEqual(key, get_chunk_cache_key(chunk=self.chunk,
+                                                     parts=(2,)))
+
+    def test_key_changes_when_modified(self):
+        key = get_chunk_cache_key(chunk=self.chunk, parts=(1,))
+        self.chunk.modified = datetime(2014, 1, 1, 12, 0, 1)
+        self.assertNotEqual(key, get_chunk_cache_key(chunk=self.chunk,
+                                                     parts=(1,)))
+
+    def test_key_uncacheable(self):
+        self.assertIsNone(get_chunk_cache_key(chunk=self.chunk, parts=None))
+        self.assertIsNone(get_chunk_cache_key(chunk=Iframe(), parts=()))
+
+    @override_settings(EDITREGIONS_CACHE_CHUNKS=True)
+    def test_output_is_reused(self):
+        renderer = CountingRenderer()
+        self.assertEqual('rendered 1', self.render(renderer))
+        self.assertEqual('rendered 1', self.render(renderer))
+        self.assertEqual(1, renderer.calls)
+
+    @override_settings(EDITREGIONS_CACHE_CHUNKS=True)
+    def test_opting_out(self):
+        renderer = CountingRenderer(parts=None)
+        self.render(renderer)
+        self.render(renderer)
+        self.assertEqual(2, renderer.calls)
+
+    @override_settings(EDITREGIONS_CACHE_CHUNKS=False)
+    def test_output_not_cached_when_disabled(self):
+        renderer = CountingRenderer()
+        self.render(renderer)
+        self.render(renderer)
+        self.assertEqual(2, renderer.calls)
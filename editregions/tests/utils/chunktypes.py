@@ -0,0 +1,431 @@
+# -*- coding: utf-8 -*-
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.db.models import PositiveIntegerField
+from django.test import TestCase as DjangoTestCase
+from django.test.utils import override_settings
+from editregions.contrib.embeds.models import Iframe, JavaScript
+from editregions.contrib.text.models import WYM, MCE
+from editregions.models import EditRegionChunk, EditRegionConfiguration
+from editregions.utils import chunktypes
+from editregions.utils.chunktypes import (get_chunk_models,
+                                          backfill_chunk_types,
+                                          fetch_by_chunk_type,
+                                          fetch_by_table, load_subclasses,
+                                          fetch_by_union, build_union_query,
+                                          get_chunk_type_filter,
+                                          get_allowed_chunks_filter,
+                                          get_subclass_graph,
+                                          clear_subclass_graph, merge_chunks)
+from editregions.utils.data import get_content_type
+from editregions.utils.versioning import is_django_17plus
+try:
+    from unittest.case import skipUnless
+except ImportError:  # pragma: no cover ... Python 2.6
+    from django.utils.unittest.case import skipUnless
+
+
+class ChunkTypesTestCase(DjangoTestCase):
+    def setUp(self):
+        self.ct = get_content_type(User)
+
+    def test_chunk_models(self):
+        models = get_chunk_models()
+        self.assertIn(Iframe, models)
+        self.assertIn(WYM, models)
+        self.assertNotIn(EditRegionChunk, models)
+
+    def test_set_on_save(self):
+        iframe = Iframe(region='test', content_id='1', content_type=self.ct,
+                        position=0, url='https://news.bbc.co.uk/')
+        iframe.save()
+        self.assertEqual(iframe.chunk_type, get_content_type(Iframe))
+        base = EditRegionChunk.objects.get(pk=iframe.pk)
+        self.assertEqual(base.chunk_type_id, get_content_type(Iframe).pk)
+
+    def test_existing_plain_chunk_not_guessed(self):
+        iframe = Iframe(region='test', content_id='1', content_type=self.ct,
+                        position=0, url='https://news.bbc.co.uk/')
+        iframe.save()
+        EditRegionChunk.objects.update(chunk_type=None)
+        base = EditRegionChunk.objects.get(pk=iframe.pk)
+        base.save()
+        self.assertIsNone(EditRegionChunk.objects.get(pk=iframe.pk)
+                          .chunk_type_id)
+
+    def test_backfill(self):
+        iframe = Iframe(region='test', content_id='1', content_type=self.ct,
+                        position=0, url='https://news.bbc.co.uk/')
+        iframe.save()
+        wym = WYM(region='test', content_id='1', content_type=self.ct,
+                  position=1, content='test')
+        wym.save()
+        EditRegionChunk.objects.update(chunk_type=None)
+        self.assertGreater(backfill_chunk_types(), 0)
+        self.assertEqual(
+            dict(EditRegionChunk.objects.values_list('pk', 'chunk_type_id')),
+            {iframe.pk: get_content_type(Iframe).pk,
+             wym.pk: get_content_type(WYM).pk})
+
+
+class ChunksToFetchMixin(object):
+    """
+    Alternating WYM and Iframe chunks, for each way of fetching subclasses.
+    """
+    def setUp(self):
+        self.ct = get_content_type(User)
+        self.models = (Iframe, WYM, MCE, JavaScript)
+        self.lookups = {'content_type': self.ct, 'content_id': '1',
+                        'region': 'test'}
+        for position in range(0, 6):
+            if position % 2:
+                chunk = Iframe(url='https://news.bbc.co.uk/')
+            else:
+                chunk = WYM(content='test')
+            chunk.region = 'test'
+            chunk.content_type = self.ct
+            chunk.content_id = '1'
+            chunk.position = position
+            chunk.save()
+
+
+class FetchByChunkTypeTestCase(ChunksToFetchMixin, DjangoTestCase):
+    def test_same_as_joining(self):
+        joined = list(EditRegionChunk.polymorphs.filter(**self.lookups)
+                      .select_subclasses(*self.models))
+        typed = fetch_by_chunk_type(lookups=self.lookups, models=self.models)
+        self.assertEqual(joined, typed)
+        self.assertEqual([x.__class__ for x in joined],
+                         [x.__class__ for x in typed])
+
+    def test_one_query_per_type_used(self):
+        # base rows, then Iframe and WYM; MCE & JavaScript aren't used.
+        with self.assertNumQueries(3):
+            chunks = fetch_by_chunk_type(lookups=self.lookups,
+                                         models=self.models)
+        self.assertEqual([x.position for x in chunks], list(range(0, 6)))
+
+    def test_disallowed_types_skipped(self):
+        chunks = fetch_by_chunk_type(lookups=self.lookups, models=(Iframe,))
+        self.assertEqual([x.position for x in chunks], [1, 3, 5])
+
+    def test_untyped_chunks_found(self):
+        EditRegionChunk.objects.filter(position__lt=2).update(chunk_type=None)
+        chunks = fetch_by_chunk_type(lookups=self.lookups, models=self.models)
+        self.assertEqual([x.__class__ for x in chunks],
+                         [WYM, Iframe] * 3)
+
+    def test_nothing_found(self):
+        with self.assertNumQueries(1):
+            self.assertEqual([], fetch_by_chunk_type(
+                lookups={'content_id': '2'}, models=self.models))
+
+    @override_settings(EDITREGIONS_SUBCLASS_STRATEGY='typed')
+    def test_used_by_configuration(self):
+        conf = EditRegionConfiguration()
+        chunks = conf._fetch_subclasses(lookups=self.lookups,
+                                        models=self.models)
+        self.assertEqual([x.__class__ for x in chunks], [WYM, Iframe] * 3)
+
+
+class SubclassGraphTestCase(DjangoTestCase):
+    def setUp(self):
+        clear_subclass_graph()
+
+    def test_built_once(self):
+        self.assertIs(get_subclass_graph(), get_subclass_graph())
+
+    def test_cleared(self):
+        first = get_subclass_graph()
+        clear_subclass_graph()
+        self.assertIsNot(first, get_subclass_graph())
+
+    def test_depths(self):
+        graph = get_subclass_graph()
+        self.assertEqual(1, graph.depths[Iframe])
+        self.assertEqual([Iframe, WYM],
+                         graph.deepest_first([Iframe, WYM]))
+
+    def test_join_width(self):
+        graph = get_subclass_graph()
+        self.assertEqual(2, graph.join_width([Iframe, WYM]))
+        self.assertEqual(0, graph.join_width([]))
+
+    def test_cast_to(self):
+        graph = get_subclass_graph()
+        self.assertIs(Iframe, graph.cast_to(model=Iframe,
+                                            models=(Iframe, WYM)))
+        self.assertIs(EditRegionChunk, graph.cast_to(
+            model=Iframe, models=(WYM, EditRegionChunk)))
+        self.assertIsNone(graph.cast_to(model=Iframe, models=(WYM,)))
+        self.assertIsNone(graph.cast_to(model=None, models=(WYM,)))
+
+
+@skipUnless(is_django_17plus(), "needs the app registry to add a model")
+class GrandchildChunkTypeTestCase(DjangoTestCase):
+    """
+    None of the bundled chunks inherit from another, so one is made for the
+    duration of these tests.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super(GrandchildChunkTypeTestCase, cls).setUpClass()
+
+        class WideIframe(Iframe):
+            depth = PositiveIntegerField(default=100)
+
+            class Meta:
+                app_label = 'embeds'
+        cls.model = WideIframe
+        with connection.schema_editor() as editor:
+            editor.create_model(WideIframe)
+        clear_subclass_graph()
+
+    @classmethod
+    def tearDownClass(cls):
+        from django.apps import apps
+        with connection.schema_editor() as editor:
+            editor.delete_model(cls.model)
+        del apps.all_models['embeds'][cls.model._meta.model_name]
+        apps.clear_cache()
+        ContentType.objects.clear_cache()
+        clear_subclass_graph()
+        super(GrandchildChunkTypeTestCase, cls).tearDownClass()
+
+    def setUp(self):
+        self.lookups = {'content_type': get_content_type(User),
+                        'content_id': '1', 'region': 'test'}
+        for position, chunk in enumerate((WYM(content='test'),
+                                          self.model(url='https://a.b/'))):
+            chunk.region = 'test'
+            chunk.content_type = self.lookups['content_type']
+            chunk.content_id = '1'
+            chunk.position = position
+            chunk.save()
+
+    def test_cast_to_parent(self):
+        models = (WYM, Iframe)
+        joined = list(EditRegionChunk.polymorphs.filter(**self.lookups)
+                      .select_subclasses(*models))
+        typed = fetch_by_chunk_type(lookups=self.lookups, models=models)
+        self.assertEqual(joined, typed)
+        self.assertEqual([WYM, Iframe], [x.__class__ for x in typed])
+
+    def test_own_type_preferred(self):
+        typed = fetch_by_chunk_type(lookups=self.lookups,
+                                    models=(WYM, Iframe, self.model))
+        self.assertEqual([WYM, self.model], [x.__class__ for x in typed])
+
+    def test_union_cast_to_parent(self):
+        union = fetch_by_union(lookups=self.lookups, models=(WYM, Iframe))
+        self.assertEqual([WYM, Iframe], [x.__class__ for x in union])
+
+    def test_union_joins_every_parent(self):
+        union = fetch_by_union(lookups=self.lookups,
+                               models=(WYM, Iframe, self.model))
+        self.assertEqual([WYM, self.model], [x.__class__ for x in union])
+        self.assertEqual(('https://a.b/', 100),
+                         (union[1].url, union[1].depth))
+        loaded = self.model.objects.get(pk=union[1].pk)
+        self.assertEqual(
+            [getattr(loaded, x.attname) for x in self.model._meta.fields],
+            [getattr(union[1], x.attname) for x in self.model._meta.fields])
+
+    def test_filtered_by_parent_type(self):
+        found = EditRegionChunk.objects.filter(
+            get_chunk_type_filter(models=(Iframe,)), **self.lookups)
+        self.assertEqual([1], [x.position for x in found])
+
+
+class FetchByTableTestCase(ChunksToFetchMixin, DjangoTestCase):
+    def test_same_as_joining(self):
+        joined = list(EditRegionChunk.polymorphs.filter(**self.lookups)
+                      .select_subclasses(*self.models))
+        tables = fetch_by_table(lookups=self.lookups, models=self.models)
+        self.assertEqual(joined, tables)
+        self.assertEqual([x.__class__ for x in joined],
+                         [x.__class__ for x in tables])
+
+    def test_one_query_per_table(self):
+        # base rows, then WYM and Iframe; MCE and JavaScript aren't asked
+        # for as everything has been found by then.
+        models = (WYM, Iframe, MCE, JavaScript)
+        with self.assertNumQueries(3):
+            chunks = fetch_by_table(lookups=self.lookups, models=models)
+        self.assertEqual([x.position for x in chunks], list(range(0, 6)))
+
+    def test_one_query_per_type_used(self):
+        with self.assertNumQueries(5):
+            chunks = fetch_by_table(lookups=self.lookups,
+                                    models=(MCE, JavaScript, Iframe, WYM))
+        self.assertEqual([x.position for x in chunks], list(range(0, 6)))
+
+    def test_disallowed_types_skipped(self):
+        chunks = fetch_by_table(lookups=self.lookups, models=(Iframe,))
+        self.assertEqual([x.position for x in chunks], [1, 3, 5])
+
+    def test_untyped_chunks_found(self):
+        EditRegionChunk.objects.update(chunk_type=None)
+        chunks = fetch_by_table(lookups=self.lookups, models=self.models)
+        self.assertEqual([x.__class__ for x in chunks], [WYM, Iframe] * 3)
+
+    def test_nothing_found(self):
+        with self.assertNumQueries(1):
+            self.assertEqual([], fetch_by_table(lookups={'content_id': '2'},
+                                                models=self.models))
+
+    def test_batched(self):
+        pks = list(EditRegionChunk.objects.values_list('pk', flat=True))
+        per_query = chunktypes.PKS_PER_QUERY
+        chunktypes.PKS_PER_QUERY = 2
+        try:
+            # all 6 asked of WYM in 3 batches, then the 3 Iframes in 2 more.
+            with self.assertNumQueries(5):
+                found = load_subclasses(pks=pks, models=(WYM, Iframe))
+        finally:
+            chunktypes.PKS_PER_QUERY = per_query
+        self.assertEqual(sorted(pks), sorted(found))
+
+    @override_settings(EDITREGIONS_SUBCLASS_STRATEGY='tables')
+    def test_used_by_configuration(self):
+        conf = EditRegionConfiguration()
+        chunks = conf._fetch_subclasses(lookups=self.lookups,
+                                        models=self.models)
+        self.assertEqual([x.__class__ for x in chunks], [WYM, Iframe] * 3)
+
+
+class FetchByUnionTestCase(ChunksToFetchMixin, DjangoTestCase):
+    def test_same_as_joining(self):
+        joined = list(EditRegionChunk.polymorphs.filter(**self.lookups)
+                      .select_subclasses(*self.models))
+        union = fetch_by_union(lookups=self.lookups, models=self.models)
+        self.assertEqual(joined, union)
+        self.assertEqual([x.__class__ for x in joined],
+                         [x.__class__ for x in union])
+        for before, after in zip(joined, union):
+            self.assertEqual(
+                [getattr(before, x.attname) for x in before._meta.fields],
+                [getattr(after, x.attname) for x in after._meta.fields])
+
+    def test_one_query(self):
+        with self.assertNumQueries(1):
+            chunks = fetch_by_union(lookups=self.lookups, models=self.models)
+        self.assertEqual([x.position for x in chunks], list(range(0, 6)))
+
+    def test_disallowed_types_skipped(self):
+        chunks = fetch_by_union(lookups=self.lookups, models=(Iframe,))
+        self.assertEqual([x.position for x in chunks], [1, 3, 5])
+
+    def test_untyped_chunks_found(self):
+        EditRegionChunk.objects.update(chunk_type=None)
+        chunks = fetch_by_union(lookups=self.lookups, models=self.models)
+        self.assertEqual([x.__class__ for x in chunks], [WYM, Iframe] * 3)
+
+    def test_plain_chunks_not_selected(self):
+        EditRegionChunk.objects.create(content_type=self.ct, content_id='1',
+                                       region='test', position=6)
+        chunks = fetch_by_union(lookups=self.lookups, models=self.models)
+        self.assertEqual([x.position for x in chunks], list(range(0, 6)))
+
+    def test_nothing_found(self):
+        with self.assertNumQueries(0):
+            self.assertEqual([], fetch_by_union(lookups=self.lookups,
+                                                models=()))
+        self.assertEqual([], fetch_by_union(lookups={'content_id': '2'},
+                                            models=self.models))
+
+    def test_query(self):
+        sql, params, branches = build_union_query(
+            lookups=self.lookups, models=(WYM, Iframe), using=DEFAULT_DB_ALIAS)
+        self.assertEqual(1, sql.count('UNION ALL'))
+        self.assertEqual([WYM, Iframe], [model for model, fields in branches])
+        self.assertEqual(len(WYM._meta.fields), len(branches[0][1]))
+
+    @override_settings(EDITREGIONS_SUBCLASS_STRATEGY='union')
+    def test_used_by_configuration(self):
+        conf = EditRegionConfiguration()
+        chunks = conf._fetch_subclasses(lookups=self.lookups,
+                                        models=self.models)
+        self.assertEqual([x.__class__ for x in chunks], [WYM, Iframe] * 3)
+
+
+class ChunkTypeFilterTestCase(DjangoTestCase):
+    def setUp(self):
+        self.ct = get_content_type(User)
+        self.lookups = {'content_type': self.ct, 'content_id': '1'}
+        for position, region in enumerate(('a', 'b')):
+            for chunk in (WYM(content='test'), Iframe(url='https://a.b/'),
+                          MCE(content='test')):
+                chunk.region = region
+                chunk.content_type = self.ct
+                chunk.content_id = '1'
+                chunk.position = position
+                chunk.save()
+
+    def test_only_enabled_types(self):
+        found = EditRegionChunk.objects.filter(
+            get_chunk_type_filter(models=(WYM, Iframe)))
+        self.assertEqual(4, found.count())
+        self.assertNotIn(get_content_type(MCE).pk,
+                         set(x.chunk_type_id for x in found))
+
+    def test_untyped_included(self):
+        EditRegionChunk.objects.filter(region='a').update(chunk_type=None)
+        found = EditRegionChunk.objects.filter(
+            get_chunk_type_filter(models=(WYM,)))
+        self.assertEqual(4, found.count())
+
+    def test_per_region(self):
+        found = EditRegionChunk.polymorphs.filter(get_allowed_chunks_filter(
+            models_by_region={'a': (WYM,), 'b': (Iframe, MCE)}))
+        self.assertEqual([('a', WYM), ('b', Iframe), ('b', MCE)],
+                         sorted(((x.region, x.__class__)
+                                 for x in found.select_subclasses()),
+                                key=lambda x: (x[0], x[1].__name__)))
+
+    def test_nothing_enabled(self):
+        found = EditRegionChunk.objects.filter(get_allowed_chunks_filter(
+            models_by_region={'a': (), 'b': {}}))
+        self.assertEqual(0, found.count())
+
+    def test_disabled_types_not_fetched(self):
+        models = (WYM, Iframe)
+        filters = (get_chunk_type_filter(models=models),)
+        conf = EditRegionConfiguration()
+        with self.settings(EDITREGIONS_SPLIT_EVERY=1000):
+            chunks = list(conf._fetch_subclasses(
+                lookups=self.lookups, models=models, filters=filters))
+            unfiltered = list(conf._fetch_subclasses(lookups=self.lookups,
+                                                     models=models))
+        self.assertEqual(4, len(chunks))
+        self.assertEqual(set([WYM, Iframe]), set(x.__class__ for x in chunks))
+        self.assertIn(EditRegionChunk, [x.__class__ for x in unfiltered])
+
+    @override_settings(EDITREGIONS_SPLIT_EVERY=1)
+    def test_split_queries_filtered(self):
+        models = (WYM, Iframe)
+        filters = (get_chunk_type_filter(models=models),)
+        conf = EditRegionConfiguration()
+        chunks = conf._fetch_subclasses(lookups=self.lookups, models=models,
+                                        filters=filters)
+        self.assertEqual(4, len(chunks))
+        self.assertEqual(set([WYM, Iframe]), set(x.__class__ for x in chunks))
+
+
+class MergeChunksTestCase(DjangoTestCase):
+    def test_merged_in_position_order(self):
+        first = [WYM(pk=1, position=0), WYM(pk=2, position=3)]
+        second = [Iframe(pk=3, position=1), Iframe(pk=4, position=2)]
+        merged = merge_chunks(streams=[first, second])
+        self.assertEqual([0, 1, 2, 3], [x.position for x in merged])
+
+    def test_ties_keep_stream_order(self):
+        merged = merge_chunks(streams=[[WYM(pk=1, position=0)],
+                                       [Iframe(pk=2, position=0)]])
+        self.assertEqual([WYM, Iframe], [x.__class__ for x in merged])
+
+    def test_plain_chunks_dropped(self):
+        merged = merge_chunks(streams=[[EditRegionChunk(pk=1, position=0),
+                                        WYM(pk=2, position=1)]])
+        self.assertEqual([2], [x.pk for x in merged])
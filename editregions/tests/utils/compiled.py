@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import marshal
+import os
+import tempfile
+from django.test import TestCase as DjangoTestCase
+from django.test.utils import override_settings
+from editregions.models import EditRegionConfiguration, clear_render_plans
+from editregions.utils.compiled import (dump_compiled_configs,
+                                        load_compiled_configs,
+                                        get_compiled_configs,
+                                        clear_compiled_configs)
+from editregions.utils.data import FrozenSortedDict
+
+
+class CompiledConfigTestCase(DjangoTestCase):
+    def setUp(self):
+        clear_compiled_configs()
+        clear_render_plans()
+        fd, self.path = tempfile.mkstemp(suffix='.marshal')
+        os.close(fd)
+        with open(self.path, 'wb') as f:
+            f.write(dump_compiled_configs({
+                'fillable_editregion_template.json': {
+                    'test': {'name': 'compiled',
+                             'models': {'embeds.Iframe': None}},
+                },
+            }))
+
+    def tearDown(self):
+        clear_compiled_configs()
+        clear_render_plans()
+        os.remove(self.path)
+
+    def test_round_trip(self):
+        data = dump_compiled_configs({'a.json': {'b': {'models': {}}}})
+        configs = load_compiled_configs(data)
+        self.assertEqual(configs, {'a.json': {'b': {'models': {}}}})
+        self.assertIsInstance(configs['a.json'], FrozenSortedDict)
+
+    def test_wrong_version(self):
+        with self.assertRaises(ValueError):
+            load_compiled_configs(marshal.dumps({'version': -1,
+                                                 'templates': {}}))
+
+    def test_not_configured(self):
+        self.assertIsNone(get_compiled_configs())
+
+    def test_loaded_once(self):
+        with self.settings(EDITREGIONS_COMPILED_CONFIG=self.path):
+            self.assertIs(get_compiled_configs(), get_compiled_configs())
+
+    @override_settings(DEBUG=False)
+    def test_missing_file_ignored(self):
+        with self.settings(EDITREGIONS_COMPILED_CONFIG=self.path + '.nope'):
+            self.assertIsNone(get_compiled_configs())
+
+    @override_settings(DEBUG=True)
+    def test_missing_file_debug(self):
+        with self.settings(EDITREGIONS_COMPILED_CONFIG=self.path + '.nope'):
+            with self.assertRaises(IOError):
+                get_compiled_configs()
+
+    def test_used_instead_of_template(self):
+        conf = EditRegionConfiguration()
+        with self.settings(EDITREGIONS_COMPILED_CONFIG=self.path):
+            conf.set_template(['nope.html',
+                               'fillable_editregion_template.html'])
+        self.assertTrue(conf.has_configuration)
+        self.assertEqual(conf.config['test']['name'], 'compiled')
+
+    def test_templates_used_if_not_compiled(self):
+        conf = EditRegionConfiguration()
+        with self.settings(EDITREGIONS_COMPILED_CONFIG=self.path):
+            conf.set_template('movable_editregion_template.html')
+        self.assertEqual(sorted(conf.config), ['test', 'test2'])
+
+    def test_earlier_template_not_compiled(self):
+        conf = EditRegionConfiguration()
+        with self.settings(EDITREGIONS_COMPILED_CONFIG=self.path):
+            conf.set_template(['movable_editregion_template.html',
+                               'fillable_editregion_template.html'])
+        self.assertEqual(sorted(conf.config), ['test', 'test2'])
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+import time
+from multiprocessing.pool import ThreadPool
+from django.contrib import admin
+from django.contrib.admin.sites import NotRegistered
+from django.contrib.auth.models import User
+from django.template import Context
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TestCase as DjangoTestCase
+from django.test.utils import override_settings
+from editregions.contrib.embeds.admin import IframeAdmin
+from editregions.contrib.embeds.models import Iframe
+from editregions.contrib.text.models import WYM
+from editregions.models import EditRegionConfiguration
+from editregions.templatetags.editregion import (render_all_chunks,
+                                                 render_all_chunks_concurrently)
+from editregions.utils.concurrency import (concurrent_rendering_enabled,
+                                           get_render_pool,
+                                           concurrent_queries_enabled,
+                                           can_query_concurrently,
+                                           get_query_pool,
+                                           run_queries_concurrently,
+                                           run_in_thread, shutdown_pool,
+                                           shutdown_query_pool,
+                                           shutdown_render_pool)
+from editregions.utils.data import get_content_type
+from editregions.utils.versioning import is_django_16plus
+try:
+    from unittest.case import skipIf
+except ImportError:  # pragma: no cover ... Python 2.6
+    from django.utils.unittest.case import skipIf
+
+
+class SlowIframeAdmin(IframeAdmin):
+    render_concurrently = True
+
+    def render_into_region(self, obj, context, **kwargs):
+        if obj.url.endswith('slow'):
+            time.sleep(0.5)
+        return super(SlowIframeAdmin, self).render_into_region(
+            obj=obj, context=context, **kwargs)
+
+
+class ConcurrentRenderingTestCase(DjangoTestCase):
+    def setUp(self):
+        self.register(SlowIframeAdmin)
+        ct = get_content_type(User)
+        self.chunks = [Iframe(pk=x, region='test', content_id=1,
+                              content_type=ct, position=x,
+                              url='https://news.bbc.co.uk/{0}'.format(x))
+                       for x in range(0, 5)]
+
+    def tearDown(self):
+        self.register(IframeAdmin)
+
+    def register(self, modeladmin):
+        try:
+            admin.site.unregister(Iframe)
+        except NotRegistered:
+            pass
+        admin.site.register(Iframe, modeladmin)
+
+    def test_disabled_by_default(self):
+        self.assertFalse(concurrent_rendering_enabled())
+
+    @override_settings(EDITREGIONS_RENDER_CONCURRENTLY=True)
+    def test_enabled(self):
+        self.assertTrue(concurrent_rendering_enabled())
+
+    def test_pool_is_shared(self):
+        self.assertIs(get_render_pool(), get_render_pool())
+
+    def test_shutdown_replaces_pool(self):
+        pool = get_render_pool()
+        shutdown_render_pool(timeout=5)
+        self.assertIsNot(pool, get_render_pool())
+
+    def test_same_as_rendering_serially(self):
+        serial = list(render_all_chunks(context=Context(),
+                                        found_chunks=self.chunks))
+        threaded = list(render_all_chunks_concurrently(
+            context=Context(), found_chunks=self.chunks))
+        self.assertEqual([x.index for x in threaded], list(range(0, 5)))
+        self.assertEqual([x.output for x in serial],
+                         [x.output for x in threaded])
+
+    @override_settings(EDITREGIONS_RENDER_CHUNK_TIMEOUT=0.1)
+    def test_timeout_uses_fallback(self):
+        self.chunks[2].url = 'https://news.bbc.co.uk/slow'
+        rendered = list(render_all_chunks_concurrently(
+            context=Context(), found_chunks=self.chunks))
+        self.assertEqual([x.index for x in rendered], list(range(0, 5)))
+        self.assertEqual('<!-- embeds.iframe 2 took too long to render -->',
+                         rendered[2].output)
+        self.assertIn('<iframe', rendered[3].output)
+
+    def test_context_not_changed(self):
+        context = Context({'a': 1})
+        length = len(context.dicts)
+        list(render_all_chunks_concurrently(context=context,
+                                            found_chunks=self.chunks))
+        self.assertEqual(length, len(context.dicts))
+        self.assertNotIn('chunkloop', context)
+
+
+class ConcurrentQueriesTestCase(DjangoTestCase):
+    def test_disabled_by_default(self):
+        self.assertFalse(concurrent_queries_enabled())
+
+    @override_settings(EDITREGIONS_SPLIT_CONCURRENTLY=True)
+    def test_enabled(self):
+        self.assertTrue(concurrent_queries_enabled())
+
+    def test_pool_is_shared(self):
+        self.assertIs(get_query_pool(), get_query_pool())
+        self.assertIsNot(get_query_pool(), get_render_pool())
+
+    def test_shutdown_replaces_pool(self):
+        pool = get_query_pool()
+        shutdown_query_pool(timeout=5)
+        self.assertIsNot(pool, get_query_pool())
+
+    def test_connections_kept_until_shutdown(self):
+        closed = []
+
+        def open_connection():
+            connection = connections[DEFAULT_DB_ALIAS]
+            connection.cursor()
+            # in-memory SQLite ignores being closed, so just note it.
+            connection.close = lambda: closed.append(id(connection))
+            return connection
+
+        pool = ThreadPool(processes=2)
+        opened = [pool.apply(run_in_thread, args=(open_connection, None))
+                  for _ in range(0, 4)]
+        # each thread reuses its own connection for every task it runs.
+        distinct = set(id(x) for x in opened)
+        self.assertLessEqual(len(distinct), 2)
+        self.assertNotIn(id(connections[DEFAULT_DB_ALIAS]), distinct)
+        self.assertEqual([], closed)
+        shutdown_pool(pool=pool, timeout=5)
+        self.assertEqual(distinct, set(closed))
+
+    @skipIf(is_django_16plus(), "connections are in autocommit mode")
+    def test_transactions_ended_before_django_16(self):
+        rolled_back = []
+
+        def open_transaction():
+            connection = connections[DEFAULT_DB_ALIAS]
+            connection.cursor().execute('SELECT 1')
+            rollback = connection._rollback
+
+            def note_rollback():
+                rolled_back.append(id(connection))
+                rollback()
+            connection._rollback = note_rollback
+            return connection
+
+        pool = ThreadPool(processes=1)
+        try:
+            opened = pool.apply(run_in_thread, args=(open_transaction, None))
+            self.assertEqual([id(opened)], rolled_back)
+            # ended, but still open for the next task.
+            self.assertIsNotNone(opened.connection)
+        finally:
+            shutdown_pool(pool=pool, timeout=5)
+
+    def test_not_in_transactions_or_memory(self):
+        # the tests use an in-memory database, inside a transaction.
+        self.assertFalse(can_query_concurrently(using=DEFAULT_DB_ALIAS))
+
+    def test_results_in_order(self):
+        results = run_queries_concurrently(querysets=[
+            (x for x in range(0, 3)), (x for x in range(3, 5)), ()])
+        self.assertEqual([[0, 1, 2], [3, 4], []], results)
+
+    @override_settings(EDITREGIONS_SPLIT_CONCURRENTLY=True,
+                       EDITREGIONS_SPLIT_EVERY=1)
+    def test_falls_back_to_serial(self):
+        ct = get_content_type(User)
+        for position, chunk in enumerate((WYM(content='test'),
+                                          Iframe(url='https://a.b/'))):
+            chunk.region = 'test'
+            chunk.content_type = ct
+            chunk.content_id = '1'
+            chunk.position = position
+            chunk.save()
+        chunks = EditRegionConfiguration()._fetch_subclasses(
+            lookups={'content_id': '1'}, models=(WYM, Iframe))
+        self.assertEqual([WYM, Iframe], [x.__class__ for x in chunks])
@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
+import pickle
 from django.contrib import admin
 from django.contrib.admin.sites import NotRegistered
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ImproperlyConfigured
 from django.template import Context
+from django.core.signals import request_started, request_finished
 from django.test.utils import override_settings
 from django.utils.functional import SimpleLazyObject
 try:
@@ -14,7 +16,7 @@ except ImportError:
 from django.test import TestCase as DjangoTestCase
 from django.contrib.auth.models import User, Permission
 from editregions.models import EditRegionConfiguration
-from editregions.utils.data import get_content_type, get_model_class, get_modeladmin, attach_configuration, get_configuration, healed_context, RegionMedia
+from editregions.utils.data import get_content_type, get_model_class, get_modeladmin, attach_configuration, get_configuration, healed_context, RegionMedia, FrozenSortedDict, freeze, unfreeze, ConfigurationStore, get_configuration_store, clear_configuration_store, configuration_scope
 from editregions.utils.versioning import is_django_15plus
 
 
@@ -76,19 +78,71 @@ class AttachConfigurationTestCase(TestCase):
     def test_attaching(self):
         user = User()
         obj, created = attach_configuration(user, EditRegionConfiguration)
-        self.assertTrue(hasattr(user, '__editregionconfig__'))
+        self.assertFalse(hasattr(user, '__editregionconfig__'))
         self.assertTrue(created)
-        self.assertIsInstance(getattr(user, '__editregionconfig__'),
+        self.assertIsInstance(get_configuration(user),
                               EditRegionConfiguration)
 
     def test_reattaching(self):
         user = User()
         obj, created1 = attach_configuration(user, EditRegionConfiguration)
         obj, created2 = attach_configuration(user, EditRegionConfiguration)
-        self.assertTrue(hasattr(user, '__editregionconfig__'))
+        self.assertIsNotNone(get_configuration(user))
         self.assertFalse(created2)
 
 
+class ConfigurationStoreTestCase(TestCase):
+    def test_bounded(self):
+        store = ConfigurationStore(max_size=2)
+        users = [User(), User(), User()]
+        for user in users:
+            store.set(user, user.pk)
+        self.assertEqual(2, len(store))
+        self.assertIsNone(store.get(users[0]))
+
+    def test_least_recently_used_forgotten(self):
+        store = ConfigurationStore(max_size=2)
+        users = [User(pk=1), User(pk=2), User(pk=3)]
+        store.set(users[0], 1)
+        store.set(users[1], 2)
+        self.assertEqual(1, store.get(users[0]))
+        store.set(users[2], 3)
+        self.assertEqual(1, store.get(users[0]))
+        self.assertIsNone(store.get(users[1]))
+
+    def test_equal_objects_not_shared(self):
+        store = ConfigurationStore()
+        store.set(User(pk=1), 1)
+        self.assertIsNone(store.get(User(pk=1)))
+
+    def test_cleared_by_requests(self):
+        for signal in (request_started, request_finished):
+            user = User()
+            attach_configuration(user, EditRegionConfiguration)
+            signal.send(sender=self.__class__)
+            self.assertIsNone(get_configuration(user))
+
+    def test_clearing(self):
+        user = User()
+        attach_configuration(user, EditRegionConfiguration)
+        clear_configuration_store()
+        self.assertIsNone(get_configuration(user))
+        self.assertEqual(0, len(get_configuration_store()))
+
+    def test_scope(self):
+        outside = User()
+        attach_configuration(outside, EditRegionConfiguration)
+        inside = User()
+        with configuration_scope(max_size=10) as store:
+            self.assertIs(store, get_configuration_store())
+            self.assertIsNone(get_configuration(outside))
+            attach_configuration(inside, EditRegionConfiguration)
+            self.assertIsNotNone(get_configuration(inside))
+        self.assertEqual(0, len(store))
+        self.assertIsNone(get_configuration(inside))
+        self.assertIsNotNone(get_configuration(outside))
+
+
 class GetConfigurationTestCase(TestCase):
     def test_getting(self):
         user = User()
@@ -280,3 +334,44 @@ class RegionMediaTestCase(TestCase):
         media = RegionMedia(top=['b', 'a', 'c', 'a'], bottom=['d', 'd', 'd'])
         self.assertEqual(media.top, ['b', 'a', 'c'])
         self.assertEqual(media.bottom, ['d'])
+
+
+class FrozenSortedDictTestCase(TestCase):
+    def setUp(self):
+        self.frozen = freeze({'b': {'models': {'x': 1}}, 'a': [1, {'c': 2}]})
+
+    def test_converted(self):
+        self.assertIsInstance(self.frozen, FrozenSortedDict)
+        self.assertIsInstance(self.frozen['b']['models'], FrozenSortedDict)
+        self.assertEqual(self.frozen['a'], (1, {'c': 2}))
+        self.assertIsInstance(self.frozen['a'][1], FrozenSortedDict)
+
+    def test_already_frozen(self):
+        self.assertIs(self.frozen, freeze(self.frozen))
+
+    def test_order_kept(self):
+        self.assertEqual(list(FrozenSortedDict([('b', 1), ('a', 2)])),
+                         ['b', 'a'])
+
+    def test_immutable(self):
+        with self.assertRaises(TypeError):
+            self.frozen['c'] = 1
+        with self.assertRaises(TypeError):
+            del self.frozen['a']
+        with self.assertRaises(TypeError):
+            self.frozen['b']['models'].update({'y': 2})
+        with self.assertRaises(TypeError):
+            self.frozen.pop('a')
+        with self.assertRaises(TypeError):
+            self.frozen.clear()
+
+    def test_unfreeze(self):
+        thawed = unfreeze(self.frozen)
+        self.assertIs(type(thawed), dict)
+        self.assertIs(type(thawed['b']['models']), dict)
+        self.assertEqual(thawed['a'], [1, {'c': 2}])
+
+    def test_pickleable(self):
+        unpickled = pickle.loads(pickle.dumps(self.frozen))
+        self.assertEqual(self.frozen, unpickled)
+        self.assertIsInstance(unpickled['b'], FrozenSortedDict)
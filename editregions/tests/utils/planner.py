@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TestCase as DjangoTestCase
+from django.test.utils import override_settings
+from editregions.constants import (SUBCLASS_JOIN, SUBCLASS_SPLIT,
+                                   SUBCLASS_TABLES)
+from editregions.contrib.embeds.models import Iframe
+from editregions.contrib.text.models import WYM
+from editregions.models import EditRegionConfiguration
+from editregions.utils.data import get_content_type
+from editregions.utils.planner import (FetchPlanner, get_fetch_planner,
+                                       clear_fetch_planner)
+
+
+class FetchPlannerTestCase(DjangoTestCase):
+    def setUp(self):
+        clear_fetch_planner()
+        self.planner = FetchPlanner()
+        self.models = (WYM, Iframe)
+        self.vendor = connections[DEFAULT_DB_ALIAS].vendor
+
+    def plan(self):
+        return self.planner.plan(models=self.models, using=DEFAULT_DB_ALIAS)
+
+    def test_shared(self):
+        self.assertIs(get_fetch_planner(), get_fetch_planner())
+
+    def test_cleared(self):
+        first = get_fetch_planner()
+        clear_fetch_planner()
+        self.assertIsNot(first, get_fetch_planner())
+
+    @override_settings(EDITREGIONS_PLANNER_SAMPLES=0)
+    def test_hints_without_samples(self):
+        plan = self.plan()
+        self.assertEqual((SUBCLASS_JOIN, 2, 'hinted'),
+                         (plan.strategy, plan.width, plan.reason))
+        with self.settings(EDITREGIONS_PLANNER_HINTS={self.vendor: 1}):
+            self.assertEqual(SUBCLASS_SPLIT, self.plan().strategy)
+
+    @override_settings(EDITREGIONS_PLANNER_SAMPLES=2)
+    def test_samples_each_then_picks_fastest(self):
+        seen = []
+        for seconds in (0.5, 0.5, 0.1, 0.1):
+            plan = self.plan()
+            self.assertEqual('sampling', plan.reason)
+            seen.append(plan.strategy)
+            self.planner.record(plan=plan, seconds=seconds)
+        self.assertEqual([SUBCLASS_JOIN, SUBCLASS_JOIN,
+                          SUBCLASS_TABLES, SUBCLASS_TABLES], seen)
+        plan = self.plan()
+        self.assertEqual((SUBCLASS_TABLES, 'fastest'),
+                         (plan.strategy, plan.reason))
+
+    @override_settings(EDITREGIONS_PLANNER_SAMPLES=1)
+    def test_notices_slowing_down(self):
+        self.planner.record(plan=self.plan(), seconds=0.1)
+        self.planner.record(plan=self.plan(), seconds=0.2)
+        plan = self.plan()
+        self.assertEqual(SUBCLASS_JOIN, plan.strategy)
+        chosen = []
+        for x in range(0, 5):
+            self.planner.record(plan=plan, seconds=1.0)
+            plan = self.plan()
+            chosen.append(plan.strategy)
+        self.assertIn(SUBCLASS_TABLES, chosen)
+
+    @override_settings(EDITREGIONS_PLANNER_SAMPLES=1)
+    def test_describe(self):
+        self.planner.record(plan=self.plan(), seconds=0.1)
+        self.plan()
+        self.assertEqual([{'vendor': self.vendor, 'width': 2,
+                           'strategy': SUBCLASS_JOIN, 'count': 1,
+                           'average': 0.1, 'chosen': False}],
+                         self.planner.describe())
+
+    @override_settings(EDITREGIONS_SUBCLASS_STRATEGY='auto',
+                       EDITREGIONS_PLANNER_SAMPLES=1)
+    def test_fetching(self):
+        ct = get_content_type(User)
+        for position, chunk in enumerate((WYM(content='test'),
+                                          Iframe(url='https://a.b/'))):
+            chunk.region = 'test'
+            chunk.content_type = ct
+            chunk.content_id = '1'
+            chunk.position = position
+            chunk.save()
+        for x in range(0, 3):
+            chunks = EditRegionConfiguration()._fetch_subclasses(
+                lookups={'content_id': '1'}, models=self.models)
+            self.assertEqual([WYM, Iframe], [x.__class__ for x in chunks])
+        timings = get_fetch_planner().describe()
+        self.assertEqual(set([SUBCLASS_JOIN, SUBCLASS_TABLES]),
+                         set(x['strategy'] for x in timings))
+        self.assertEqual(3, sum(x['count'] for x in timings))
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+from django.contrib import admin
+from django.contrib.admin.sites import NotRegistered
+from django.contrib.auth.admin import UserAdmin
+from django.contrib.auth.models import User
+from django.template import Template, Context
+from django.test import TestCase as DjangoTestCase
+from editregions.contrib.embeds.admin import IframeAdmin
+from editregions.contrib.embeds.models import Iframe
+from editregions.utils.data import get_content_type, get_configuration
+from editregions.utils.prefetch import prefetch_editregions
+
+
+class PrefetchUserAdmin(UserAdmin):
+    def get_editregions_templates(self, obj):
+        return ['fillable_editregion_template.html']
+
+
+class PrefetchEditRegionsTestCase(DjangoTestCase):
+    def setUp(self):
+        try:
+            admin.site.unregister(User)
+        except NotRegistered:
+            pass
+        admin.site.register(User, PrefetchUserAdmin)
+        # the chunks are rendered by whatever is registered for them, which
+        # other tests may have changed.
+        self.previous_iframe_admin = admin.site._registry.get(Iframe, None)
+        if self.previous_iframe_admin is not None:
+            admin.site.unregister(Iframe)
+        admin.site.register(Iframe, IframeAdmin)
+        ct = get_content_type(User)
+        for x in range(0, 3):
+            user = User(username='test{0}'.format(x))
+            user.set_password('test')
+            user.full_clean()
+            user.save()
+            for y in range(0, x + 1):
+                iframe = Iframe(region='test', content_id=user.pk,
+                                content_type=ct, position=y,
+                                url='https://news.bbc.co.uk/{0}'.format(y))
+                iframe.full_clean()
+                iframe.save()
+
+    def tearDown(self):
+        admin.site.unregister(User)
+        admin.site.unregister(Iframe)
+        if self.previous_iframe_admin is not None:
+            admin.site._registry[Iframe] = self.previous_iframe_admin
+
+    def test_chunks_attached(self):
+        users = prefetch_editregions(User.objects.order_by('pk'))
+        self.assertEqual(3, len(users))
+        for count, user in enumerate(users, start=1):
+            with self.assertNumQueries(0):
+                chunks = get_configuration(user).fetch_chunks_for('test')
+            self.assertEqual(count, len(chunks))
+            self.assertEqual([x.position for x in chunks],
+                             list(range(0, count)))
+            for chunk in chunks:
+                self.assertEqual(chunk.content_id, str(user.pk))
+
+    def test_limited_regions(self):
+        users = prefetch_editregions(User.objects.all(), regions=['nope'])
+        for user in users:
+            self.assertFalse(get_configuration(user).has_fetched_all_regions())
+
+    def test_unsaved_objects_skipped(self):
+        users = prefetch_editregions([User()])
+        self.assertIsNone(get_configuration(users[0]))
+
+    def test_template_tag_reuses_prefetched(self):
+        users = prefetch_editregions(User.objects.order_by('pk'),
+                                     regions='test')
+        tmpl = Template("""
+        {% load editregion %}
+        {% for user in users %}{% editregion "test" user %}{% endeditregion %}{% endfor %}
+        """)
+        with self.assertNumQueries(0):
+            rendered = tmpl.render(Context({'users': users}))
+        self.assertEqual(6, rendered.count('<iframe'))
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+from django.contrib import admin
+from django.contrib.admin.sites import NotRegistered
+from django.contrib.auth.models import Permission
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase as DjangoTestCase
+from django.test.utils import override_settings
+from editregions.contrib.embeds.admin import IframeAdmin
+from editregions.contrib.embeds.models import Iframe
+from editregions.utils.data import get_modeladmin
+from editregions.utils.registry import (ChunkRenderer, get_chunk_renderer,
+                                        get_renderer_registry,
+                                        clear_renderer_registry)
+
+
+class ChunkRendererTestCase(DjangoTestCase):
+    def test_from_modeladmin(self):
+        modeladmin = get_modeladmin(Iframe)
+        renderer = ChunkRenderer.from_modeladmin(modeladmin)
+        self.assertEqual(renderer.model, Iframe)
+        self.assertIs(renderer.modeladmin, modeladmin)
+        self.assertEqual(renderer.render_into_region,
+                         modeladmin.render_into_region)
+
+    def test_missing_methods(self):
+        renderer = ChunkRenderer.from_modeladmin(object())
+        self.assertIsNone(renderer.model)
+        self.assertIsNone(renderer.render_into_region)
+        self.assertIsNone(renderer.get_editregions_subclass_tools)
+
+
+class ChunkRendererRegistryTestCase(DjangoTestCase):
+    def setUp(self):
+        clear_renderer_registry()
+
+    def tearDown(self):
+        clear_renderer_registry()
+
+    def test_built_once(self):
+        first = get_renderer_registry()
+        self.assertIs(first, get_renderer_registry())
+        self.assertIn(Iframe, first[1])
+
+    def test_get_for_instance_and_class(self):
+        modeladmin = get_modeladmin(Iframe)
+        self.assertIs(get_chunk_renderer(Iframe()).modeladmin, modeladmin)
+        self.assertIs(get_chunk_renderer(Iframe).modeladmin, modeladmin)
+
+    def test_reregistered_modeladmin_noticed(self):
+        get_chunk_renderer(Iframe)
+        try:
+            admin.site.unregister(Iframe)
+        except NotRegistered:
+            pass
+        admin.site.register(Iframe, IframeAdmin)
+        self.assertIs(get_chunk_renderer(Iframe).modeladmin,
+                      get_modeladmin(Iframe))
+
+    @override_settings(DEBUG=True)
+    def test_not_in_admin_debug(self):
+        with self.assertRaises(ImproperlyConfigured):
+            get_chunk_renderer(Permission)
+
+    @override_settings(DEBUG=False)
+    def test_not_in_admin_production(self):
+        with self.assertRaises(KeyError):
+            get_chunk_renderer(Permission)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+from django.template import TemplateDoesNotExist
+from django.test import TestCase as DjangoTestCase
+from django.test.utils import override_settings
+from editregions.utils.templates import (get_cached_template,
+                                         clear_template_cache,
+                                         select_existing_template,
+                                         is_template_missing,
+                                         clear_missing_templates)
+
+
+class GetCachedTemplateTestCase(DjangoTestCase):
+    def setUp(self):
+        clear_template_cache()
+
+    def tearDown(self):
+        clear_template_cache()
+
+    @override_settings(DEBUG=False)
+    def test_reused(self):
+        first = get_cached_template('editregions/embeds/iframe.html')
+        self.assertIs(first, get_cached_template(
+            ['editregions/embeds/iframe.html']))
+
+    @override_settings(DEBUG=False)
+    def test_first_existing(self):
+        template = get_cached_template(['editregions/uploads/file_nope.html',
+                                        'editregions/uploads/file.html'])
+        self.assertIs(template, get_cached_template(
+            ('editregions/uploads/file_nope.html',
+             'editregions/uploads/file.html')))
+        self.assertIsNot(template, get_cached_template(
+            'editregions/uploads/file.html'))
+
+    @override_settings(DEBUG=False)
+    def test_cleared(self):
+        first = get_cached_template('editregions/embeds/iframe.html')
+        clear_template_cache()
+        self.assertIsNot(first, get_cached_template(
+            'editregions/embeds/iframe.html'))
+
+    @override_settings(DEBUG=True)
+    def test_not_kept_in_debug(self):
+        first = get_cached_template('editregions/embeds/iframe.html')
+        self.assertIsNot(first, get_cached_template(
+            'editregions/embeds/iframe.html'))
+
+    @override_settings(DEBUG=False)
+    def test_missing(self):
+        with self.assertRaises(TemplateDoesNotExist):
+            get_cached_template('editregions/nope.html')
+
+
+class SelectExistingTemplateTestCase(DjangoTestCase):
+    def setUp(self):
+        clear_missing_templates()
+
+    def tearDown(self):
+        clear_missing_templates()
+
+    @override_settings(DEBUG=False)
+    def test_misses_remembered(self):
+        template = select_existing_template(['editregions/nope.html',
+                                             'editregions/embeds/iframe.html'])
+        self.assertEqual(template.name, 'editregions/embeds/iframe.html')
+        self.assertTrue(is_template_missing('editregions/nope.html'))
+        self.assertFalse(is_template_missing(
+            'editregions/embeds/iframe.html'))
+
+    @override_settings(DEBUG=False)
+    def test_all_missing(self):
+        with self.assertRaises(TemplateDoesNotExist):
+            select_existing_template('editregions/nope.html')
+        with self.assertRaises(TemplateDoesNotExist):
+            select_existing_template('editregions/nope.html')
+
+    @override_settings(DEBUG=False, EDITREGIONS_MISSING_TEMPLATES_SIZE=2)
+    def test_bounded(self):
+        for name in ('a.html', 'b.html', 'c.html'):
+            with self.assertRaises(TemplateDoesNotExist):
+                select_existing_template(name)
+        self.assertFalse(is_template_missing('a.html'))
+        self.assertTrue(is_template_missing('b.html'))
+        self.assertTrue(is_template_missing('c.html'))
+
+    @override_settings(DEBUG=False, EDITREGIONS_MISSING_TEMPLATES_SIZE=2)
+    def test_least_recently_used_forgotten(self):
+        for name in ('a.html', 'b.html'):
+            with self.assertRaises(TemplateDoesNotExist):
+                select_existing_template(name)
+        self.assertTrue(is_template_missing('a.html'))
+        with self.assertRaises(TemplateDoesNotExist):
+            select_existing_template('c.html')
+        self.assertTrue(is_template_missing('a.html'))
+        self.assertFalse(is_template_missing('b.html'))
+
+    @override_settings(DEBUG=True)
+    def test_not_kept_in_debug(self):
+        with self.assertRaises(TemplateDoesNotExist):
+            select_existing_template('editregions/nope.html')
+        self.assertFalse(is_template_missing('editregions/nope.html'))
@@ -1,10 +1,20 @@
 # -*- coding: utf-8 -*-
+import json
+from django.contrib import admin
+from django.contrib.admin.sites import NotRegistered
+from django.contrib.auth.admin import UserAdmin
+from django.contrib.auth.models import User, Permission
+from django.core.urlresolvers import reverse
 from django.http import HttpResponsePermanentRedirect, HttpResponseRedirect
 from django.test import RequestFactory
+from django.test import TestCase as DjangoTestCase
 try:
     from unittest.case import TestCase
 except ImportError:
     from django.utils.unittest.case import TestCase
+from editregions.contrib.embeds.admin import IframeAdmin
+from editregions.contrib.embeds.models import Iframe
+from editregions.utils.data import get_content_type
 from editregions.views import FormSuccess, EditRegionResponseMixin
 
 
@@ -81,3 +91,91 @@ class EditRegionResponseMixinTestCase(TestCase):
         self.assertIsInstance(response, HttpResponseRedirect)
         self.assertEqual(response.status_code, 302)
         self.assertEqual(response['Location'], 'http://example.com/')
+
+
+class UndeferredUserAdmin(UserAdmin):
+    def get_editregions_templates(self, obj):
+        return ['fillable_editregion_template.html']
+
+
+class RenderRegionUserAdmin(UndeferredUserAdmin):
+    def get_editregions_deferred_queryset(self, request):
+        return User.objects.filter(is_active=True)
+
+
+class RenderRegionTestCase(DjangoTestCase):
+    def setUp(self):
+        try:
+            admin.site.unregister(User)
+        except NotRegistered:
+            pass
+        admin.site.register(User, RenderRegionUserAdmin)
+        # the chunks are rendered by whatever is registered for them, which
+        # other tests may have changed.
+        self.previous_iframe_admin = admin.site._registry.get(Iframe, None)
+        if self.previous_iframe_admin is not None:
+            admin.site.unregister(Iframe)
+        admin.site.register(Iframe, IframeAdmin)
+        self.user = User.objects.create(username='test')
+        self.ct = get_content_type(User)
+        iframe = Iframe(region='test', content_id=self.user.pk,
+                        content_type=self.ct, position=1,
+                        url='https://news.bbc.co.uk/')
+        iframe.full_clean()
+        iframe.save()
+
+    def tearDown(self):
+        admin.site.unregister(User)
+        admin.site.unregister(Iframe)
+        if self.previous_iframe_admin is not None:
+            admin.site._registry[Iframe] = self.previous_iframe_admin
+
+    def url(self, content_type=None, content_id=None, region='test'):
+        return reverse('editregions_render_region', kwargs={
+            'content_type': content_type or self.ct.pk,
+            'content_id': content_id or self.user.pk,
+            'region': region,
+        })
+
+    def test_rendering(self):
+        response = self.client.get(self.url())
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('application/json', response['Content-Type'])
+        data = json.loads(response.content.decode('utf-8'))
+        self.assertEqual('test', data['region'])
+        self.assertIn('src="https://news.bbc.co.uk/"', data['html'])
+
+    def test_cache_headers(self):
+        response = self.client.get(self.url())
+        self.assertIn('max-age=300', response['Cache-Control'])
+        self.assertIn('Expires', response)
+        self.assertIn('Cookie', response['Vary'])
+
+    def test_unknown_region(self):
+        response = self.client.get(self.url(region='nope'))
+        self.assertEqual(404, response.status_code)
+
+    def test_invalid_region(self):
+        response = self.client.get(self.url(region='_nope'))
+        self.assertEqual(404, response.status_code)
+
+    def test_unknown_object(self):
+        response = self.client.get(self.url(content_id=self.user.pk + 1))
+        self.assertEqual(404, response.status_code)
+
+    def test_object_excluded_by_queryset(self):
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(self.url())
+        self.assertEqual(404, response.status_code)
+
+    def test_model_not_in_admin(self):
+        response = self.client.get(self.url(
+            content_type=get_content_type(Permission).pk))
+        self.assertEqual(404, response.status_code)
+
+    def test_refused_without_deferred_queryset(self):
+        admin.site.unregister(User)
+        admin.site.register(User, UndeferredUserAdmin)
+        response = self.client.get(self.url())
+        self.assertEqual(404, response.status_code)
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+from django.conf.urls import patterns, url
+from editregions.views import render_region
+
+urlpatterns = patterns('',
+                       url(r'^(?P<content_type>\d+)/(?P<content_id>[^/]+)/'
+                           r'(?P<region>[^/]+)/$',
+                           render_region, name='editregions_render_region'),
+                       )
@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+from hashlib import md5
+import logging
+import time
+from django.conf import settings
+from django.core.signals import request_started
+try:
+    from django.core.cache import caches
+
+    def get_cache(alias):
+        return caches[alias]
+except ImportError:  # pragma: no cover ... Django < 1.7
+    from django.core.cache import get_cache
+try:
+    from django.utils.encoding import force_text, force_bytes
+except ImportError:  # pragma: no cover ... < Django 1.5
+    from django.utils.encoding import (force_unicode as force_text,
+                                       smart_str as force_bytes)
+from editregions.constants import (RENDERED_CACHE_KEY, CHUNK_CACHE_KEY,
+                                   GENERATION_CACHE_KEY, EMPTY_CACHE_KEY,
+                                   INHERITED_CACHE_KEY, CACHE_TIMEOUT,
+                                   CONFIGURATION_VERSION_CACHE_KEY)
+from editregions.signals import configuration_changed
+
+logger = logging.getLogger(__name__)
+
+
+def get_editregions_cache():
+    """
+    The cache backend used for everything editregions stores, which may be
+    changed by setting `EDITREGIONS_CACHE_ALIAS`.
+
+    .. testcase:: GetEditRegionsCacheTestCase
+    """
+    alias = getattr(settings, 'EDITREGIONS_CACHE_ALIAS', 'default')
+    return get_cache(alias)
+
+
+def get_cache_timeout():
+    return getattr(settings, 'EDITREGIONS_CACHE_TIMEOUT', CACHE_TIMEOUT)
+
+
+def rendered_caching_enabled():
+    """
+    Caching the output of the `editregion` template tag is opt-in, because
+    chunks may render differently based on the template context.
+
+    .. testcase:: RenderedCacheTestCase
+    """
+    return getattr(settings, 'EDITREGIONS_CACHE_RENDERED', False)
+
+
+def get_generation_cache_key(content_type_id, content_id):
+    return GENERATION_CACHE_KEY.format(content_type_id=content_type_id,
+                                       content_id=force_text(content_id))
+
+
+def new_generation():
+    """
+    Generations start from the current time, rather than 1, so that if the
+    counter is evicted from the cache, keys built from the previous one
+    can't accidentally be used again.
+    """
+    return int(time.time() * 1000)
+
+
+def get_generation(content_type_id, content_id):
+    """
+    Every key for data which depends on the chunks attached to a parent object
+    includes this, so that invalidating all of them is a single increment,
+    regardless of how many regions or ancestors are involved.
+
+    .. testcase:: GenerationTestCase
+    """
+    key = get_generation_cache_key(content_type_id=content_type_id,
+                                   content_id=content_id)
+    cache = get_editregions_cache()
+    generation = cache.get(key, None)
+    if generation is None:
+        generation = new_generation()
+        # another process may have got there first, in which case use theirs.
+        if not cache.add(key, generation, None):
+            generation = cache.get(key, generation)
+    return generation
+
+
+def bump_generation(content_type_id, content_id):
+    """
+    .. testcase:: GenerationTestCase
+    """
+    key = get_generation_cache_key(content_type_id=content_type_id,
+                                   content_id=content_id)
+    cache = get_editregions_cache()
+    try:
+        generation = cache.incr(key)
+    except ValueError:
+        # not in the cache, so nothing can be using the old one.
+        generation = new_generation()
+        cache.set(key, generation, None)
+    logger.debug('Generation for {0} is now {1}'.format(key, generation))
+    return generation
+
+
+def get_generations(objects):
+    """
+    Like `get_generation`, but for many objects at once, asking the cache
+    for all of them in one go.
+
+    :param objects: an iterable of 2-tuples of content type id and content id.
+    :return: a list of generations, in the same order as `objects`
+
+    .. testcase:: GenerationTestCase
+    """
+    objects = tuple(objects)
+    keys = [get_generation_cache_key(content_type_id=content_type_id,
+                                     content_id=content_id)
+            for content_type_id, content_id in objects]
+    found = get_editregions_cache().get_many(keys)
+    generations = []
+    for (content_type_id, content_id), key in zip(objects, keys):
+        generation = found.get(key, None)
+        if generation is None:
+            generation = get_generation(content_type_id=content_type_id,
+                                        content_id=content_id)
+        generations.append(generation)
+    return generations
+
+
+def get_configuration_version():
+    """
+    The version of the region configurations, shared by every process via
+    the cache, like a generation.
+
+    .. testcase:: ConfigurationVersionTestCase
+    """
+    cache = get_editregions_cache()
+    version = cache.get(CONFIGURATION_VERSION_CACHE_KEY, None)
+    if version is None:
+        version = new_generation()
+        if not cache.add(CONFIGURATION_VERSION_CACHE_KEY, version, None):
+            version = cache.get(CONFIGURATION_VERSION_CACHE_KEY, version)
+    return version
+
+
+def bump_configuration_version():
+    """
+    .. testcase:: ConfigurationVersionTestCase
+    """
+    cache = get_editregions_cache()
+    try:
+        version = cache.incr(CONFIGURATION_VERSION_CACHE_KEY)
+    except ValueError:
+        version = new_generation()
+        cache.set(CONFIGURATION_VERSION_CACHE_KEY, version, None)
+    logger.debug('Configuration version is now {0}'.format(version))
+    return version
+
+
+#: the configuration version this process last saw.
+_seen_configuration_version = None
+
+
+def check_configuration_version(*args, **kwargs):
+    """
+    Connected to `request_started`, so that each process compares the shared
+    version with the one it last saw before using any of the configurations
+    it has remembered, and sends `configuration_changed` to forget them if
+    another process (eg: `clear_editregions_caches` on deploy) changed it.
+
+    :return: `True` if the configurations were forgotten.
+
+    .. testcase:: ConfigurationVersionTestCase
+    """
+    global _seen_configuration_version
+    version = get_configuration_version()
+    changed = (_seen_configuration_version is not None and
+               version != _seen_configuration_version)
+    _seen_configuration_version = version
+    if changed:
+        logger.info('Configuration version changed to {0}, forgetting '
+                    'remembered configurations'.format(version))
+        configuration_changed.send(sender=check_configuration_version)
+    return changed
+request_started.connect(check_configuration_version,
+                        dispatch_uid='editregions_check_configuration_version')
+
+
+def get_rendered_cache_key(content_type_id, content_id, region,
+                           generation=None):
+    """
+    .. testcase:: RenderedCacheTestCase
+    """
+    if generation is None:
+        generation = get_generation(content_type_id=content_type_id,
+                                    content_id=content_id)
+    return RENDERED_CACHE_KEY.format(content_type_id=content_type_id,
+                                     content_id=force_text(content_id),
+                                     generation=generation, region=region)
+
+
+def get_rendered_region(content_type_id, content_id, region,
+                        generation=None):
+    """
+    Pass the same `generation` here and to `set_rendered_region` when
+    rendering on a miss, so output rendered before a chunk was saved isn't
+    stored under the generation saving it started.
+
+    :return: the previously rendered output, or None if it wasn't in the cache.
+    """
+    key = get_rendered_cache_key(content_type_id=content_type_id,
+                                 content_id=content_id, region=region,
+                                 generation=generation)
+    return get_editregions_cache().get(key, None)
+
+
+def set_rendered_region(content_type_id, content_id, region, output,
+                        generation=None):
+    key = get_rendered_cache_key(content_type_id=content_type_id,
+                                 content_id=content_id, region=region,
+                                 generation=generation)
+    get_editregions_cache().set(key, output, get_cache_timeout())
+    return key
+
+
+def empty_caching_enabled():
+    """
+    Remembering which regions have no chunks, and which ancestor an inherited
+    region came from, is opt-in like the rest of the caching, though it
+    doesn't depend on the template context.
+
+    .. testcase:: EmptyCacheTestCase
+    """
+    return getattr(settings, 'EDITREGIONS_CACHE_EMPTY', False)
+
+
+def get_empty_cache_key(content_type_id, content_id, region,
+                        generation=None):
+    """
+    .. testcase:: EmptyCacheTestCase
+    """
+    if generation is None:
+        generation = get_generation(content_type_id=content_type_id,
+                                    content_id=content_id)
+    return EMPTY_CACHE_KEY.format(content_type_id=content_type_id,
+                                  content_id=force_text(content_id),
+                                  generation=generation, region=region)
+
+
+def is_region_empty(content_type_id, content_id, region, generation=None):
+    """
+    Like `get_rendered_region`, pass the same `generation` here and to
+    `set_region_empty`, so a region found empty just before a chunk was
+    added isn't marked empty under the generation adding it started.
+
+    :return: `True` if the region was previously found to have no chunks,
+             `False` if it had some, or it isn't known.
+    """
+    key = get_empty_cache_key(content_type_id=content_type_id,
+                              content_id=content_id, region=region,
+                              generation=generation)
+    return get_editregions_cache().get(key, False)
+
+
+def set_region_empty(content_type_id, content_id, region, generation=None):
+    key = get_empty_cache_key(content_type_id=content_type_id,
+                              content_id=content_id, region=region,
+                              generation=generation)
+    get_editregions_cache().set(key, True, get_cache_timeout())
+    return key
+
+
+def get_inherited_cache_key(content_type_id, content_id, region, ancestors):
+    """
+    Adding a chunk to the object, or to any of its ancestors, changes their
+    generation, and moving the object in the tree changes which ancestors it
+    has, either of which results in a different key.
+
+    :param ancestors: an iterable of 2-tuples of content type id and content
+                      id, in the order they'd be searched.
+
+    .. testcase:: EmptyCacheTestCase
+    """
+    objects = ((content_type_id, content_id),) + tuple(ancestors)
+    generations = get_generations(objects)
+    ancestry = '|'.join('{0}.{1}.{2}'.format(ct, force_text(pk), generation)
+                        for (ct, pk), generation in zip(objects, generations))
+    return INHERITED_CACHE_KEY.format(
+        content_type_id=content_type_id, content_id=force_text(content_id),
+        region=region, ancestry=md5(force_bytes(ancestry)).hexdigest())
+
+
+def get_inherited_distance(key):
+    """
+    :return: how many ancestors away the region was found, `0` if none of
+             them had any chunks, or `None` if it isn't known.
+    """
+    return get_editregions_cache().get(key, None)
+
+
+def set_inherited_distance(key, distance):
+    get_editregions_cache().set(key, distance, get_cache_timeout())
+    return key
+
+
+def chunk_caching_enabled():
+    """
+    Caching the output of individual chunks is opt-in, for the same reasons
+    as caching whole regions.
+
+    .. testcase:: ChunkCacheTestCase
+    """
+    return getattr(settings, 'EDITREGIONS_CACHE_CHUNKS', False)
+
+
+def get_chunk_cache_key(chunk, parts=()):
+    """
+    Chunks which haven't been saved can't be cached, nor can any whose
+    renderer returned `None` for the `parts` the output depends on.
+
+    .. testcase:: ChunkCacheTestCase
+    """
+    modified = getattr(chunk, 'modified', None)
+    if parts is None or chunk.pk is None or modified is None:
+        return None
+    extra = md5(force_bytes('|'.join(force_text(x) for x in parts)))
+    return CHUNK_CACHE_KEY.format(pk=chunk.pk,
+                                  modified=modified.strftime('%Y%m%d%H%M%S%f'),
+                                  extra=extra.hexdigest())
+
+
+def get_rendered_chunk(key):
+    return get_editregions_cache().get(key, None)
+
+
+def set_rendered_chunk(key, output):
+    get_editregions_cache().set(key, output, get_cache_timeout())
+    return key
@@ -0,0 +1,482 @@
+# -*- coding: utf-8 -*-
+from collections import defaultdict
+from datetime import date, time
+from decimal import Decimal
+from functools import reduce
+import heapq
+import logging
+from operator import or_
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.db.models import Q
+from django.utils import timezone
+try:
+    from django.apps import apps
+    get_models = apps.get_models
+except ImportError:  # pragma: no cover ... Django < 1.7
+    from django.db.models.loading import get_models
+from editregions.utils.data import get_content_type
+
+logger = logging.getLogger(__name__)
+
+
+def get_chunk_models():
+    """
+    Every installed, concrete subclass of `EditRegionChunk`, whether or not
+    it's enabled for any region.
+
+    .. testcase:: ChunkTypesTestCase
+    """
+    from editregions.models import EditRegionChunk
+    return tuple(model for model in get_models()
+                 if issubclass(model, EditRegionChunk)
+                 and model is not EditRegionChunk
+                 and not model._meta.proxy)
+
+
+def backfill_chunk_types(using=None):
+    """
+    Sets `chunk_type` for every chunk, for those saved before it existed (or
+    created without calling `save`, such as by `bulk_create`). Subclasses are
+    done from the shallowest to the deepest, so that grandchildren end up
+    with their own type rather than their parent's; whatever is left over
+    is a plain `EditRegionChunk`.
+
+    Models whose tables don't exist yet are skipped, as there can't be any
+    chunks of them. Returns the number of rows updated.
+
+    .. testcase:: ChunkTypesTestCase
+    """
+    from editregions.models import EditRegionChunk
+    using = using or DEFAULT_DB_ALIAS
+    tables = frozenset(connections[using].introspection.table_names())
+    models = sorted(get_chunk_models(),
+                    key=lambda model: len(model._meta.get_parent_list()))
+    updated = 0
+    for model in models:
+        if model._meta.db_table not in tables:
+            logger.info('Skipping {cls!r}, its table does not exist'.format(
+                cls=model))
+            continue
+        pks = model._default_manager.using(using).values('pk')
+        updated += (EditRegionChunk.objects.using(using)
+                    .filter(pk__in=pks)
+                    .update(chunk_type=get_content_type(model)))
+    updated += (EditRegionChunk.objects.using(using)
+                .filter(chunk_type__isnull=True)
+                .update(chunk_type=get_content_type(EditRegionChunk)))
+    return updated
+
+
+class SubclassGraph(object):
+    """
+    How the subclasses of `EditRegionChunk` relate to each other, worked
+    out once rather than on every fetch.
+
+    .. testcase:: SubclassGraphTestCase
+    """
+    __slots__ = ('depths', 'tables')
+
+    def __init__(self, models):
+        from editregions.models import EditRegionChunk
+        #: model -> how many concrete parents it has; children of
+        #: `EditRegionChunk` are 1, grandchildren 2 and so on.
+        self.depths = dict((model, len(model._meta.get_parent_list()))
+                           for model in models)
+        #: model -> the models whose tables must be joined to `EditRegionChunk`
+        #: to get it, including itself.
+        self.tables = dict(
+            (model, frozenset([model] + [
+                parent for parent in model._meta.get_parent_list()
+                if parent is not EditRegionChunk]))
+            for model in models)
+
+    def deepest_first(self, models):
+        """
+        Orders the given models so that subclasses come before the models
+        they inherit from, so each chunk is found as its most specific type.
+        """
+        return sorted(models, key=lambda model: -self.depths.get(model, 0))
+
+    def with_subclasses(self, models):
+        """
+        The given models, and every chunk model which subclasses any of
+        them; chunks of those are cast down to one of the given models.
+        """
+        models = tuple(models)
+        return frozenset(models).union(
+            model for model in self.depths if issubclass(model, models))
+
+    def cast_to(self, model, models):
+        """
+        Which of the given models a chunk of `model` is cast down to when
+        asking for `models`, as `select_subclasses` would: itself, or the
+        most specific of them it inherits from, or `None` if neither.
+        """
+        if model is None:
+            return None
+        if model in models:
+            return model
+        ancestors = [other for other in models if issubclass(model, other)]
+        if not ancestors:
+            return None
+        return self.deepest_first(ancestors)[0]
+
+    def join_width(self, models):
+        """
+        How many tables `select_subclasses` would join to get all of the
+        given models.
+        """
+        tables = set()
+        for model in models:
+            tables |= self.tables.get(model, frozenset([model]))
+        return len(tables)
+
+
+_graph = None
+
+
+def get_subclass_graph():
+    """
+    .. testcase:: SubclassGraphTestCase
+    """
+    global _graph
+    if _graph is None:
+        _graph = SubclassGraph(models=get_chunk_models())
+    return _graph
+
+
+def clear_subclass_graph():
+    """
+    .. testcase:: SubclassGraphTestCase
+    """
+    global _graph
+    _graph = None
+
+
+def get_chunk_type_filter(models):
+    """
+    A `Q` matching chunks which will be cast down to one of the `models`,
+    along with those whose `chunk_type` hasn't been recorded yet (see
+    `backfill_chunk_types`), as there's no telling what they are.
+
+    .. testcase:: ChunkTypeFilterTestCase
+    """
+    models = get_subclass_graph().with_subclasses(models)
+    ids = sorted(get_content_type(model).pk for model in models)
+    return Q(chunk_type__in=ids) | Q(chunk_type__isnull=True)
+
+
+def get_allowed_chunks_filter(models_by_region):
+    """
+    A `Q` matching only the chunks whose type is enabled for the region
+    they're in, given a dictionary of region name to the models enabled for
+    it, so that chunks of types which have been disabled, or removed, never
+    leave the database. Regions enabling the same models are combined.
+
+    .. testcase:: ChunkTypeFilterTestCase
+    """
+    regions_by_models = defaultdict(list)
+    for region, models in models_by_region.items():
+        if models:
+            regions_by_models[frozenset(models)].append(region)
+    allowed = [Q(region__in=sorted(regions)) &
+               get_chunk_type_filter(models=models)
+               for models, regions in regions_by_models.items()]
+    if not allowed:
+        return Q(pk__in=())
+    return reduce(or_, allowed)
+
+
+#: how many primary keys to ask for in one `pk IN (...)`; SQLite refuses
+#: more than 999 parameters in a query.
+PKS_PER_QUERY = 500
+
+
+def load_subclasses(pks, models):
+    """
+    Loads the chunks with the given primary keys from each of the subclass
+    tables in turn, deepest subclasses first, only asking each table for
+    those which haven't already been found.
+
+    Returns a dictionary of primary key to chunk.
+
+    .. testcase:: FetchByTableTestCase
+    """
+    found = {}
+    remaining = list(pks)
+    for model in get_subclass_graph().deepest_first(models):
+        if not remaining:
+            break
+        manager = model._default_manager
+        for start in range(0, len(remaining), PKS_PER_QUERY):
+            batch = remaining[start:start + PKS_PER_QUERY]
+            found.update((chunk.pk, chunk)
+                         for chunk in manager.filter(pk__in=batch))
+        remaining = [pk for pk in remaining if pk not in found]
+    return found
+
+
+def fetch_by_table(lookups, models, filters=()):
+    """
+    Casts chunks down to their subclasses without joining: the base rows
+    are read first, and then each of the `models` is asked for them by
+    primary key. Any `filters` (`Q` objects) are applied along with the
+    `lookups`.
+
+    Returns the chunks in the same order as the base rows.
+
+    .. testcase:: FetchByTableTestCase
+    """
+    from editregions.models import EditRegionChunk
+    pks = tuple(EditRegionChunk.objects.filter(*filters, **lookups)
+                .values_list('pk', flat=True))
+    if not pks:
+        return []
+    found = load_subclasses(pks=pks, models=models)
+    return [found[pk] for pk in pks if pk in found]
+
+
+def fetch_by_chunk_type(lookups, models, filters=()):
+    """
+    Casts chunks down to their subclasses without joining every table that
+    might be needed: the base rows are read first, and then each type
+    actually present (and in `models`) is asked for its chunks by primary
+    key, so the cost is one query, plus one per type in use.
+
+    Chunks whose type is a subclass of one of the `models` are loaded as
+    that model, as they would be by joining. Chunks without a `chunk_type`
+    (not yet backfilled) are looked for in every one of the `models`, as
+    `fetch_by_table` does.
+
+    Returns the chunks in the same order as the base rows.
+
+    .. testcase:: FetchByChunkTypeTestCase
+    """
+    from editregions.models import EditRegionChunk
+    rows = tuple(EditRegionChunk.objects.filter(*filters, **lookups)
+                 .values_list('pk', 'chunk_type_id'))
+    if not rows:
+        return []
+    pks_by_type = defaultdict(list)
+    for pk, chunk_type_id in rows:
+        pks_by_type[chunk_type_id].append(pk)
+
+    allowed = frozenset(models)
+    untyped = pks_by_type.pop(None, ())
+    if untyped:
+        logger.warning('{count} chunks have no chunk_type, run the '
+                       'backfill_editregions_chunk_types command'.format(
+                           count=len(untyped)))
+    found = load_subclasses(pks=untyped, models=models)
+    graph = get_subclass_graph()
+    pks_by_model = defaultdict(list)
+    for chunk_type_id, pks in pks_by_type.items():
+        model = graph.cast_to(
+            model=ContentType.objects.get_for_id(chunk_type_id).model_class(),
+            models=allowed)
+        if model is not None:
+            pks_by_model[model].extend(pks)
+    for model, pks in pks_by_model.items():
+        found.update(load_subclasses(pks=pks, models=(model,)))
+    return [found[pk] for pk, chunk_type_id in rows if pk in found]
+
+
+def _null_of_type(field, connection):
+    """
+    A NULL for padding out the columns of other subclasses in a `UNION ALL`,
+    cast to the column's type so that every branch agrees on it.
+    """
+    db_type = field.db_type(connection=connection)
+    # MySQL only casts to a handful of types, and works out the rest itself.
+    if db_type is None or connection.vendor == 'mysql':
+        return 'NULL'
+    # older versions of Django put CHECK constraints in the type.
+    db_type = db_type.partition(' CHECK')[0]
+    return 'CAST(NULL AS {0})'.format(db_type)
+
+
+def _value_from_union(field, value, connection):
+    """
+    Once combined, the database may no longer say what type each column is,
+    so values come back as they're stored (eg: SQLite's dates as strings),
+    and need converting as Django would have.
+    """
+    if value is None or isinstance(value, (date, time, Decimal)):
+        return value
+    convert_values = getattr(connection.ops, 'convert_values', None)
+    if convert_values is not None:
+        value = convert_values(value, field)
+    else:  # pragma: no cover ... Django >= 1.8
+        value = field.to_python(value)
+    internal_type = field.get_internal_type()
+    if internal_type in ('BooleanField', 'NullBooleanField'):
+        return bool(value)
+    if (internal_type == 'DateTimeField' and settings.USE_TZ
+            and timezone.is_naive(value)):
+        return timezone.make_aware(value, timezone.utc)
+    return value
+
+
+def build_union_query(lookups, models, using, filters=()):
+    """
+    Builds one `UNION ALL` query selecting the chunks matching `lookups` for
+    each of the `models`, where each branch selects only its own model's
+    rows and columns, and pads out the rest with NULLs, like so::
+
+        branch | base columns | model 0's columns | model 1's columns | ...
+
+    Chunks of a subclass of another of the `models` are left out of the
+    parent's branch, so each appears once.
+
+    Returns the SQL, its parameters, and for each branch, the model and the
+    positions in each row of its fields, in the order its `__init__` wants.
+
+    .. testcase:: FetchByUnionTestCase
+    """
+    from editregions.models import EditRegionChunk
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    base_table = quote(EditRegionChunk._meta.db_table)
+    base_pk = '{0}.{1}'.format(base_table,
+                               quote(EditRegionChunk._meta.pk.column))
+    base_fields = EditRegionChunk._meta.fields
+    base_names = frozenset(field.attname for field in base_fields)
+    extra_fields = [[field for field in model._meta.fields
+                     if field.attname not in base_names]
+                    for model in models]
+
+    # every branch names its columns the same, whichever it fills in.
+    aliases = [quote('editregions_branch')]
+    aliases.extend(quote(field.column) for field in base_fields)
+    for index, fields in enumerate(extra_fields):
+        aliases.extend(quote('{0}_{1}'.format(index, field.column))
+                       for field in fields)
+
+    # 0 is the branch, then the base columns, then each model's own ones.
+    position = 1 + len(base_fields)
+    base_positions = dict((field.attname, index + 1)
+                          for index, field in enumerate(base_fields))
+    extra_positions = []
+    for fields in extra_fields:
+        extra_positions.append(dict(
+            (field.attname, position + index)
+            for index, field in enumerate(fields)))
+        position += len(fields)
+
+    branches = []
+    selects = []
+    params = []
+    for index, model in enumerate(models):
+        children = [other for other in models
+                    if other is not model and issubclass(other, model)]
+        queryset = model._base_manager.using(using).filter(*filters,
+                                                           **lookups)
+        for child in children:
+            queryset = queryset.exclude(
+                pk__in=child._base_manager.using(using).values('pk'))
+        sql, branch_params = queryset.order_by().values_list(
+            'pk').query.get_compiler(using=using).as_sql()
+
+        # the model's own columns may be spread across several tables, if
+        # it inherits from another chunk, each keyed by the base's id.
+        parents = []
+        for field in extra_fields[index]:
+            if field.model not in parents:
+                parents.append(field.model)
+        joins = ''.join(
+            ' INNER JOIN {table} ON {table}.{pk} = {base_pk}'.format(
+                table=quote(parent._meta.db_table),
+                pk=quote(parent._meta.pk.column), base_pk=base_pk)
+            for parent in parents)
+
+        columns = [str(index)]
+        columns.extend('{0}.{1}'.format(base_table, quote(field.column))
+                       for field in base_fields)
+        for other_index, fields in enumerate(extra_fields):
+            if other_index == index:
+                columns.extend('{0}.{1}'.format(
+                    quote(field.model._meta.db_table), quote(field.column))
+                    for field in fields)
+            else:
+                columns.extend(_null_of_type(field=field,
+                                             connection=connection)
+                               for field in fields)
+        selects.append(
+            'SELECT {columns} FROM {base}{joins} '
+            'WHERE {base_pk} IN ({sql})'.format(
+                columns=', '.join('{0} AS {1}'.format(column, alias)
+                                  for column, alias in zip(columns, aliases)),
+                base=base_table, joins=joins, base_pk=base_pk, sql=sql))
+        params.extend(branch_params)
+
+        positions = dict(base_positions)
+        positions.update(extra_positions[index])
+        branches.append((model, [(field, positions[field.attname])
+                                 for field in model._meta.fields]))
+
+    ordering = []
+    for name in EditRegionChunk._meta.ordering:
+        descending = name.startswith('-')
+        field = EditRegionChunk._meta.get_field(name.lstrip('-'))
+        ordering.append('{0} {1}'.format(aliases[base_positions[field.attname]],
+                                         'DESC' if descending else 'ASC'))
+    sql = ' UNION ALL '.join(selects)
+    if ordering:
+        sql = '{0} ORDER BY {1}'.format(sql, ', '.join(ordering))
+    return sql, params, branches
+
+
+def fetch_by_union(lookups, models, filters=()):
+    """
+    Casts chunks down to their subclasses in a single query, without joining
+    every table to every row: each of the `models` is selected separately,
+    joined only to its own parents, and the results combined with
+    `UNION ALL` (see `build_union_query`). Chunks which aren't any of the
+    `models` aren't selected at all.
+
+    Returns the chunks in order.
+
+    .. testcase:: FetchByUnionTestCase
+    """
+    from editregions.models import EditRegionChunk
+    if not models:
+        return []
+    using = EditRegionChunk.polymorphs.db
+    connection = connections[using]
+    sql, params, branches = build_union_query(lookups=lookups, models=models,
+                                              using=using, filters=filters)
+    cursor = connection.cursor()
+    cursor.execute(sql, params)
+    chunks = []
+    for row in cursor.fetchall():
+        model, positions = branches[int(row[0])]
+        chunk = model(*[_value_from_union(field=field, value=row[position],
+                                          connection=connection)
+                        for field, position in positions])
+        chunk._state.adding = False
+        chunk._state.db = using
+        chunks.append(chunk)
+    return chunks
+
+
+def _by_position(index, stream):
+    from editregions.models import EditRegionChunk
+    return ((chunk.position, index, order, chunk)
+            for order, chunk in enumerate(stream)
+            if chunk.__class__ is not EditRegionChunk)
+
+
+def merge_chunks(streams):
+    """
+    Merges several streams of chunks, each already ordered by position, into
+    one, throwing out any which weren't cast down to a subclass. Chunks in
+    the same position keep the order of the streams they came from.
+
+    .. testcase:: MergeChunksTestCase
+    """
+    decorated = [_by_position(index=index, stream=stream)
+                 for index, stream in enumerate(streams)]
+    return [chunk for position, index, order, chunk
+            in heapq.merge(*decorated)]
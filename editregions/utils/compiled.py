@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import logging
+import marshal
+from django.conf import settings
+try:
+    from collections import OrderedDict as SortedDict
+except ImportError:  # pragma: no cover ... Python < 2.7, Django < 1.7
+    from django.utils.datastructures import SortedDict
+from editregions.constants import COMPILED_CONFIG_VERSION
+from editregions.utils.data import freeze, unfreeze
+
+logger = logging.getLogger(__name__)
+
+#: path -> {template name: frozen region configuration}
+_compiled = {}
+
+
+def get_compiled_config_path():
+    return getattr(settings, 'EDITREGIONS_COMPILED_CONFIG', None)
+
+
+def dump_compiled_configs(configs):
+    """
+    Serializes a mapping of template names to decoded region configurations
+    using `marshal`, which is the quickest format for Python to load, but
+    only readable by the same version of Python.
+
+    .. testcase:: CompiledConfigTestCase
+    """
+    return marshal.dumps({
+        'version': COMPILED_CONFIG_VERSION,
+        'templates': unfreeze(configs),
+    })
+
+
+def load_compiled_configs(data):
+    """
+    .. testcase:: CompiledConfigTestCase
+    """
+    payload = marshal.loads(data)
+    if payload.get('version', None) != COMPILED_CONFIG_VERSION:
+        raise ValueError('Compiled region configurations are version {0!r}, '
+                         'expected {1!r}'.format(payload.get('version', None),
+                                                 COMPILED_CONFIG_VERSION))
+    return dict((name, freeze(SortedDict(sorted(config.items()))))
+                for name, config in payload['templates'].items())
+
+
+def get_compiled_configs():
+    """
+    Loads the file written by `compile_editregions_config` the first time
+    it's needed, if `EDITREGIONS_COMPILED_CONFIG` is set.
+
+    A file which can't be read is an error when `DEBUG` is on, and otherwise
+    logged and ignored, so that templates are used as normal.
+
+    .. testcase:: CompiledConfigTestCase
+    """
+    path = get_compiled_config_path()
+    if not path:
+        return None
+    try:
+        return _compiled[path]
+    except KeyError:
+        pass
+    try:
+        with open(path, 'rb') as f:
+            configs = load_compiled_configs(f.read())
+    except (IOError, OSError, EOFError, ValueError, TypeError, KeyError):
+        if settings.DEBUG:
+            raise
+        logger.exception('Unable to load compiled region configurations '
+                         'from {path}'.format(path=path))
+        configs = None
+    _compiled[path] = configs
+    return configs
+
+
+def clear_compiled_configs():
+    """
+    .. testcase:: CompiledConfigTestCase
+    """
+    _compiled.clear()
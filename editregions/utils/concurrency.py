@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+import logging
+import time
+from multiprocessing.pool import ThreadPool
+from threading import Condition, Lock
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import translation
+from editregions.constants import (RENDER_WORKERS, RENDER_CHUNK_TIMEOUT,
+                                   RENDER_REGION_TIMEOUT, QUERY_WORKERS)
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = Lock()
+_query_pool = None
+_query_pool_lock = Lock()
+
+
+def concurrent_rendering_enabled():
+    """
+    Rendering chunks in threads is opt-in, as the ModelAdmins doing the
+    rendering need to be thread-safe.
+
+    .. testcase:: ConcurrentRenderingTestCase
+    """
+    return getattr(settings, 'EDITREGIONS_RENDER_CONCURRENTLY', False)
+
+
+def get_chunk_timeout():
+    return getattr(settings, 'EDITREGIONS_RENDER_CHUNK_TIMEOUT',
+                   RENDER_CHUNK_TIMEOUT)
+
+
+def get_region_timeout():
+    return getattr(settings, 'EDITREGIONS_RENDER_REGION_TIMEOUT',
+                   RENDER_REGION_TIMEOUT)
+
+
+def get_render_pool():
+    """
+    One pool for the whole process, created the first time it's needed, so
+    the number of threads doing blocking work is bounded regardless of how
+    many requests are rendering at once.
+
+    .. testcase:: ConcurrentRenderingTestCase
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = getattr(settings, 'EDITREGIONS_RENDER_WORKERS',
+                              RENDER_WORKERS)
+            logger.debug('Starting {0} threads for rendering '
+                         'chunks'.format(workers))
+            _pool = ThreadPool(processes=workers)
+    return _pool
+
+
+def run_in_thread(func, language, **kwargs):
+    """
+    Calls `func` with the given `kwargs` in the state the calling thread
+    was in, as far as Django is concerned.
+
+    Each worker thread keeps its own database connections between tasks,
+    dropping only those which have broken; the rest are closed when the
+    pool is shut down. Before Django 1.6, the transaction each task's
+    queries opened is ended afterwards.
+
+    .. testcase:: ConcurrentQueriesTestCase
+    """
+    close_broken_connections()
+    if language is not None:
+        translation.activate(language)
+    try:
+        return func(**kwargs)
+    finally:
+        if language is not None:
+            translation.deactivate()
+        end_thread_transactions()
+
+
+def end_thread_transactions():
+    """
+    Before Django 1.6, connections aren't in autocommit mode, so the first
+    query a task runs opens a transaction which would otherwise last as long
+    as the thread, reading a stale snapshot or sitting idle in transaction.
+    The ORM commits its own writes, so whatever is left is rolled back.
+
+    .. testcase:: ConcurrentQueriesTestCase
+    """
+    for connection in connections.all():
+        # Django >= 1.6 is in autocommit mode outside of atomic blocks.
+        if (hasattr(connection, 'in_atomic_block') or
+                connection.connection is None):
+            continue
+        if not transaction.is_managed(using=connection.alias):
+            transaction.rollback_unless_managed(using=connection.alias)
+
+
+def close_broken_connections():
+    """
+    Closes this thread's connections which have had errors and no longer
+    work, as Django does between requests.
+    """
+    for connection in connections.all():
+        # Django < 1.6 doesn't note errors, nor have `is_usable`.
+        if (getattr(connection, 'errors_occurred', False) and
+                not connection.is_usable()):
+            connection.close()
+
+
+def close_thread_connections():
+    for connection in connections.all():
+        connection.close()
+
+
+def shutdown_pool(pool, timeout=None):
+    """
+    Closes the database connections held by each of the `pool`'s threads,
+    from the thread itself, then stops the pool.
+
+    Every thread is handed one task which doesn't finish until all of them
+    have started, so no thread can pick up two of them and leave another
+    one's connections open.
+
+    .. testcase:: ConcurrentQueriesTestCase
+    """
+    # the number of threads isn't public, but has been `_processes` since
+    # ThreadPool existed.
+    workers = pool._processes
+    arrived = Condition()
+    state = {'count': 0}
+
+    def close_when_all_arrived():
+        with arrived:
+            state['count'] += 1
+            arrived.notify_all()
+            deadline = None if timeout is None else time.time() + timeout
+            while state['count'] < workers:
+                if deadline is None:
+                    arrived.wait()
+                elif time.time() < deadline:
+                    arrived.wait(deadline - time.time())
+                else:
+                    break
+        close_thread_connections()
+
+    results = [pool.apply_async(close_when_all_arrived)
+               for _ in range(workers)]
+    for result in results:
+        result.wait(timeout)
+    pool.close()
+    pool.join()
+
+
+def shutdown_render_pool(timeout=None):
+    """
+    Stops the pool `get_render_pool` made, if there is one; the next call
+    to `get_render_pool` makes a new one.
+
+    .. testcase:: ConcurrentRenderingTestCase
+    """
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        shutdown_pool(pool=pool, timeout=timeout)
+
+
+def concurrent_queries_enabled():
+    """
+    Running the split subclass queries in threads is opt-in, as each thread
+    needs its own database connection.
+
+    .. testcase:: ConcurrentQueriesTestCase
+    """
+    return getattr(settings, 'EDITREGIONS_SPLIT_CONCURRENTLY', False)
+
+
+def can_query_concurrently(using):
+    """
+    Other threads can't see anything uncommitted by this one, nor share an
+    in-memory SQLite database, so in either case the queries need running
+    here instead.
+
+    .. testcase:: ConcurrentQueriesTestCase
+    """
+    connection = connections[using]
+    if hasattr(connection, 'in_atomic_block'):
+        if connection.in_atomic_block:
+            return False
+    # Django < 1.6 has no atomic blocks, only managed transactions.
+    elif (transaction.is_managed(using=using) and
+            transaction.is_dirty(using=using)):
+        return False
+    if (connection.vendor == 'sqlite' and
+            connection.settings_dict.get('NAME') in ('', ':memory:')):
+        return False
+    return True
+
+
+def get_query_pool():
+    """
+    Like `get_render_pool`, but for running queries, sized by
+    `EDITREGIONS_SPLIT_WORKERS`.
+
+    .. testcase:: ConcurrentQueriesTestCase
+    """
+    global _query_pool
+    with _query_pool_lock:
+        if _query_pool is None:
+            workers = getattr(settings, 'EDITREGIONS_SPLIT_WORKERS',
+                              QUERY_WORKERS)
+            logger.debug('Starting {0} threads for fetching '
+                         'chunks'.format(workers))
+            _query_pool = ThreadPool(processes=workers)
+    return _query_pool
+
+
+def shutdown_query_pool(timeout=None):
+    """
+    Like `shutdown_render_pool`, but for the pool `get_query_pool` made.
+
+    .. testcase:: ConcurrentQueriesTestCase
+    """
+    global _query_pool
+    with _query_pool_lock:
+        pool, _query_pool = _query_pool, None
+    if pool is not None:
+        shutdown_pool(pool=pool, timeout=timeout)
+
+
+def evaluate_queryset(queryset):
+    return list(queryset)
+
+
+def run_queries_concurrently(querysets):
+    """
+    Evaluates each of the querysets in the query pool, each thread using
+    its own database connection, and returns their results in the same
+    order as the querysets.
+
+    .. testcase:: ConcurrentQueriesTestCase
+    """
+    pool = get_query_pool()
+    results = [pool.apply_async(run_in_thread,
+                                args=(evaluate_queryset, None),
+                                kwds={'queryset': queryset})
+               for queryset in querysets]
+    return [result.get() for result in results]
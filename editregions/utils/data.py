@@ -2,7 +2,9 @@
 from contextlib import contextmanager
 import logging
 from collections import namedtuple
+from threading import local
 from django.contrib.contenttypes.models import ContentType
+from django.core.signals import request_started, request_finished
 from django.core.exceptions import ImproperlyConfigured
 from django.template.context import BaseContext, Context
 try:
@@ -16,7 +18,12 @@ try:
     from django.utils.six import string_types
 except ImportError:  # pragma: no cover
     string_types = basestring,
+try:
+    from collections import OrderedDict as SortedDict
+except ImportError:  # pragma: no cover ... Python < 2.7, Django < 1.7
+    from django.utils.datastructures import SortedDict
 from adminlinks.templatetags.utils import get_admin_site
+from editregions.constants import CONFIGURATION_STORE_SIZE
 
 logger = logging.getLogger(__name__)
 
@@ -99,16 +106,127 @@ def get_modeladmin(obj, admin_namespace='admin'):
     # unrecoverable ...?
 
 
+def allows_deferred_rendering(modeladmin):
+    """
+    Regions may only be rendered by `editregions.views.render_region`, and so
+    deferred, for objects whose ModelAdmin says which of them anyone may see.
+
+    .. testcase:: EditRegionTagDeferredTestCase
+    """
+    return hasattr(modeladmin, 'get_editregions_deferred_queryset')
+
+
+class ConfigurationStore(object):
+    """
+    Holds the configuration (and so the fetched chunks) for each object
+    rendered during a request, instead of attaching them to the object
+    itself, where they'd live for as long as it does.
+
+    Only the most recently used `max_size` objects are remembered.
+
+    .. testcase:: ConfigurationStoreTestCase
+    """
+    __slots__ = ('configurations', 'max_size')
+
+    def __init__(self, max_size=None):
+        if max_size is None:
+            max_size = getattr(settings, 'EDITREGIONS_CONFIGURATION_STORE_SIZE',
+                               CONFIGURATION_STORE_SIZE)
+        self.max_size = max_size
+        #: id(obj) -> (obj, configuration); the object is kept so that its id
+        #: can't be reused by another object while it's in here.
+        self.configurations = SortedDict()
+
+    def __len__(self):
+        return len(self.configurations)
+
+    def get(self, obj):
+        key = id(obj)
+        try:
+            stored_obj, config = self.configurations[key]
+        except KeyError:
+            return None
+        if stored_obj is not obj:
+            return None
+        # move it to the end, so it's the last to be forgotten.
+        del self.configurations[key]
+        self.configurations[key] = (stored_obj, config)
+        return config
+
+    def set(self, obj, config):
+        key = id(obj)
+        if key in self.configurations:
+            del self.configurations[key]
+        self.configurations[key] = (obj, config)
+        while len(self.configurations) > self.max_size:
+            del self.configurations[next(iter(self.configurations))]
+        return config
+
+    def clear(self):
+        self.configurations.clear()
+
+
+_stores = local()
+
+
+def get_configuration_store():
+    """
+    Returns the store for the current thread, creating it if need be.
+
+    .. testcase:: ConfigurationStoreTestCase
+    """
+    try:
+        return _stores.current
+    except AttributeError:
+        store = _stores.current = ConfigurationStore()
+        return store
+
+
+def clear_configuration_store(*args, **kwargs):
+    """
+    Connected to `request_started` and `request_finished`, so that nothing
+    fetched for one request is seen by, or kept alive until, the next.
+
+    .. testcase:: ConfigurationStoreTestCase
+    """
+    get_configuration_store().clear()
+request_started.connect(clear_configuration_store,
+                        dispatch_uid='editregions_clear_store_on_start')
+request_finished.connect(clear_configuration_store,
+                         dispatch_uid='editregions_clear_store_on_finish')
+
+
+@contextmanager
+def configuration_scope(max_size=None):
+    """
+    Uses a new store for everything rendered inside the block, forgetting it
+    afterwards; for rendering outside of a request (eg: in a management
+    command or task queue), or to limit how long chunks are kept for.
+
+    .. testcase:: ConfigurationStoreTestCase
+    """
+    previous = getattr(_stores, 'current', None)
+    store = _stores.current = ConfigurationStore(max_size=max_size)
+    try:
+        yield store
+    finally:
+        store.clear()
+        if previous is None:
+            del _stores.current
+        else:
+            _stores.current = previous
+
+
 def attach_configuration(obj, config_class):
     """
     .. testcase:: AttachConfigurationTestCase
     """
     created = False
-    if not hasattr(obj, '__editregionconfig__'):
-        logger.debug('__editregionconfig__ not on {cls!r} for this template '
+    store = get_configuration_store()
+    if store.get(obj) is None:
+        logger.debug('configuration not stored for {cls!r} for this template '
                      'rendering request, creating it'.format(cls=obj))
-
-        setattr(obj, '__editregionconfig__', config_class(obj))
+        store.set(obj, config_class(obj))
         created = True
     return obj, created
 
@@ -117,7 +235,7 @@ def get_configuration(obj):
     """
     .. testcase:: GetConfigurationTestCase
     """
-    return getattr(obj, '__editregionconfig__', None)
+    return get_configuration_store().get(obj)
 
 
 @contextmanager
@@ -232,3 +350,66 @@ class RegionMedia(object):
 
     def remove_from_bottom(self, data):
         return self.remove('bottom', data)
+
+
+class FrozenSortedDict(SortedDict):
+    """
+    A `SortedDict` which can't be changed after it has been created, so that
+    it may safely be shared between everything that needs it.
+
+    .. testcase:: FrozenSortedDictTestCase
+    """
+    def __init__(self, *args, **kwargs):
+        self._frozen = False
+        super(FrozenSortedDict, self).__init__(*args, **kwargs)
+        self._frozen = True
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError('{cls} may not be changed'.format(
+            cls=self.__class__.__name__))
+
+    def __setitem__(self, key, value, *args, **kwargs):
+        if self._frozen:
+            self._immutable()
+        return super(FrozenSortedDict, self).__setitem__(key, value,
+                                                         *args, **kwargs)
+
+    def __delitem__(self, key, *args, **kwargs):
+        self._immutable()
+
+    def __reduce__(self):
+        return self.__class__, (list(self.items()),)
+
+    clear = pop = popitem = setdefault = update = _immutable
+
+
+def freeze(value):
+    """
+    Converts a decoded configuration, and everything inside it, into
+    structures which can't be changed: dictionaries become `FrozenSortedDict`
+    instances and lists become tuples.
+
+    .. testcase:: FrozenSortedDictTestCase
+    """
+    if isinstance(value, FrozenSortedDict):
+        return value
+    if isinstance(value, dict):
+        return FrozenSortedDict((key, freeze(item))
+                                for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def unfreeze(value):
+    """
+    The opposite of `freeze`, for when plain dictionaries and lists are
+    needed, such as for serializing.
+
+    .. testcase:: FrozenSortedDictTestCase
+    """
+    if isinstance(value, dict):
+        return dict((key, unfreeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return [unfreeze(item) for item in value]
+    return value
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+from collections import namedtuple
+import logging
+from threading import Lock
+from django.conf import settings
+from django.db import connections
+from editregions.constants import (SPLIT_CHUNKS_EVERY, PLANNER_JOIN_WIDTHS,
+                                   PLANNER_SAMPLES, SUBCLASS_JOIN,
+                                   SUBCLASS_SPLIT, SUBCLASS_TABLES)
+from editregions.utils.chunktypes import get_subclass_graph
+
+logger = logging.getLogger(__name__)
+
+
+class FetchPlan(namedtuple('FetchPlan', ('strategy', 'vendor', 'width',
+                                         'max_width', 'reason'))):
+    """
+    How the planner decided to fetch chunks for a set of models: which
+    `strategy` to use, for how many tables (`width`) on which database
+    `vendor`, the most tables it would join at once (`max_width`) and why.
+
+    .. testcase:: FetchPlannerTestCase
+    """
+    __slots__ = ()
+
+
+class FetchPlanner(object):
+    """
+    Chooses between joining every subclass table at once, joining them in
+    groups, or querying each table separately, for each number of tables and
+    database vendor.
+
+    Each way is tried `EDITREGIONS_PLANNER_SAMPLES` times, after which the
+    one which has been fastest on average is used, and its timings kept up
+    to date. Until then, or with no samples, tables are joined while there
+    are no more than the vendor's hint in `EDITREGIONS_PLANNER_HINTS`.
+
+    .. testcase:: FetchPlannerTestCase
+    """
+    __slots__ = ('timings', 'decisions', 'lock')
+
+    def __init__(self):
+        #: (vendor, width, strategy) -> [times used, average seconds]
+        self.timings = {}
+        #: (vendor, width) -> the strategy last chosen
+        self.decisions = {}
+        self.lock = Lock()
+
+    def get_samples(self):
+        return getattr(settings, 'EDITREGIONS_PLANNER_SAMPLES',
+                       PLANNER_SAMPLES)
+
+    def get_max_join_width(self, vendor):
+        hints = getattr(settings, 'EDITREGIONS_PLANNER_HINTS',
+                        PLANNER_JOIN_WIDTHS)
+        default = getattr(settings, 'EDITREGIONS_SPLIT_EVERY',
+                          SPLIT_CHUNKS_EVERY)
+        return hints.get(vendor, default)
+
+    def get_candidates(self, width, max_width):
+        if width <= max_width:
+            return (SUBCLASS_JOIN, SUBCLASS_TABLES)
+        return (SUBCLASS_SPLIT, SUBCLASS_TABLES)
+
+    def plan(self, models, using):
+        vendor = connections[using].vendor
+        width = get_subclass_graph().join_width(models)
+        max_width = self.get_max_join_width(vendor)
+        candidates = self.get_candidates(width=width, max_width=max_width)
+        samples = self.get_samples()
+        with self.lock:
+            measured = [(strategy, self.timings.get((vendor, width, strategy)))
+                        for strategy in candidates]
+        if samples < 1:
+            strategy, reason = candidates[0], 'hinted'
+        else:
+            unsampled = [strategy for strategy, timing in measured
+                         if timing is None or timing[0] < samples]
+            if unsampled:
+                strategy, reason = unsampled[0], 'sampling'
+            else:
+                strategy = min(measured, key=lambda x: x[1][1])[0]
+                reason = 'fastest'
+        plan = FetchPlan(strategy=strategy, vendor=vendor, width=width,
+                         max_width=max_width, reason=reason)
+        self.log_decision(plan=plan)
+        return plan
+
+    def log_decision(self, plan):
+        key = (plan.vendor, plan.width)
+        with self.lock:
+            changed = self.decisions.get(key, None) != plan.strategy
+            self.decisions[key] = plan.strategy
+        if changed:
+            logger.info('Fetching chunks from {width} tables on {vendor} '
+                        'using "{strategy}" ({reason})'.format(
+                            width=plan.width, vendor=plan.vendor,
+                            strategy=plan.strategy, reason=plan.reason))
+
+    def record(self, plan, seconds):
+        """
+        Keeps the average time taken for each plan; once there are enough
+        samples, recent times count for more, so that the planner can notice
+        the tables growing.
+        """
+        key = (plan.vendor, plan.width, plan.strategy)
+        samples = self.get_samples()
+        with self.lock:
+            timing = self.timings.setdefault(key, [0, 0.0])
+            timing[0] += 1
+            if timing[0] <= samples:
+                timing[1] += (seconds - timing[1]) / timing[0]
+            else:
+                timing[1] = (timing[1] * 0.9) + (seconds * 0.1)
+        return timing
+
+    def describe(self):
+        """
+        Everything the planner knows, for inspecting from a shell or an
+        admin view: a list of dictionaries, one for each way of fetching
+        each number of tables tried so far, saying whether it's the one
+        currently being used.
+        """
+        with self.lock:
+            timings = sorted(self.timings.items())
+            decisions = dict(self.decisions)
+        return [{'vendor': vendor, 'width': width, 'strategy': strategy,
+                 'count': count, 'average': average,
+                 'chosen': decisions.get((vendor, width)) == strategy}
+                for (vendor, width, strategy), (count, average) in timings]
+
+
+_planner = None
+_planner_lock = Lock()
+
+
+def get_fetch_planner():
+    """
+    .. testcase:: FetchPlannerTestCase
+    """
+    global _planner
+    with _planner_lock:
+        if _planner is None:
+            _planner = FetchPlanner()
+    return _planner
+
+
+def clear_fetch_planner():
+    """
+    .. testcase:: FetchPlannerTestCase
+    """
+    global _planner
+    with _planner_lock:
+        _planner = None
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+from collections import defaultdict
+import logging
+try:
+    from django.utils.encoding import force_text
+except ImportError:  # pragma: no cover ... < Django 1.5
+    from django.utils.encoding import force_unicode as force_text
+try:
+    from django.utils.six import string_types
+except ImportError:  # pragma: no cover
+    string_types = basestring,
+from editregions.models import EditRegionConfiguration
+from editregions.utils.chunktypes import get_allowed_chunks_filter
+from editregions.utils.data import attach_configuration, get_configuration
+
+logger = logging.getLogger(__name__)
+
+
+def prefetch_editregions(objs, regions=None):
+    """
+    For listing pages which render the same region(s) for many objects,
+    fetch the chunks for all of them up front, doing one query (or one per
+    group of subclasses, see `_fetch_subclasses`) per content type,
+    rather than at least one per object.
+
+    Each object gets a configuration attached, populated with its chunks, which
+    the template tags will then re-use::
+
+        objs = prefetch_editregions(MyThing.objects.all(), regions=['teaser'])
+
+    :param objs: an iterable of model instances, such as a queryset.
+    :param regions: the names of the regions which will be rendered. If
+                    `None`, every configured region is fetched.
+    :return: the objects, as a list.
+
+    .. testcase:: PrefetchEditRegionsTestCase
+    """
+    objs = list(objs)
+    if isinstance(regions, string_types):
+        regions = (regions,)
+    if regions is not None:
+        regions = frozenset(regions)
+
+    by_content_type = defaultdict(list)
+    for obj in objs:
+        if obj.pk is None:
+            logger.debug('Skipping {obj!r} as it has not been '
+                         'saved'.format(obj=obj))
+            continue
+        attach_configuration(obj, EditRegionConfiguration)
+        config = get_configuration(obj)
+        wanted = tuple(region for region in config.config
+                       if regions is None or region in regions)
+        by_content_type[config.ct].append((config, wanted))
+
+    for content_type, configs in by_content_type.items():
+        prefetch_for_content_type(content_type=content_type, configs=configs)
+    return objs
+
+
+def prefetch_for_content_type(content_type, configs):
+    """
+    :param content_type: the `ContentType` all the configurations are for.
+    :param configs: a list of 2-tuples of the configuration, and the
+                    regions it needs.
+    """
+    models_by_region = defaultdict(set)
+    models = set()
+    content_ids = set()
+    for config, wanted in configs:
+        for region in wanted:
+            enabled = set(config.config[region].get('models', {}).keys())
+            models_by_region[region] |= enabled
+            models |= enabled
+        if wanted:
+            content_ids.add(force_text(config.obj.pk))
+
+    by_content_id = defaultdict(list)
+    if content_ids and models:
+        lookups = {
+            'content_type': content_type,
+            'content_id__in': sorted(content_ids),
+            'region__in': sorted(models_by_region),
+        }
+        filters = (get_allowed_chunks_filter(
+            models_by_region=models_by_region),)
+        # any of the configurations can do the subclass querying.
+        chunks = configs[0][0]._fetch_subclasses(lookups=lookups,
+                                                 models=tuple(models),
+                                                 filters=filters)
+        for chunk in chunks:
+            by_content_id[chunk.content_id].append(chunk)
+        logger.info('Prefetched chunks for {count} objects of type '
+                    '{ct!r}'.format(count=len(content_ids), ct=content_type))
+
+    for config, wanted in configs:
+        content_id = force_text(config.obj.pk)
+        config.set_fetched_chunks(regions=wanted,
+                                  chunks=by_content_id[content_id])
+    return by_content_id
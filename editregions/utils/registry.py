@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+from collections import namedtuple
+import logging
+from adminlinks.templatetags.utils import get_admin_site
+from editregions.utils.data import get_modeladmin, get_model_class
+
+logger = logging.getLogger(__name__)
+
+#: the methods a chunk's ModelAdmin may implement, any of which may be `None`
+#: if it doesn't.
+CHUNK_RENDERER_METHODS = ('render_into_region', 'render_into_mediagroup',
+                          'render_into_summary',
+                          'get_editregions_subclass_type',
+                          'get_editregions_subclass_summary',
+                          'get_editregions_subclass_tools',
+                          'get_editregions_cache_parts',
+                          'render_into_region_timeout')
+
+
+class ChunkRenderer(namedtuple('ChunkRenderer',
+                               ('model', 'modeladmin', 'render_concurrently') +
+                               CHUNK_RENDERER_METHODS)):
+    """
+    The ModelAdmin responsible for a chunk model, along with the bound methods
+    it provides for rendering, so that they're only looked up once.
+
+    .. testcase:: ChunkRendererTestCase
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_modeladmin(cls, modeladmin, model=None):
+        methods = dict((name, getattr(modeladmin, name, None))
+                       for name in CHUNK_RENDERER_METHODS)
+        if model is None:
+            model = getattr(modeladmin, 'model', None)
+        concurrent = bool(getattr(modeladmin, 'render_concurrently', False))
+        return cls(model=model, modeladmin=modeladmin,
+                   render_concurrently=concurrent, **methods)
+
+
+#: admin namespace -> (admin site, {model class: ChunkRenderer})
+_registries = {}
+
+
+def get_renderer_registry(admin_namespace='admin'):
+    """
+    Builds the mapping of every model registered with the admin site to a
+    `ChunkRenderer` the first time it's asked for, and returns the same one
+    afterwards.
+
+    .. testcase:: ChunkRendererRegistryTestCase
+    """
+    try:
+        return _registries[admin_namespace]
+    except KeyError:
+        pass
+    admin = get_admin_site(admin_namespace)
+    renderers = dict(
+        (model, ChunkRenderer.from_modeladmin(modeladmin, model=model))
+        for model, modeladmin in admin._registry.items())
+    logger.debug('Built renderer registry for {count} models in admin site '
+                 '"{ns}"'.format(count=len(renderers), ns=admin_namespace))
+    _registries[admin_namespace] = (admin, renderers)
+    return _registries[admin_namespace]
+
+
+def clear_renderer_registry():
+    """
+    .. testcase:: ChunkRendererRegistryTestCase
+    """
+    _registries.clear()
+
+
+def get_chunk_renderer(obj, admin_namespace='admin'):
+    """
+    Like `get_modeladmin`, but without having to go through the content types
+    framework and the admin site each time.
+
+    Models which have been registered or unregistered with the admin since
+    the registry was built are noticed and re-resolved, and those which
+    aren't in the admin at all raise the same errors as `get_modeladmin`.
+
+    .. testcase:: ChunkRendererRegistryTestCase
+    """
+    admin, renderers = get_renderer_registry(admin_namespace)
+    cls = obj if isinstance(obj, type) else obj.__class__
+    renderer = renderers.get(cls, None)
+    if (renderer is not None
+            and admin._registry.get(renderer.model) is renderer.modeladmin):
+        return renderer
+    # deferred/proxy classes aren't in the admin under their own name, and
+    # the ModelAdmin may have been changed since we looked; ask the slow way.
+    modeladmin = get_modeladmin(obj, admin_namespace=admin_namespace)
+    renderer = ChunkRenderer.from_modeladmin(modeladmin,
+                                             model=get_model_class(obj))
+    renderers[cls] = renderer
+    return renderer
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import logging
+from threading import Lock
+from django.conf import settings
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template, select_template
+try:
+    from django.utils.six import string_types
+except ImportError:  # pragma: no cover
+    string_types = basestring,
+try:
+    from collections import OrderedDict as SortedDict
+except ImportError:  # pragma: no cover ... Python < 2.7, Django < 1.7
+    from django.utils.datastructures import SortedDict
+from editregions.constants import MISSING_TEMPLATES_SIZE
+
+logger = logging.getLogger(__name__)
+
+#: (template name, ...) -> compiled Template
+_templates = {}
+
+#: template name -> None, for names no loader could find; least recently
+#: asked for first.
+_missing_templates = SortedDict()
+_missing_templates_lock = Lock()
+
+
+def get_cached_template(template_names):
+    """
+    Like `select_template`, but the template found is kept for the lifetime
+    of the process, so that rendering many chunks doesn't find and parse the
+    same template each time, whether or not the project is using the cached
+    template loader.
+
+    Nothing is kept when `DEBUG` is on, so that changes to templates are
+    picked up as usual.
+
+    .. testcase:: GetCachedTemplateTestCase
+    """
+    if isinstance(template_names, string_types):
+        key = (template_names,)
+    else:
+        key = tuple(template_names)
+    if settings.DEBUG:
+        return select_template(key)
+    try:
+        return _templates[key]
+    except KeyError:
+        logger.debug('Compiling the first of {0!r}'.format(key))
+        template = _templates[key] = select_template(key)
+        return template
+
+
+def clear_template_cache():
+    """
+    .. testcase:: GetCachedTemplateTestCase
+    """
+    _templates.clear()
+
+
+def get_missing_templates_size():
+    return getattr(settings, 'EDITREGIONS_MISSING_TEMPLATES_SIZE',
+                   MISSING_TEMPLATES_SIZE)
+
+
+def is_template_missing(template_name):
+    """
+    .. testcase:: SelectExistingTemplateTestCase
+    """
+    with _missing_templates_lock:
+        if template_name not in _missing_templates:
+            return False
+        # move it to the end, so it's the last to be forgotten.
+        del _missing_templates[template_name]
+        _missing_templates[template_name] = None
+        return True
+
+
+def set_template_missing(template_name):
+    """
+    .. testcase:: SelectExistingTemplateTestCase
+    """
+    size = get_missing_templates_size()
+    with _missing_templates_lock:
+        _missing_templates[template_name] = None
+        while len(_missing_templates) > size:
+            del _missing_templates[next(iter(_missing_templates))]
+
+
+def select_existing_template(template_names):
+    """
+    Like `select_template`, but names which none of the template loaders
+    could find are remembered (up to `EDITREGIONS_MISSING_TEMPLATES_SIZE` of
+    them) and skipped afterwards, so that candidates which almost never
+    exist, like those for a specific primary key, don't go to the filesystem
+    for every object.
+
+    Nothing is remembered when `DEBUG` is on, so that new templates are
+    picked up as usual.
+
+    .. testcase:: SelectExistingTemplateTestCase
+    """
+    if isinstance(template_names, string_types):
+        template_names = (template_names,)
+    if settings.DEBUG:
+        return select_template(template_names)
+    for template_name in template_names:
+        if is_template_missing(template_name):
+            continue
+        try:
+            return get_template(template_name)
+        except TemplateDoesNotExist:
+            set_template_missing(template_name)
+    raise TemplateDoesNotExist(', '.join(template_names))
+
+
+def clear_missing_templates():
+    """
+    .. testcase:: SelectExistingTemplateTestCase
+    """
+    with _missing_templates_lock:
+        _missing_templates.clear()
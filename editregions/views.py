@@ -1,7 +1,24 @@
 # -*- coding: utf-8 -*-
 import logging
+from django.conf import settings
 from django.contrib import messages
-from django.shortcuts import redirect
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponse
+from django.shortcuts import redirect, get_object_or_404
+from django.template import RequestContext
+from django.utils.cache import patch_response_headers, patch_vary_headers
+from editregions.constants import DEFERRED_CACHE_TIMEOUT
+from editregions.models import EditRegionConfiguration
+from editregions.templatetags.editregion import render_all_chunks
+from editregions.utils.data import (get_modeladmin, attach_configuration,
+                                    get_configuration,
+                                    allows_deferred_rendering)
+from editregions.utils.regions import validate_region_name
+try:
+    import ujson as json
+except ImportError:  # Haven't got an ultrajson package
+    import json
 
 logger = logging.getLogger(__name__)
 
@@ -79,3 +96,50 @@ class EditRegionResponseMixin(object):
                              'new_path': e.location,
                          })
             return e.get_redirect()
+
+
+def render_region(request, content_type, content_id, region):
+    """
+    Renders a single region for an object, for filling in the placeholders
+    output by ``{% editregion "name" obj deferred %}``, as JSON of the form
+    ``{"region": "name", "html": "..."}``.
+
+    Anyone may request this, so only objects of models whose ModelAdmin
+    implements `get_editregions_deferred_queryset` may be rendered, and only
+    if they're in the queryset it returns; anything else is a 404.
+
+    .. testcase:: RenderRegionTestCase
+    """
+    try:
+        validate_region_name(region)
+        ct = ContentType.objects.get_for_id(content_type)
+    except (ValidationError, ContentType.DoesNotExist) as e:
+        raise Http404(str(e))
+    model = ct.model_class()
+    if model is None:
+        raise Http404('Model for {0!r} no longer exists'.format(ct))
+    try:
+        modeladmin = get_modeladmin(model)
+    except KeyError:
+        raise Http404('{0!r} is not in the admin'.format(model))
+    if not allows_deferred_rendering(modeladmin):
+        raise Http404('{0!r} does not allow deferred rendering'.format(model))
+    queryset = modeladmin.get_editregions_deferred_queryset(request=request)
+    obj = get_object_or_404(queryset, pk=content_id)
+
+    attach_configuration(obj, EditRegionConfiguration)
+    config = get_configuration(obj)
+    if region not in config.config:
+        raise Http404('"{0}" is not a region for {1!r}'.format(region, obj))
+    context = RequestContext(request)
+    chunks = render_all_chunks(context=context,
+                               found_chunks=config.fetch_chunks_for(region))
+    html = '\n'.join(x.output for x in chunks)
+    response = HttpResponse(json.dumps({'region': region, 'html': html}),
+                            content_type='application/json')
+    timeout = getattr(settings, 'EDITREGIONS_DEFERRED_CACHE_TIMEOUT',
+                      DEFERRED_CACHE_TIMEOUT)
+    patch_response_headers(response, cache_timeout=timeout)
+    # chunks may render differently for each user.
+    patch_vary_headers(response, ('Cookie',))
+    return response
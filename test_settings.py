@@ -20,6 +20,7 @@ INSTALLED_APPS = (
     # main app in test
     'editregions',
     'editregions.contrib.embeds',
+    'editregions.contrib.layouts',
     'editregions.contrib.search',
     'editregions.contrib.text',
     'editregions.contrib.uploads',
@@ -4,4 +4,5 @@ from django.contrib import admin
 
 urlpatterns = patterns('',
     url(r'^admin_mountpoint/', include(admin.site.urls)),
+    url(r'^editregions/', include('editregions.urls')),
 )